@@ -1,16 +1,32 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import os
+import json
+import logging
+import tempfile
 import uvicorn
 from dotenv import load_dotenv
 
 # Import the core engine
 from transformer.neural import NeuralTextHumanizer
+from transformer.detector_tester import DetectorTester
+from transformer import readability_metrics
+from transformer import ingestion
+from transformer import random_context
+from transformer import request_log
+from transformer import metrics
+from transformer import streaming
 
 # Initialize Environment
 load_dotenv()
+request_log.configure()
+logger = logging.getLogger("blizflow.api")
+
+# Last line of a /api/humanize/stream response that failed part way
+STREAM_ERROR_MARKER = "\n[BLIZFLOW ERROR] {}\n"
 
 app = FastAPI(
     title="BlizFlow API",
@@ -27,13 +43,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def tag_request_id(request: Request, call_next):
+    # Honour a caller-supplied id so logs can be joined across services
+    with request_log.request_id(request.headers.get("x-request-id")) as rid:
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = rid
+    return response
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    import time
+    start_time = time.perf_counter()
+    status = 500
+    with metrics.REQUESTS_IN_FLIGHT.track_inprogress():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Route templates, not raw paths, keep the label set bounded.
+            # Streamed bodies are timed up to the headers; humanize() has its own histogram.
+            route = request.scope.get("route")
+            metrics.REQUEST_SECONDS.labels(
+                request.method, route.path if route else "unmatched", status
+            ).observe(time.perf_counter() - start_time)
+
 # Global Engine Instance (Lazy Loading)
 neural_engine = None
 
 def get_engine():
     global neural_engine
     if neural_engine is None:
-        print("⚡ Loading Neural Engine...")
+        logger.info("Loading Neural Engine...")
         neural_engine = NeuralTextHumanizer()
     return neural_engine
 
@@ -46,6 +88,13 @@ class HumanizeRequest(BaseModel):
     preserve_formatting: bool = True
     use_emojis: bool = False
     use_artifacts: bool = False
+    seed: Optional[int] = None  # same seed + same input = same output
+
+class AnalyzeRequest(BaseModel):
+    texts: List[str]
+
+class ReadabilityRequest(BaseModel):
+    text: str
 
 class HumanizeResponse(BaseModel):
     original_length: int
@@ -58,6 +107,10 @@ class HumanizeResponse(BaseModel):
 def health_check():
     return {"status": "online", "engine": "BlizFlow v3.1.5"}
 
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/api/humanize")
 async def humanize_text(request: HumanizeRequest):
     try:
@@ -73,7 +126,8 @@ async def humanize_text(request: HumanizeRequest):
             audience=request.audience,
             preserve_formatting=request.preserve_formatting,
             use_emojis=request.use_emojis,
-            use_artifacts=request.use_artifacts
+            use_artifacts=request.use_artifacts,
+            seed=request.seed
         )
         
         duration = time.time() - start_time
@@ -86,9 +140,179 @@ async def humanize_text(request: HumanizeRequest):
         }
         
     except Exception as e:
-        print(f"Error: {e}")
+        logger.exception("Request failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/analyze")
+def analyze_texts(request: AnalyzeRequest):
+    try:
+        import time
+        start_time = time.time()
+
+        # Local heuristics only; no models are needed for this route
+        results = DetectorTester().score_heuristics_batch(request.texts)
+
+        return {
+            "count": len(results),
+            "results": results,
+            "processing_time": time.time() - start_time
+        }
+
+    except Exception as e:
+        logger.exception("Request failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/readability")
+def readability(request: ReadabilityRequest):
+    try:
+        return readability_metrics.analyze(request.text)
+    except Exception as e:
+        logger.exception("Request failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/humanize/document")
+async def humanize_document(
+    request: Request,
+    filename: str,
+    stealth_level: int = 3,
+    tone: str = "Balanced",
+    audience: str = "General",
+    use_emojis: bool = False,
+    use_artifacts: bool = False,
+    seed: Optional[int] = None
+):
+    """
+    Humanize an uploaded PDF/DOCX paragraph by paragraph.
+
+    The raw file is the request body (e.g. curl --data-binary @paper.pdf) and
+    settings are query parameters. The response is NDJSON: one line per
+    paragraph as soon as it is done, then a summary line.
+    """
+    # Spool the upload to disk past 8MB instead of holding it in memory
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        paragraphs = ingestion.iter_paragraphs(upload, filename, request.headers.get("content-type", ""))
+    except ValueError as e:
+        upload.close()
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        upload.close()
+        logger.exception("Request failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    rid = request_log.current_request_id()
+
+    def stream():
+        import time
+        start_time = time.time()
+        count = 0
+        status = "ok"
+        try:
+            engine = get_engine()
+            for index, paragraph in enumerate(paragraphs):
+                # Scopes never span a yield: each chunk may run on another worker thread
+                with request_log.request_id(rid), request_log.request_scope("humanize_document", summary=False):
+                    result = engine.humanize(
+                        text=paragraph,
+                        stealth_level=stealth_level,
+                        tone=tone,
+                        audience=audience,
+                        preserve_formatting=False,
+                        use_emojis=use_emojis,
+                        use_artifacts=use_artifacts,
+                        seed=None if seed is None else random_context.derive_seed(seed, "paragraph", index)
+                    )
+                count += 1
+                yield json.dumps({"index": index, "original": paragraph, "humanized_text": result}) + "\n"
+            yield json.dumps({"done": True, "paragraphs": count, "processing_time": time.time() - start_time}) + "\n"
+        except Exception as e:
+            # Headers are already sent, so the error goes in the stream
+            status = "error"
+            with request_log.request_id(rid):
+                logger.exception("Request failed: %s", e)
+            yield json.dumps({"error": str(e), "paragraphs": count}) + "\n"
+        finally:
+            upload.close()
+            with request_log.request_id(rid):
+                request_log.log_summary(
+                    "humanize_document", time.time() - start_time,
+                    filename=filename, stealth_level=stealth_level, paragraphs=count, status=status
+                )
+
+    # A plain generator runs on the threadpool, keeping the event loop free
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.post("/api/humanize/stream")
+async def humanize_stream(
+    request: Request,
+    stealth_level: int = 3,
+    tone: str = "Balanced",
+    audience: str = "General",
+    use_emojis: bool = False,
+    use_artifacts: bool = False,
+    seed: Optional[int] = None,
+    window_chars: int = streaming.DEFAULT_WINDOW_CHARS
+):
+    """
+    Humanize a plain-text body of any size with bounded memory.
+
+    The UTF-8 text is the raw request body (e.g. curl --data-binary @book.txt)
+    and settings are query parameters. The body is spooled to disk rather than
+    held in memory, and the output streams back one line window at a time.
+    For the same seed it matches /api/humanize with preserve_formatting, as
+    long as no line exceeds window_chars.
+
+    A failure after the output has started can't change the 200 status, so
+    the text ends with a "[BLIZFLOW ERROR] <message>" line instead.
+    """
+    # The response can't read the body while streaming (Starlette's disconnect
+    # listener shares receive()), so spool it first, to disk past 8MB
+    upload = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    try:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+    except Exception as e:
+        upload.close()
+        logger.exception("Request failed: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    rid = request_log.current_request_id()
+
+    def stream():
+        pieces = None
+        failed = False
+        try:
+            while not failed:
+                # Scopes never span a yield: each piece may be produced on another worker thread
+                with request_log.request_id(rid):
+                    try:
+                        if pieces is None:
+                            pieces = get_engine().humanize_stream(
+                                streaming.read_chunks(upload), stealth_level=stealth_level, tone=tone,
+                                audience=audience, use_emojis=use_emojis, use_artifacts=use_artifacts,
+                                seed=seed, window_chars=window_chars
+                            )
+                        piece = next(pieces)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        # Headers are already sent, so the error goes in the stream
+                        logger.exception("Request failed: %s", e)
+                        piece = STREAM_ERROR_MARKER.format(e)
+                        failed = True
+                yield piece
+        finally:
+            # Also runs when the client disconnects mid-stream
+            if pieces is not None:
+                pieces.close()
+            upload.close()
+
+    return StreamingResponse(stream(), media_type="text/plain; charset=utf-8")
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,333 @@
+"""
+Batch Humanizer
+Offline bulk processing for document dumps: a directory of txt/docx/pdf files
+or a JSONL file, fanned out to worker processes that each keep one warm
+engine. Results are written as they finish and progress is checkpointed, so
+an interrupted run picks up where it stopped.
+
+Run with:
+    python batch_humanize.py dumps/ -o results.jsonl --workers 4
+    python batch_humanize.py requests.jsonl -o out/ --format files --text-field body --id-field request_id
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from transformer import request_log
+from transformer.random_context import derive_seed
+
+DOCUMENT_EXTENSIONS = (".txt", ".docx", ".pdf")
+
+_SAFE_NAME_RE = re.compile(r"[^\w.-]+")
+
+# --- Worker side ---
+_engine = None
+_settings = None
+
+
+def _init_worker(settings):
+    # Runs once per process: the models are loaded here and reused for every job
+    global _engine, _settings
+    request_log.configure()
+    from transformer.neural import NeuralTextHumanizer
+    _engine = NeuralTextHumanizer()
+    _settings = settings
+
+
+def _read_job_text(job):
+    if "text" in job:
+        return job["text"]
+    path = job["path"]
+    if path.lower().endswith(".txt"):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    from transformer import ingestion
+    # Already inside a pool worker, so PDFs are extracted in-process
+    return ingestion.read_document(path, workers=1)
+
+
+def _process_job(job):
+    start_time = time.time()
+    try:
+        text = _read_job_text(job)
+        settings = dict(_settings)
+        if settings.get("seed") is not None:
+            # Per-document streams: results don't depend on which worker ran what
+            settings["seed"] = derive_seed(settings["seed"], "document", job["id"])
+        # Log records from this document carry its id
+        with request_log.request_id(job["id"]):
+            result = _engine.humanize(text=text, preserve_formatting=True, **settings)
+        return {
+            "id": job["id"],
+            "original_length": len(text),
+            "humanized_text": result,
+            "humanized_length": len(result),
+            "words": len(text.split()),
+            "processing_time": time.time() - start_time
+        }
+    except Exception as e:
+        return {"id": job["id"], "error": f"{type(e).__name__}: {e}", "processing_time": time.time() - start_time}
+
+
+# --- Inputs ---
+def iter_directory_jobs(root):
+    """Jobs for every txt/docx/pdf under root, keyed by relative path."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                path = os.path.join(dirpath, name)
+                yield {"id": os.path.relpath(path, root).replace(os.sep, "/"), "path": path}
+
+
+def iter_jsonl_jobs(path, text_field="text", id_field="id"):
+    """Jobs for each record of a JSONL file; records without an id use their line number."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if text_field not in record:
+                print(f"⚠️ Line {line_number}: no '{text_field}' field, skipped", file=sys.stderr)
+                continue
+            yield {"id": str(record.get(id_field, f"line-{line_number}")), "text": record[text_field]}
+
+
+# --- Outputs ---
+class JsonlWriter:
+    """Appends one JSON line per finished document."""
+
+    def __init__(self, path):
+        self.path = path
+        _truncate_partial_line(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, result):
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def written_ids(self):
+        """
+        Ids already in the output. A crash between writing a result and
+        checkpointing it leaves the id here but not in the checkpoint, and
+        running the document again would append it twice.
+        """
+        ids = set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    ids.add(json.loads(line)["id"])
+        return ids
+
+    def close(self):
+        self._file.close()
+
+
+class MirrorWriter:
+    """Writes each document's result to its own .txt file under a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def target_path(self, doc_id):
+        parts = [_SAFE_NAME_RE.sub("_", part) for part in doc_id.split("/") if part not in ("", ".", "..")]
+        relative = os.path.join(*parts) if parts else "_"
+        if not relative.lower().endswith(".txt"):
+            relative += ".txt"
+        return os.path.join(self.directory, relative)
+
+    def write(self, result):
+        target = self.target_path(result["id"])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written result
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            f.write(result["humanized_text"])
+        os.replace(target + ".tmp", target)
+
+    def written_ids(self):
+        # Redoing a document just rewrites its own file
+        return set()
+
+    def close(self):
+        pass
+
+
+def _truncate_partial_line(path):
+    # A crash mid-write can leave the last JSON line incomplete
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+class Checkpoint:
+    """
+    Ids of finished documents, one per line. An id is appended only after its
+    result has been written, so a resumed run can at worst redo the document
+    that was in flight when the crash happened; ids found in the output but
+    not here are added back on resume (see JsonlWriter.written_ids).
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.done = set()
+        if resume and os.path.exists(path):
+            _truncate_partial_line(path)
+            with open(path, "r", encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+        elif os.path.exists(path):
+            os.remove(path)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def mark(self, doc_id):
+        self.done.add(doc_id)
+        self._file.write(doc_id + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# --- Driver ---
+class Throughput:
+    """Running document/word rates, printed at most every `interval` seconds."""
+
+    def __init__(self, total=None, interval=5.0):
+        self.total = total
+        self.interval = interval
+        self.start = time.time()
+        self.last_report = self.start
+        self.documents = 0
+        self.words = 0
+        self.failed = 0
+
+    def add(self, result):
+        if "error" in result:
+            self.failed += 1
+        else:
+            self.documents += 1
+            self.words += result["words"]
+        if time.time() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self, final=False):
+        self.last_report = time.time()
+        elapsed = max(self.last_report - self.start, 1e-9)
+        line = (
+            f"{'✓ Done' if final else '→'} {self.documents} docs ({self.failed} failed) in {elapsed:.1f}s | "
+            f"{self.documents / elapsed:.2f} docs/s, {self.words / elapsed:.0f} words/s"
+        )
+        if self.total and not final and self.documents:
+            remaining = self.total - self.documents - self.failed
+            line += f" | ETA {remaining * elapsed / (self.documents + self.failed):.0f}s"
+        print(line, flush=True)
+
+
+def run(jobs, writer, checkpoint, settings, workers, total=None):
+    """
+    Fan jobs out to the pool, keeping at most a few per worker queued so large
+    JSONL inputs are never read into memory all at once.
+    """
+    stats = Throughput(total)
+    max_in_flight = workers * 4
+    pending = set()
+
+    def drain(block_until):
+        nonlocal pending
+        done, pending = wait(pending, return_when=block_until)
+        for future in done:
+            result = future.result()
+            if "error" in result:
+                print(f"✗ {result['id']}: {result['error']}", file=sys.stderr)
+            else:
+                writer.write(result)
+                checkpoint.mark(result["id"])
+            stats.add(result)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(settings,)) as pool:
+        for job in jobs:
+            if job["id"] in checkpoint.done:
+                continue
+            pending.add(pool.submit(_process_job, job))
+            if len(pending) >= max_in_flight:
+                drain(FIRST_COMPLETED)
+        while pending:
+            drain(FIRST_COMPLETED)
+
+    stats.report(final=True)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Humanize a directory of documents or a JSONL file offline.")
+    parser.add_argument("input", help="directory of .txt/.docx/.pdf files, or a .jsonl file")
+    parser.add_argument("-o", "--output", required=True, help="output .jsonl file, or directory with --format files")
+    parser.add_argument("--format", choices=["jsonl", "files"], default="jsonl", help="JSONL records or one mirrored .txt per document")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="worker processes, each loads its own models")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--no-resume", action="store_true", help="ignore an existing checkpoint and start over")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the document id")
+    parser.add_argument("--stealth-level", type=int, default=3)
+    parser.add_argument("--tone", default="Balanced")
+    parser.add_argument("--audience", default="General")
+    parser.add_argument("--emojis", action="store_true")
+    parser.add_argument("--artifacts", action="store_true")
+    parser.add_argument("--seed", type=int, help="make every document's output reproducible")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.input):
+        jobs = iter_directory_jobs(args.input)
+    elif os.path.isfile(args.input):
+        jobs = iter_jsonl_jobs(args.input, args.text_field, args.id_field)
+    else:
+        parser.error(f"input not found: {args.input}")
+
+    if args.format == "files":
+        writer = MirrorWriter(args.output)
+        checkpoint_path = args.checkpoint or os.path.join(args.output, ".checkpoint")
+    else:
+        if args.no_resume and os.path.exists(args.output):
+            os.remove(args.output)
+        writer = JsonlWriter(args.output)
+        checkpoint_path = args.checkpoint or args.output + ".checkpoint"
+
+    checkpoint = Checkpoint(checkpoint_path, resume=not args.no_resume)
+    if not args.no_resume:
+        for doc_id in writer.written_ids() - checkpoint.done:
+            checkpoint.mark(doc_id)
+    if checkpoint.done:
+        print(f"↻ Resuming: {len(checkpoint.done)} documents already done")
+    # Directory listings are cheap to count up front; JSONL inputs are streamed
+    total = None
+    if os.path.isdir(args.input):
+        total = sum(1 for job in iter_directory_jobs(args.input) if job["id"] not in checkpoint.done)
+
+    settings = {
+        "stealth_level": args.stealth_level,
+        "tone": args.tone,
+        "audience": args.audience,
+        "use_emojis": args.emojis,
+        "use_artifacts": args.artifacts,
+        "seed": args.seed
+    }
+    workers = max(1, args.workers)
+    print(f"Processing {args.input} with {workers} workers → {args.output}")
+    try:
+        stats = run(jobs, writer, checkpoint, settings, workers, total)
+    finally:
+        writer.close()
+        checkpoint.close()
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Hash Seed Check
+Checks that a seeded humanize gives the same output in every process. Python
+salts str hashes per process (PYTHONHASHSEED), so a seeded draw from a list
+built out of a set changes with it: the same seed would give one text in one
+uvicorn worker and another after a restart or in a batch_humanize process.
+
+The same seeded inputs are humanized in one subprocess per hash seed and the
+outputs compared; the check exits non-zero if any of them differ.
+
+Run with:
+    python -m benchmarks.check_hash_seed --tiny-models
+    python -m benchmarks.check_hash_seed --hash-seeds 1,2,3 --inputs 16 --level 4
+Stealth levels below 5 with the Balanced tone keep the (non-deterministic)
+OpenRouter pass out of the comparison.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.stress_concurrency import build_inputs
+
+
+def humanize_all(inputs, level):
+    """Seeded outputs of one engine, in input order."""
+    from transformer.neural import NeuralTextHumanizer
+    engine = NeuralTextHumanizer()
+    return [engine.humanize(text, stealth_level=level, seed=1000 + i) for i, text in enumerate(inputs)]
+
+
+def run_with_hash_seed(hash_seed, args):
+    """Outputs of a subprocess running under PYTHONHASHSEED=hash_seed."""
+    command = [sys.executable, "-m", "benchmarks.check_hash_seed", "--worker",
+               "--inputs", str(args.inputs), "--level", str(args.level)]
+    if args.tiny_models:
+        command.append("--tiny-models")
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True, text=True)
+    # The outputs are the last line; anything before it is library chatter
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that seeded humanize output does not depend on PYTHONHASHSEED.")
+    parser.add_argument("--hash-seeds", default="1,2", help="PYTHONHASHSEED values to compare")
+    parser.add_argument("--inputs", type=int, default=8)
+    parser.add_argument("--level", type=int, default=3, help="stealth level (keep below 5 for deterministic runs)")
+    parser.add_argument("--tiny-models", action="store_true", help="use the offline tiny-model fixtures")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        if args.tiny_models:
+            from benchmarks.tiny_models import use_fixtures
+            use_fixtures()
+        print(json.dumps(humanize_all(build_inputs(args.inputs), args.level)))
+        return 0
+
+    hash_seeds = [s.strip() for s in args.hash_seeds.split(",") if s.strip()]
+    runs = {hash_seed: run_with_hash_seed(hash_seed, args) for hash_seed in hash_seeds}
+
+    expected = runs[hash_seeds[0]]
+    mismatches = sorted({
+        i for hash_seed in hash_seeds[1:] for i, (a, b) in enumerate(zip(expected, runs[hash_seed])) if a != b
+    })
+    print(f"\n{'='*60}")
+    print(f"Inputs: {args.inputs} at level {args.level} | PYTHONHASHSEED: {', '.join(hash_seeds)}")
+    print(f"Inputs with diverging output: {len(mismatches)}")
+    for i in mismatches[:3]:
+        print(f"\n✗ Input {i}:")
+        for hash_seed in hash_seeds:
+            print(f"  [{hash_seed}] {runs[hash_seed][i][:200]!r}")
+    print(f"{'='*60}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
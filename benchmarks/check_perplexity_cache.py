@@ -0,0 +1,123 @@
+"""
+Perplexity Cache Check
+Checks that PerplexityAnalyzer.calculate_perplexity, which reuses cached
+context across the stride-512 sliding windows, agrees with the original loop
+that recomputes every window from scratch, and that calculate_perplexity_batch
+(all lengths in one call) agrees with calculate_perplexity.
+
+Texts are cut at token counts around the window boundaries (1 token, the
+stride, the model's context length and a few multiples of both). The check
+exits non-zero if any relative difference exceeds its tolerance. Batch and
+single scores come from the same log-probabilities, so theirs is much tighter.
+
+Run with:
+    python -m benchmarks.check_perplexity_cache --tiny-models
+    python -m benchmarks.check_perplexity_cache --lengths 1,512,1025,4170 --tolerance 1e-4
+"""
+import argparse
+import math
+import sys
+
+import torch
+
+from benchmarks.stress_concurrency import build_inputs
+
+DEFAULT_LENGTHS = (1, 2, 17, 511, 512, 513, 1023, 1024, 1025, 1536, 2049, 4170)
+
+
+def reference_perplexity(analyzer, text):
+    """Original sliding-window perplexity (stride 512, full recompute per window)."""
+    encodings = analyzer.tokenizer(text, return_tensors='pt')
+
+    max_length = analyzer.model.config.n_positions
+    stride = analyzer.STRIDE
+
+    lls = []
+    for i in range(0, encodings.input_ids.size(1), stride):
+        begin_loc = max(i + stride - max_length, 0)
+        end_loc = min(i + stride, encodings.input_ids.size(1))
+        trg_len = end_loc - i
+
+        input_ids = encodings.input_ids[:, begin_loc:end_loc].to(analyzer.device)
+        target_ids = input_ids.clone()
+        target_ids[:, :-trg_len] = -100
+
+        with torch.no_grad():
+            outputs = analyzer.model(input_ids, labels=target_ids)
+            log_likelihood = outputs.loss * trg_len
+
+        lls.append(log_likelihood)
+
+    ppl = torch.exp(torch.stack(lls).sum() / end_loc)
+    return ppl.item()
+
+
+def texts_of_lengths(tokenizer, lengths):
+    """(token count, text) pairs cut from the benchmark corpus at each length."""
+    corpus = "\n\n".join(build_inputs(max(64, max(lengths) // 20), seed=3))
+    ids = tokenizer(corpus)["input_ids"]
+    while len(ids) < max(lengths):
+        corpus += "\n\n" + corpus
+        ids = tokenizer(corpus)["input_ids"]
+    cases = []
+    for length in lengths:
+        text = tokenizer.decode(ids[:length])
+        cases.append((len(tokenizer(text)["input_ids"]), text))
+    return cases
+
+
+def relative_difference(value, expected):
+    if math.isnan(value) and math.isnan(expected):
+        return 0.0
+    return abs(value - expected) / abs(expected) if expected else abs(value)
+
+
+def check(analyzer, lengths, tolerance, batch_tolerance):
+    """
+    Returns:
+        list of (token count, cached, reference, batch, cached vs reference, batch vs cached, ok)
+    """
+    cases = texts_of_lengths(analyzer.tokenizer, lengths)
+    batched = analyzer.calculate_perplexity_batch([text for _, text in cases])
+    rows = []
+    for (count, text), batch in zip(cases, batched):
+        cached = analyzer.calculate_perplexity(text)
+        reference = reference_perplexity(analyzer, text)
+        diff = relative_difference(cached, reference)
+        batch_diff = relative_difference(batch, cached)
+        rows.append((count, cached, reference, batch, diff, batch_diff, diff <= tolerance and batch_diff <= batch_tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the cached and batch perplexity scorers against the full-recompute loop.")
+    parser.add_argument("--lengths", default=",".join(str(n) for n in DEFAULT_LENGTHS), help="token counts to test")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="largest allowed relative difference, cached vs reference")
+    parser.add_argument("--batch-tolerance", type=float, default=1e-7, help="largest allowed relative difference, batch vs cached")
+    parser.add_argument("--tiny-models", action="store_true", help="use the offline tiny-model fixtures")
+    args = parser.parse_args(argv)
+
+    if args.tiny_models:
+        from benchmarks.tiny_models import use_fixtures
+        use_fixtures()
+    from transformer.perplexity_analyzer import PerplexityAnalyzer
+
+    analyzer = PerplexityAnalyzer(inference_client=False)
+    lengths = [int(n) for n in args.lengths.split(",") if n.strip()]
+    rows = check(analyzer, lengths, args.tolerance, args.batch_tolerance)
+
+    print(f"\n{'tokens':>8} {'cached':>14} {'reference':>14} {'batch':>14} {'vs ref':>10} {'batch':>10}")
+    for count, cached, reference, batch, diff, batch_diff, ok in rows:
+        print(f"{count:>8} {cached:>14.6f} {reference:>14.6f} {batch:>14.6f} {diff:>10.2e} {batch_diff:>10.2e} {'' if ok else '✗'}")
+    failures = [row for row in rows if not row[6]]
+    worst = max((row[4] for row in rows), default=0.0)
+    worst_batch = max((row[5] for row in rows), default=0.0)
+    print(
+        f"\n{len(rows) - len(failures)}/{len(rows)} within {args.tolerance:g} / {args.batch_tolerance:g} "
+        f"(worst {worst:.2e} vs reference, {worst_batch:.2e} batch vs single)"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
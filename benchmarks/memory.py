@@ -0,0 +1,275 @@
+"""
+Memory Profiling
+Peak and net Python allocations per pass (tracemalloc) over the benchmark
+size ladder, model load footprints, and a scaling report that flags stages
+whose memory grows faster than their input.
+
+Each stage runs on its own with tracemalloc reset around it: "peak" is the
+most memory held at any point during the call above what was live before it,
+"net" is what is still held when it returns (its output included). Torch
+tensors live outside the Python allocator, so model footprints are measured
+from resident memory and parameter bytes, each in a fresh process.
+
+Run with:
+    python -m benchmarks.memory passes --sizes 1k,16k,128k -o memory.json
+    python -m benchmarks.memory models
+"""
+import argparse
+import gc
+import json
+import math
+import multiprocessing
+import re
+import sys
+import time
+import tracemalloc
+
+from benchmarks.pipeline import DEFAULT_SIZES, build_cases, mock_llm, parse_size, synthetic_document
+
+# Log-log slope above which a stage counts as superlinear (1.0 = linear)
+SUPERLINEAR_SLOPE = 1.15
+
+MODEL_LOADERS = ("t5", "pegasus", "gpt2", "minilm", "spacy", "wordnet")
+
+
+def measure(fn, text, seed, top=0):
+    """
+    Run fn(text) under tracemalloc.
+
+    Returns:
+        dict with peak and net bytes, and the top allocation sites by size
+        when top > 0
+    """
+    from transformer import random_context
+
+    gc.collect()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot() if top else None
+
+    with random_context.seeded(seed):
+        start_time = time.perf_counter()
+        result = fn(text)
+        elapsed = time.perf_counter() - start_time
+
+    current, peak = tracemalloc.get_traced_memory()
+    sample = {"peak": peak - before, "net": current - before, "time": elapsed}
+    if top:
+        stats = tracemalloc.take_snapshot().compare_to(snapshot, "lineno")
+        sample["top"] = [
+            {"site": str(stat.traceback[0]), "bytes": stat.size_diff}
+            for stat in sorted(stats, key=lambda s: s.size_diff, reverse=True)[:top]
+        ]
+    del result
+    return sample
+
+
+def scaling_slope(points):
+    """Least-squares slope of log(value) on log(size); None with fewer than two usable points."""
+    points = [(math.log(size), math.log(value)) for size, value in points if size > 0 and value > 0]
+    if len(points) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def scaling_report(results):
+    """
+    Per stage: peak/net slopes across sizes and peak bytes per input byte at
+    the largest size, sorted with the worst scalers first.
+    """
+    by_name = {}
+    for result in results:
+        if "error" not in result:
+            by_name.setdefault(result["name"], []).append(result)
+
+    rows = []
+    for name, samples in by_name.items():
+        samples.sort(key=lambda r: r["size"])
+        largest = samples[-1]
+        peak_slope = scaling_slope([(r["size"], r["peak"]) for r in samples])
+        net_slope = scaling_slope([(r["size"], r["net"]) for r in samples])
+        rows.append({
+            "name": name,
+            "group": largest["group"],
+            "peak_slope": peak_slope,
+            "net_slope": net_slope,
+            "largest_size": largest["size"],
+            "largest_peak": largest["peak"],
+            "peak_per_input_byte": largest["peak"] / largest["size"],
+            "superlinear": peak_slope is not None and peak_slope > SUPERLINEAR_SLOPE
+        })
+    rows.sort(key=lambda r: (r["peak_slope"] is None, -(r["peak_slope"] or 0)))
+    return rows
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.2f}"
+
+
+def profile_passes(args):
+    if args.tiny_models:
+        from benchmarks.tiny_models import use_fixtures
+        use_fixtures()
+    from transformer.neural import NeuralTextHumanizer
+
+    engine = NeuralTextHumanizer()
+    mock_llm(engine)
+    cases = build_cases(engine, with_perplexity=args.with_perplexity)
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = [case for case in cases if pattern.search(case[1])]
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    # Warm every stage once so lazily built caches aren't billed to the first size
+    warmup = synthetic_document(1024, seed=args.seed)
+    for _, _, fn in cases:
+        try:
+            fn(warmup)
+        except Exception:
+            pass
+
+    tracemalloc.start(args.frames)
+    results = []
+    try:
+        for size in sizes:
+            text = synthetic_document(size, seed=args.seed)
+            for group, name, fn in cases:
+                try:
+                    sample = measure(fn, text, args.seed, top=args.top)
+                except Exception as e:
+                    print(f"✗ {name} @ {size}B failed: {type(e).__name__}: {e}", file=sys.stderr)
+                    results.append({"group": group, "name": name, "size": size, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                results.append(dict(sample, group=group, name=name, size=size))
+                print(f"{name:<48} {size:>9}B  peak {_mb(sample['peak']):>9} MB  net {_mb(sample['net']):>9} MB", flush=True)
+    finally:
+        tracemalloc.stop()
+
+    report = scaling_report(results)
+    print(f"\n{'Stage':<48} {'peak slope':>10} {'net slope':>10} {'peak/input':>11}")
+    for row in report:
+        slope = "-" if row["peak_slope"] is None else f"{row['peak_slope']:.2f}"
+        net = "-" if row["net_slope"] is None else f"{row['net_slope']:.2f}"
+        flag = "  ✗ superlinear" if row["superlinear"] else ""
+        print(f"{row['name']:<48} {slope:>10} {net:>10} {row['peak_per_input_byte']:>10.1f}x{flag}")
+
+    output = {
+        "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "seed": args.seed, "sizes": sizes},
+        "results": results,
+        "scaling": report
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"✓ Written to {args.output}")
+    return 0
+
+
+# --- Model load footprints ---
+def _load_model(name):
+    # Runs in a fresh process. Libraries are imported before the baseline so
+    # only the model itself is measured.
+    from transformer.metrics import resident_memory_bytes, model_memory_bytes
+    from transformer.model_names import model_name
+
+    if name in ("t5", "pegasus"):
+        from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+        model_id = model_name(name)
+        load = lambda: (AutoTokenizer.from_pretrained(model_id), AutoModelForSeq2SeqLM.from_pretrained(model_id))
+        params = lambda loaded: model_memory_bytes(loaded[1])
+    elif name == "gpt2":
+        from transformers import GPT2LMHeadModel, GPT2TokenizerFast
+        load = lambda: (GPT2TokenizerFast.from_pretrained(model_name("gpt2")), GPT2LMHeadModel.from_pretrained(model_name("gpt2")))
+        params = lambda loaded: model_memory_bytes(loaded[1])
+    elif name == "minilm":
+        from sentence_transformers import SentenceTransformer
+        load = lambda: SentenceTransformer(model_name("minilm"))
+        params = model_memory_bytes
+    elif name == "spacy":
+        import spacy
+        load = lambda: spacy.load("en_core_web_sm")
+        params = lambda loaded: 0
+    elif name == "wordnet":
+        from nltk.corpus import wordnet
+        def load():
+            wordnet.ensure_loaded()
+            wordnet.synsets("test")
+            return wordnet
+        params = lambda loaded: 0
+    else:
+        raise ValueError(f"Unknown model: {name}")
+
+    gc.collect()
+    rss_before = resident_memory_bytes()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    loaded = load()
+    elapsed = time.perf_counter() - start_time
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "model": name,
+        "load_time": elapsed,
+        "rss_delta": resident_memory_bytes() - rss_before,
+        "parameter_bytes": params(loaded),
+        "python_peak": peak,
+        "python_net": current
+    }
+
+
+def profile_models(args):
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for name in args.models.split(","):
+        name = name.strip()
+        with context.Pool(1) as pool:
+            try:
+                result = pool.apply(_load_model, (name,))
+            except Exception as e:
+                # Missing downloads raise multi-line messages; the first line says enough
+                message = (str(e).strip().splitlines() or [""])[0]
+                result = {"model": name, "error": f"{type(e).__name__}: {message}"}
+        results.append(result)
+        if "error" in result:
+            print(f"✗ {name:<10} {result['error']}")
+        else:
+            print(
+                f"{name:<10} RSS +{_mb(result['rss_delta']):>9} MB  params {_mb(result['parameter_bytes']):>9} MB  "
+                f"python peak {_mb(result['python_peak']):>8} MB  load {result['load_time']:.1f}s",
+                flush=True
+            )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"models": results}, f, indent=2)
+        print(f"✓ Written to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory profiling for the humanization pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    passes_parser = commands.add_parser("passes", help="peak/net allocations per pass across document sizes")
+    passes_parser.add_argument("-o", "--output", default="memory_results.json")
+    passes_parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated document sizes (default {DEFAULT_SIZES})")
+    passes_parser.add_argument("--filter", help="regex on stage names")
+    passes_parser.add_argument("--seed", type=int, default=1234)
+    passes_parser.add_argument("--top", type=int, default=0, help="also record the N largest allocation sites per stage")
+    passes_parser.add_argument("--frames", type=int, default=1, help="traceback depth kept by tracemalloc")
+    passes_parser.add_argument("--with-perplexity", action="store_true", help="also profile GPT-2 perplexity")
+    passes_parser.add_argument("--tiny-models", action="store_true", help="use the offline tiny-model fixtures")
+
+    models_parser = commands.add_parser("models", help="load footprint of each model, one fresh process each")
+    models_parser.add_argument("--models", default=",".join(MODEL_LOADERS))
+    models_parser.add_argument("-o", "--output")
+
+    args = parser.parse_args(argv)
+    return profile_passes(args) if args.command == "passes" else profile_models(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Pipeline Benchmarks
+Times every humanization pass, the pattern-breaking and scrambling
+components, the analyzers and full humanize() at each stealth level over
+synthetic documents from 1 KB to 1 MB, and compares two saved runs.
+
+Every run draws from the same seeded random stream and the OpenRouter LLM is
+replaced by an echo, so timings measure our code rather than the network.
+
+Run with:
+    python -m benchmarks.pipeline run -o baseline.json
+    python -m benchmarks.pipeline run --sizes 1k,16k --filter "pass_|humanize" -o after.json
+    python -m benchmarks.pipeline compare baseline.json after.json --threshold 0.10
+"""
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.stress_concurrency import build_inputs
+
+DEFAULT_SIZES = "1k,16k,128k,1m"
+_SIZE_RE = re.compile(r"^(\d+)([km]?)b?$", re.IGNORECASE)
+
+
+def parse_size(value):
+    """'16k' -> 16384 bytes."""
+    match = _SIZE_RE.match(value.strip())
+    if not match:
+        raise argparse.ArgumentTypeError(f"bad size: {value}")
+    number, unit = match.groups()
+    return int(number) * {"": 1, "k": 1024, "m": 1024 * 1024}[unit.lower()]
+
+
+def synthetic_document(size, seed=0):
+    """AI-flavoured paragraphs, blank-line separated, at least `size` bytes long."""
+    paragraphs = []
+    length = 0
+    batch = 0
+    while length < size:
+        for text in build_inputs(64, seed=seed * 1000 + batch):
+            for paragraph in text.split("\n"):
+                paragraphs.append(paragraph)
+                length += len(paragraph.encode("utf-8")) + 2
+                if length >= size:
+                    break
+            if length >= size:
+                break
+        batch += 1
+    return "\n\n".join(paragraphs)
+
+
+def mock_llm(engine, latency=0.0):
+    """Replace the OpenRouter call with an echo (optionally sleeping `latency` s)."""
+    def call_llm(system_prompt, user_text):
+        if latency:
+            time.sleep(latency)
+        return user_text
+    engine._call_llm = call_llm
+
+
+def build_cases(engine, with_perplexity=False):
+    """
+    (group, name, fn) for every benchmark; fn takes the document text.
+    Pass methods run at stealth level 5, where every pass is active.
+    """
+    from transformer.detector_tester import DetectorTester
+    from transformer.smart_system import SmartHumanizationOrchestrator
+    from transformer.text_features import extract_features
+    from transformer import readability_metrics
+
+    e = engine
+    cases = [
+        ("pass", "pass_0_obfuscate_intent", lambda t: e._pass_0_obfuscate_intent(t)),
+        ("pass", "pass_1_destructure", lambda t: e._pass_1_destructure(t)),
+        ("pass", "pass_2_semantic_rebuild_llm", lambda t: e._pass_2_semantic_rebuild_llm(t, level=5)),
+    ]
+    if e.model or e.inference:
+        cases.append(("pass", "pass_2_semantic_rebuild_t5", lambda t: e._pass_2_semantic_rebuild_t5(t, temperature=1.2)))
+    cases += [
+        ("pass", "pass_2_markov_blend", lambda t: e.blender.blend_with_corpus(t)),
+        ("pass", "pass_2_5_anti_paraphrasing", lambda t: e._pass_2_5_anti_paraphrasing(t, level=5)),
+        ("pass", "pass_3_opinion_and_confidence", lambda t: e._pass_3_opinion_and_confidence(t, level=5)),
+        ("pass", "pass_4_imperfection", lambda t: e._pass_4_imperfection(t, level=5)),
+        ("pass", "pass_5_rhythm", lambda t: e._pass_5_rhythm(t, level=5)),
+        ("pass", "pass_8_extreme_humanization", lambda t: e._pass_8_extreme_humanization(t)),
+        ("pass", "pass_9_semantic_entropy", lambda t: e._pass_9_semantic_entropy(t)),
+        ("pass", "pass_10_anchor_breaking", lambda t: e._pass_10_anchor_breaking(t)),
+        ("pass", "pass_11_shadow_rewrite", lambda t: e._pass_11_shadow_rewrite(t)),
+        ("pass", "pass_12_human_glitch", lambda t: e._pass_12_human_glitch(t, level=5)),
+        ("pass", "pass_13_conversational_detours", lambda t: e._pass_13_conversational_detours(t)),
+        ("pass", "pass_14_token_shielder", lambda t: e._pass_14_token_shielder(t, level=5)),
+        ("pass", "pass_15_linguistic_shatter", lambda t: e._pass_15_linguistic_shatter(t)),
+        ("pass", "pass_16_reddit_scrambler", lambda t: e._pass_16_reddit_scrambler(t)),
+        ("pass", "pass_17_emoji_dynamics", lambda t: e._pass_17_emoji_dynamics(t, tone="Casual")),
+        ("pass", "pass_18_commonality_nullifier", lambda t: e._pass_18_commonality_nullifier(t)),
+        ("pass", "pass_19_cyrillic_inversion", lambda t: e._pass_19_cyrillic_inversion(t)),
+        ("pass", "inject_artifacts", lambda t: e._inject_artifacts(t, level=5)),
+        # Passes 6 and 7 are these components
+        ("component", "pattern_breaker.comprehensive_pattern_break", lambda t: e.pattern_breaker.comprehensive_pattern_break(t, aggressiveness=5)),
+        ("component", "fingerprint_scrambler.scramble_fingerprint", lambda t: e.fingerprint_scrambler.scramble_fingerprint(t, level=5)),
+        ("component", "semantic_shuffler.semantic_shuffle", lambda t: e.semantic_shuffler.semantic_shuffle(t, aggressiveness=5)),
+    ]
+
+    detector = DetectorTester()
+    orchestrator = SmartHumanizationOrchestrator(e)
+    cases += [
+        ("analyzer", "text_features.extract_features", extract_features),
+        ("analyzer", "detector_tester.test_with_local_heuristics", detector.test_with_local_heuristics),
+        ("analyzer", "smart_system.analyze_text_type", orchestrator.analyze_text_type),
+        ("analyzer", "readability_metrics.compute_metrics", readability_metrics.compute_metrics),
+        ("analyzer", "ngram_diversifier.calculate_ngram_diversity", e.diversifier.calculate_ngram_diversity),
+    ]
+    if with_perplexity:
+        from transformer.perplexity_analyzer import PerplexityAnalyzer
+        analyzer = PerplexityAnalyzer()
+        cases.append(("analyzer", "perplexity_analyzer.calculate_perplexity", analyzer.calculate_perplexity))
+
+    for level in range(1, 6):
+        cases.append((
+            "humanize", f"humanize.level_{level}",
+            lambda t, level=level: e.humanize(t, stealth_level=level, preserve_formatting=True)
+        ))
+    return cases
+
+
+def time_case(fn, text, seed, min_time=0.5, max_runs=5):
+    """
+    Run fn(text) at least once and until min_time has been spent or max_runs
+    reached, each run on the same seeded random stream.
+
+    Returns:
+        list of per-run wall-clock seconds
+    """
+    from transformer import random_context
+
+    timings = []
+    while True:
+        with random_context.seeded(seed):
+            start_time = time.perf_counter()
+            fn(text)
+            timings.append(time.perf_counter() - start_time)
+        if len(timings) >= max_runs or sum(timings) >= min_time:
+            return timings
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args):
+    if args.tiny_models:
+        from benchmarks.tiny_models import use_fixtures
+        use_fixtures()
+    from transformer.neural import NeuralTextHumanizer
+
+    engine = NeuralTextHumanizer()
+    mock_llm(engine, latency=args.llm_latency / 1000.0)
+    cases = build_cases(engine, with_perplexity=args.with_perplexity)
+    if args.filter:
+        pattern = re.compile(args.filter)
+        cases = [case for case in cases if pattern.search(case[1])]
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    documents = {size: synthetic_document(size, seed=args.seed) for size in sizes}
+
+    results = []
+    for size in sizes:
+        text = documents[size]
+        for group, name, fn in cases:
+            try:
+                timings = time_case(fn, text, args.seed, args.min_time, args.max_runs)
+            except Exception as e:
+                print(f"✗ {name} @ {size}B failed: {type(e).__name__}: {e}", file=sys.stderr)
+                results.append({"group": group, "name": name, "size": size, "error": f"{type(e).__name__}: {e}"})
+                continue
+            median = statistics.median(timings)
+            results.append({
+                "group": group,
+                "name": name,
+                "size": size,
+                "chars": len(text),
+                "runs": len(timings),
+                "min": min(timings),
+                "median": median,
+                "mean": statistics.fmean(timings),
+                "chars_per_sec": len(text) / median if median else None
+            })
+            print(f"{name:<48} {size:>9}B  median {median * 1000:10.2f} ms  ({len(timings)} runs)", flush=True)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "llm_latency_ms": args.llm_latency,
+            "t5": bool(engine.model or engine.inference),
+            "tiny_models": args.tiny_models
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ {len(results)} results written to {args.output}")
+    return 0
+
+
+def compare_reports(baseline, current, threshold=0.10, min_delta=0.001):
+    """
+    Pair up results by (name, size) and classify the median change.
+
+    A case regresses when it is more than `threshold` slower and more than
+    `min_delta` seconds slower, so sub-millisecond noise never fails a run.
+
+    Returns:
+        list of dicts with name, size, both medians, ratio and status
+        ("regression", "improvement", "unchanged", "failed", "new" or "removed")
+    """
+    def index(report):
+        return {(r["name"], r["size"]): r for r in report["results"]}
+
+    base, cur = index(baseline), index(current)
+    rows = []
+    for key in sorted(set(base) | set(cur), key=lambda k: (k[1], k[0])):
+        old, new = base.get(key), cur.get(key)
+        row = {"name": key[0], "size": key[1], "baseline": old and old.get("median"), "current": new and new.get("median"), "ratio": None}
+        if old is None:
+            row["status"] = "new"
+        elif new is None:
+            row["status"] = "removed"
+        elif "error" in new or "error" in old:
+            row["status"] = "failed" if "error" in new else "new"
+        else:
+            row["ratio"] = new["median"] / old["median"] if old["median"] else None
+            delta = new["median"] - old["median"]
+            if row["ratio"] is not None and row["ratio"] > 1 + threshold and delta > min_delta:
+                row["status"] = "regression"
+            elif row["ratio"] is not None and row["ratio"] < 1 / (1 + threshold) and -delta > min_delta:
+                row["status"] = "improvement"
+            else:
+                row["status"] = "unchanged"
+        rows.append(row)
+    return rows
+
+
+def compare(args):
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare_reports(baseline, current, args.threshold, args.min_delta / 1000.0)
+    marks = {"regression": "✗", "improvement": "✓", "failed": "✗"}
+    for row in rows:
+        if row["status"] == "unchanged" and not args.verbose:
+            continue
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] else "-"
+        old = f"{row['baseline'] * 1000:.2f}" if row["baseline"] else "-"
+        new = f"{row['current'] * 1000:.2f}" if row["current"] else "-"
+        print(f"{marks.get(row['status'], ' ')} {row['name']:<48} {row['size']:>9}B  {old:>10} -> {new:>10} ms  {ratio:>7}  {row['status']}")
+
+    regressions = [row for row in rows if row["status"] in ("regression", "failed")]
+    print(f"{len(rows)} cases, {len(regressions)} regressed, "
+          f"{sum(row['status'] == 'improvement' for row in rows)} improved (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-pass and end-to-end benchmarks for the humanization pipeline.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save JSON results")
+    run_parser.add_argument("-o", "--output", default="benchmark_results.json")
+    run_parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated document sizes (default {DEFAULT_SIZES})")
+    run_parser.add_argument("--filter", help="regex on case names, e.g. 'pass_1[0-9]|humanize'")
+    run_parser.add_argument("--seed", type=int, default=1234)
+    run_parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend per case before stopping")
+    run_parser.add_argument("--max-runs", type=int, default=5)
+    run_parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated LLM latency in ms")
+    run_parser.add_argument("--with-perplexity", action="store_true", help="also time GPT-2 perplexity (loads GPT-2)")
+    run_parser.add_argument("--tiny-models", action="store_true", help="use the offline tiny-model fixtures (see benchmarks.tiny_models)")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files and flag regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    compare_parser.add_argument("--min-delta", type=float, default=1.0, help="ignore changes smaller than this many ms")
+    compare_parser.add_argument("-v", "--verbose", action="store_true", help="also list unchanged cases")
+
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Concurrency Stress Test
+Runs N threads over M inputs against ONE shared NeuralTextHumanizer and checks
+that nothing crashes and that no request's output leaks into another's.
+
+Every input gets a fixed seed, so its output is fully determined. The inputs
+are first run one at a time to get the expected outputs, then all of them are
+run again from N threads at once, in shuffled order, several rounds over. Any
+difference means shared state was touched by two calls at the same time.
+
+Run with:
+    python -m benchmarks.stress_concurrency --threads 8 --inputs 32
+Stealth levels below 5 with the Balanced tone keep the (non-deterministic)
+OpenRouter pass out of the comparison.
+"""
+import argparse
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+_SUBJECTS = (
+    "Artificial intelligence", "Renewable energy", "Remote work", "Urban planning",
+    "Modern education", "Digital privacy", "Climate policy", "Public health"
+)
+_SENTENCES = (
+    "{s} plays a crucial role in shaping the future of society.",
+    "It is important to note that {s} presents both opportunities and challenges.",
+    "Furthermore, stakeholders must carefully consider the implications of {s}.",
+    "Additionally, {s} has the potential to transform many industries.",
+    "In conclusion, a balanced approach to {s} is essential for sustainable progress.",
+    "Moreover, research indicates that {s} significantly impacts everyday life."
+)
+
+
+def build_inputs(count, seed=0):
+    """Deterministic AI-flavoured sample texts, some with several paragraphs."""
+    picker = random.Random(seed)
+    inputs = []
+    for _ in range(count):
+        paragraphs = []
+        for _ in range(picker.randint(1, 3)):
+            subject = picker.choice(_SUBJECTS)
+            sentences = picker.sample(_SENTENCES, picker.randint(2, 4))
+            paragraphs.append(" ".join(t.format(s=subject) for t in sentences))
+        inputs.append("\n".join(paragraphs))
+    return inputs
+
+
+def run_one(engine, text, seed, level):
+    return engine.humanize(text, stealth_level=level, seed=seed)
+
+
+def stress(engine, inputs, threads=8, rounds=3, level=3):
+    """
+    Returns:
+        dict with counts of runs, crashes and mismatches plus wall-clock times
+    """
+    seeds = [1000 + i for i in range(len(inputs))]
+
+    start_time = time.time()
+    expected = [run_one(engine, text, seed, level) for text, seed in zip(inputs, seeds)]
+    serial_time = time.time() - start_time
+
+    jobs = [i for _ in range(rounds) for i in range(len(inputs))]
+    random.Random(1).shuffle(jobs)
+
+    def job(i):
+        try:
+            return i, run_one(engine, inputs[i], seeds[i], level), None
+        except Exception:
+            return i, None, traceback.format_exc()
+
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(job, jobs))
+    concurrent_time = time.time() - start_time
+
+    crashes = [(i, error) for i, _, error in results if error]
+    mismatches = [i for i, output, error in results if not error and output != expected[i]]
+    return {
+        "runs": len(results),
+        "crashes": crashes,
+        "mismatches": mismatches,
+        "serial_time": serial_time,
+        "concurrent_time": concurrent_time
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrency stress test for NeuralTextHumanizer.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--inputs", type=int, default=24)
+    parser.add_argument("--rounds", type=int, default=3, help="times each input is repeated in the concurrent phase")
+    parser.add_argument("--level", type=int, default=3, help="stealth level (keep below 5 for deterministic runs)")
+    args = parser.parse_args(argv)
+
+    from transformer.neural import NeuralTextHumanizer
+    engine = NeuralTextHumanizer()
+
+    inputs = build_inputs(args.inputs)
+    report = stress(engine, inputs, threads=args.threads, rounds=args.rounds, level=args.level)
+
+    print(f"\n{'='*60}")
+    print(f"Runs: {report['runs']} on {args.threads} threads")
+    print(f"Serial pass: {report['serial_time']:.1f}s | Concurrent pass: {report['concurrent_time']:.1f}s")
+    print(f"Crashes: {len(report['crashes'])} | Cross-talk mismatches: {len(report['mismatches'])}")
+    for i, error in report["crashes"][:3]:
+        print(f"\n✗ Input {i} crashed:\n{error}")
+    if report["mismatches"]:
+        print(f"✗ Inputs with diverging output: {sorted(set(report['mismatches']))[:20]}")
+    print(f"{'='*60}")
+    return 1 if report["crashes"] or report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
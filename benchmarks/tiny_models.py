@@ -0,0 +1,152 @@
+"""
+Tiny Model Fixtures
+Builds randomly initialized T5, Pegasus and GPT-2 checkpoints a few hundred
+KB in size, with byte-level BPE tokenizers trained on synthetic text, so the
+model code paths (tokenize, generate, batched scoring) run offline in seconds.
+
+The outputs are noise; the shapes, special tokens and APIs match the real
+checkpoints, which is what batching, scheduling and quantization work needs.
+
+Run with:
+    python -m benchmarks.tiny_models -o benchmarks/fixtures/models
+    BLIZFLOW_MODEL_FIXTURES=benchmarks/fixtures/models python -m benchmarks.pipeline run --sizes 1k
+"""
+import argparse
+import json
+import os
+import sys
+
+from benchmarks.stress_concurrency import build_inputs
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "models")
+KINDS = ("t5", "pegasus", "gpt2")
+VOCAB_SIZE = 1024
+
+# Bump when the configs below change so stale fixtures get rebuilt
+FIXTURE_VERSION = 1
+
+_SEQ2SEQ_SPECIALS = ["<pad>", "</s>", "<unk>"]
+_GPT2_SPECIALS = ["<|endoftext|>"]
+
+
+def _training_corpus():
+    # The benchmark sentences plus plain ASCII so every common character has a merge
+    texts = build_inputs(256, seed=7)
+    texts.append(" ".join(chr(c) for c in range(32, 127)))
+    return texts
+
+
+def build_tokenizer(kind):
+    """Byte-level BPE wrapped as a fast tokenizer with the kind's special tokens."""
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, processors, trainers
+    from transformers import PreTrainedTokenizerFast
+
+    specials = _GPT2_SPECIALS if kind == "gpt2" else _SEQ2SEQ_SPECIALS
+    tokenizer = Tokenizer(models.BPE())
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=VOCAB_SIZE, special_tokens=specials, initial_alphabet=pre_tokenizers.ByteLevel.alphabet()
+    )
+    tokenizer.train_from_iterator(_training_corpus(), trainer=trainer)
+
+    if kind == "gpt2":
+        tokenizer.post_processor = processors.ByteLevel(trim_offsets=False)
+        return PreTrainedTokenizerFast(
+            tokenizer_object=tokenizer, bos_token="<|endoftext|>", eos_token="<|endoftext|>", unk_token="<|endoftext|>",
+            model_max_length=1024
+        )
+    # Like the real T5/Pegasus tokenizers: every sequence ends with </s>
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="$A </s>", pair="$A </s> $B </s>", special_tokens=[("</s>", tokenizer.token_to_id("</s>"))]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="<pad>", eos_token="</s>", unk_token="<unk>", model_max_length=512
+    )
+
+
+def build_model(kind, tokenizer):
+    """Randomly initialized model sized for speed, with ids taken from the tokenizer."""
+    import torch
+    from transformers import (
+        GPT2Config, GPT2LMHeadModel, PegasusConfig, PegasusForConditionalGeneration,
+        T5Config, T5ForConditionalGeneration
+    )
+
+    torch.manual_seed(0)
+    vocab_size = len(tokenizer)
+    if kind == "t5":
+        config = T5Config(
+            vocab_size=vocab_size, d_model=32, d_kv=8, d_ff=64, num_layers=2, num_decoder_layers=2, num_heads=4,
+            pad_token_id=tokenizer.pad_token_id, eos_token_id=tokenizer.eos_token_id,
+            decoder_start_token_id=tokenizer.pad_token_id
+        )
+        return T5ForConditionalGeneration(config)
+    if kind == "pegasus":
+        config = PegasusConfig(
+            vocab_size=vocab_size, d_model=32, encoder_layers=2, decoder_layers=2,
+            encoder_attention_heads=2, decoder_attention_heads=2, encoder_ffn_dim=64, decoder_ffn_dim=64,
+            max_position_embeddings=512, pad_token_id=tokenizer.pad_token_id, eos_token_id=tokenizer.eos_token_id,
+            decoder_start_token_id=tokenizer.pad_token_id, forced_eos_token_id=tokenizer.eos_token_id
+        )
+        return PegasusForConditionalGeneration(config)
+    if kind == "gpt2":
+        # Full 1024 positions: the perplexity scorer's window logic depends on it
+        config = GPT2Config(
+            vocab_size=vocab_size, n_positions=1024, n_embd=32, n_layer=2, n_head=2,
+            bos_token_id=tokenizer.bos_token_id, eos_token_id=tokenizer.eos_token_id
+        )
+        return GPT2LMHeadModel(config)
+    raise ValueError(f"Unknown fixture kind: {kind}")
+
+
+def _is_current(path):
+    marker = os.path.join(path, "fixture.json")
+    if not os.path.exists(marker):
+        return False
+    with open(marker, "r", encoding="utf-8") as f:
+        return json.load(f).get("version") == FIXTURE_VERSION
+
+
+def build_fixtures(out_dir=DEFAULT_DIR, kinds=KINDS, force=False):
+    """
+    Write <out_dir>/<kind>/ checkpoints loadable with from_pretrained().
+    Up-to-date fixtures are left alone unless force is set.
+
+    Returns:
+        out_dir, ready for BLIZFLOW_MODEL_FIXTURES
+    """
+    for kind in kinds:
+        path = os.path.join(out_dir, kind)
+        if not force and _is_current(path):
+            continue
+        tokenizer = build_tokenizer(kind)
+        model = build_model(kind, tokenizer)
+        os.makedirs(path, exist_ok=True)
+        tokenizer.save_pretrained(path)
+        model.save_pretrained(path)
+        with open(os.path.join(path, "fixture.json"), "w", encoding="utf-8") as f:
+            json.dump({"version": FIXTURE_VERSION, "kind": kind, "parameters": model.num_parameters()}, f)
+        print(f"✓ {kind}: {model.num_parameters():,} parameters → {path}")
+    return out_dir
+
+
+def use_fixtures(out_dir=DEFAULT_DIR):
+    """Build the fixtures if needed and point model_names at them for this process."""
+    os.environ["BLIZFLOW_MODEL_FIXTURES"] = build_fixtures(out_dir)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build tiny random T5/Pegasus/GPT-2 checkpoints for offline benchmarks.")
+    parser.add_argument("-o", "--output", default=DEFAULT_DIR)
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--force", action="store_true", help="rebuild even if the fixtures are up to date")
+    args = parser.parse_args(argv)
+    build_fixtures(args.output, [k.strip() for k in args.kinds.split(",") if k.strip()], force=args.force)
+    print(f"Use with: BLIZFLOW_MODEL_FIXTURES={args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,23 +11,15 @@ from transformer.neural import NeuralTextHumanizer
 from transformer.smart_system import SmartHumanizationOrchestrator
 from transformer.perplexity_analyzer import PerplexityAnalyzer, IterativeHumanizer
 from transformer.detector_tester import DetectorTester
+from transformer import readability_metrics
+from transformer import diff_engine
+from transformer import ingestion
+from transformer import request_log
 from nltk.tokenize import word_tokenize
-import difflib
 import time
-try:
-    import PyPDF2
-except ImportError:
-    PyPDF2 = None
 
-try:
-    import docx
-except ImportError:
-    docx = None
-
-try:
-    from readability import Readability
-except ImportError:
-    Readability = None
+# Idempotent, so Streamlit's reruns don't stack handlers
+request_log.configure()
 
 # --- CACHING FOR PERFORMANCE ---
 @st.cache_resource(show_spinner=False)
@@ -35,6 +27,10 @@ def load_neural_model():
     with st.spinner("🧠 Initializing BlizFlow AI... (First run may take a minute to download ~500MB)"):
         return NeuralTextHumanizer()
 
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_word_diff(original, revised):
+    return diff_engine.word_diff(original, revised)
+
 def main():
     """
     Main application entry point with polished UI.
@@ -476,22 +472,11 @@ def main():
     # --- FILE UPLOAD HANDLING ---
     if uploaded_file and not st.session_state.get('main_input_text', ''):
         try:
-            content = ""
-            if uploaded_file.type == "application/pdf":
-                if PyPDF2:
-                    reader = PyPDF2.PdfReader(uploaded_file)
-                    for page in reader.pages:
-                        content += page.extract_text() + "\n"
-                else:
-                    st.error("PDF processing library (PyPDF2) is not installed.")
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                if docx:
-                    doc = docx.Document(uploaded_file)
-                    for para in doc.paragraphs:
-                        content += para.text + "\n"
-                else:
-                    st.error("Word processing library (python-docx) is not installed.")
-            
+            # Paragraphs are streamed out of the file and joined once, with
+            # wrapped PDF lines and hyphenation already repaired
+            with st.spinner(f"Reading '{uploaded_file.name}'..."):
+                content = ingestion.read_document(uploaded_file, uploaded_file.name, uploaded_file.type)
+
             if content:
                 st.session_state["main_input_text"] = content
                 st.toast("Document content loaded successfully!")
@@ -518,10 +503,16 @@ def main():
         )
         st.session_state["main_input_text"] = user_text
 
-        # Real-time AI Detection for Input
+        # Real-time AI Detection for Input (only re-analyzed when the text changes,
+        # and then only the edited paragraphs)
         if user_text:
-            tester = DetectorTester()
-            results = tester.test_with_local_heuristics(user_text)
+            if st.session_state.get("live_audit_text") != user_text:
+                if "live_feature_cache" not in st.session_state:
+                    st.session_state.live_feature_cache = {}
+                tester = DetectorTester()
+                st.session_state.live_audit = tester.test_with_paragraph_cache(user_text, st.session_state.live_feature_cache)
+                st.session_state.live_audit_text = user_text
+            results = st.session_state.live_audit
             prob = results['ai_probability']
             
             # Premium AI Audit Card
@@ -612,37 +603,36 @@ def main():
 
             # Diff View
             with st.expander("🔍 View Changes (Visual Diff)"):
-                d = difflib.HtmlDiff()
-                diff_table = d.make_table(user_text.splitlines(), st.session_state.result.splitlines())
-                st.markdown(f'<div style="overflow-x:auto;">{diff_table}</div>', unsafe_allow_html=True)
+                # Streamlit runs expander bodies even when collapsed, so the diff
+                # is only computed (once per input/result pair) behind this toggle
+                if st.toggle("Show word-level changes", key="show_visual_diff"):
+                    diff = compute_word_diff(user_text, st.session_state.result)
+                    st.caption(f"➖ {diff['deleted_words']} words removed · ➕ {diff['inserted_words']} words added")
+                    page = 1
+                    if len(diff["pages"]) > 1:
+                        page = st.number_input("Page", min_value=1, max_value=len(diff["pages"]), value=1, key="visual_diff_page")
+                    page_html = diff_engine.render_page(diff, page - 1)
+                    st.markdown(f'<div style="overflow-x:auto; line-height: 1.7;">{page_html}</div>', unsafe_allow_html=True)
                     
         else:
             st.info("Humanized variation will appear here after clicking the button below.")
     st.markdown('</div>', unsafe_allow_html=True)
 
     # --- READABILITY DASHBOARD ---
-    if st.session_state.result and Readability:
+    if st.session_state.result:
         st.markdown("### 📊 Readability Dashboard")
-        try:
-            r = Readability(st.session_state.result)
-            fk = r.flesch_kincaid()
-            ease = r.flesch()
-            gunning = r.gunning_fog()
-            
-            r_col1, r_col2, r_col3 = st.columns(3)
-            with r_col1:
-                st.metric("Grade Level", fk.grade_level)
-                st.caption("Flesch-Kincaid Grade")
-            with r_col2:
-                st.metric("Reading Ease", f"{ease.score:.1f}")
-                st.caption(ease.ease)
-            with r_col3:
-                st.metric("Gunning Fog", f"{gunning.score:.1f}")
-                st.caption(f"Level: {gunning.grade_level}")
-        except:
-            st.caption("Readability metrics unavailable for very short text.")
-    elif st.session_state.result and not Readability:
-        st.caption("📊 Readability Dashboard unavailable (library not found).")
+        metrics = readability_metrics.analyze(st.session_state.result)
+        
+        r_col1, r_col2, r_col3 = st.columns(3)
+        with r_col1:
+            st.metric("Grade Level", f"{metrics['flesch_kincaid_grade']:.1f}")
+            st.caption("Flesch-Kincaid Grade")
+        with r_col2:
+            st.metric("Reading Ease", f"{metrics['flesch_reading_ease']:.1f}")
+            st.caption(metrics['flesch_ease'].replace("_", " ").title())
+        with r_col3:
+            st.metric("Gunning Fog", f"{metrics['gunning_fog']:.1f}")
+            st.caption(f"Level: {round(metrics['gunning_fog'])}")
 
     # --- SIDEBAR HISTORY ---
     with st.sidebar:
@@ -762,7 +752,7 @@ def process_text(text, mode, stealth_level, use_artifacts, tone, audience, prese
                 iterative_sys = IterativeHumanizer(neural_engine, analyzer)
                 
                 # Iterative humanization
-                result = iterative_sys.iterative_humanize(text, target_perplexity=80, max_iterations=3, tone=tone, audience=audience, preserve_formatting=preserve_formatting, use_emojis=use_emojis)
+                result = iterative_sys.iterative_humanize(text, target_perplexity=80, max_iterations=3, tone=tone, audience=audience, preserve_formatting=preserve_formatting, use_emojis=use_emojis, strategy="best_of_n", n_candidates=4)
                 transformed_text = result["text"]
                 
                 # Show metrics
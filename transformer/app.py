@@ -7,6 +7,8 @@ import spacy
 from nltk.tokenize import word_tokenize
 from nltk.corpus import wordnet
 from sentence_transformers import SentenceTransformer, util
+from .inference_client import InferenceClient
+from .model_names import model_name as default_model_name
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 
@@ -44,17 +46,20 @@ class AcademicTextHumanizer:
 
     def __init__(
         self,
-        model_name='paraphrase-MiniLM-L6-v2',
+        model_name=None,
         p_passive=0.2,
         p_synonym_replacement=0.3,
         p_academic_transition=0.3,
-        seed=None
+        seed=None,
+        inference_client=None
     ):
-        if seed is not None:
-            random.seed(seed)
+        # Own generator: seeding one instance must not reseed everyone else's
+        self.rng = random.Random(seed)
 
         self.nlp = spacy.load("en_core_web_sm")
-        self.model = SentenceTransformer(model_name)
+        # MiniLM embeddings come from the shared inference server when configured
+        self.inference = InferenceClient.resolve(inference_client)
+        self.model = None if self.inference else SentenceTransformer(model_name or default_model_name("minilm"))
 
         # Transformation probabilities
         self.p_passive = p_passive
@@ -78,15 +83,15 @@ class AcademicTextHumanizer:
             sentence_str = self.expand_contractions(sentence_str)
 
             # 2. Possibly add academic transitions
-            if random.random() < self.p_academic_transition:
+            if self.rng.random() < self.p_academic_transition:
                 sentence_str = self.add_academic_transitions(sentence_str)
 
             # 3. Optionally convert to passive
-            if use_passive and random.random() < self.p_passive:
+            if use_passive and self.rng.random() < self.p_passive:
                 sentence_str = self.convert_to_passive(sentence_str)
 
             # 4. Optionally replace words with synonyms
-            if use_synonyms and random.random() < self.p_synonym_replacement:
+            if use_synonyms and self.rng.random() < self.p_synonym_replacement:
                 sentence_str = self.replace_with_synonyms(sentence_str)
 
             transformed_sentences.append(sentence_str)
@@ -123,7 +128,7 @@ class AcademicTextHumanizer:
         return result
 
     def add_academic_transitions(self, sentence):
-        transition = random.choice(self.academic_transitions)
+        transition = self.rng.choice(self.academic_transitions)
         return f"{transition} {sentence}"
 
     def convert_to_passive(self, sentence):
@@ -152,7 +157,7 @@ class AcademicTextHumanizer:
         for token in doc:
             # Only replace content words (ADJ, NOUN, VERB, ADV) that aren't part of common phrases
             if token.pos_ in ['ADJ', 'NOUN', 'VERB', 'ADV'] and not token.is_stop:
-                if random.random() < 0.3:  # Reduced probability per word
+                if self.rng.random() < 0.3:  # Reduced probability per word
                     synonyms = self._get_synonyms(token.text, token.tag_)
                     if synonyms:
                         best_synonym = self._select_closest_synonym(token.text, synonyms)
@@ -185,13 +190,18 @@ class AcademicTextHumanizer:
                 lemma_name = lemma.name().replace('_', ' ')
                 if lemma_name.lower() != word.lower():
                     synonyms.add(lemma_name)
-        return list(synonyms)
+        # Sorted so ties in the similarity ranking don't depend on PYTHONHASHSEED
+        return sorted(synonyms)
 
     def _select_closest_synonym(self, original_word, synonyms):
         if not synonyms:
             return None
-        original_emb = self.model.encode(original_word, convert_to_tensor=True)
-        synonym_embs = self.model.encode(synonyms, convert_to_tensor=True)
+        if self.inference:
+            embeddings = self.inference.encode([original_word] + synonyms)
+            original_emb, synonym_embs = embeddings[0], embeddings[1:]
+        else:
+            original_emb = self.model.encode(original_word, convert_to_tensor=True)
+            synonym_embs = self.model.encode(synonyms, convert_to_tensor=True)
         cos_scores = util.cos_sim(original_emb, synonym_embs)[0]
         max_score_index = cos_scores.argmax().item()
         max_score = cos_scores[max_score_index].item()
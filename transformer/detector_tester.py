@@ -2,9 +2,19 @@
 Real-Time AI Detector Testing
 Tests text against actual AI detectors via APIs.
 """
+import hashlib
 import requests
 import time
-import re
+import numpy as np
+from .text_features import (
+    extract_features, extract_features_batch, merge_features, split_paragraph_chunks
+)
+
+# Order of the heuristic checks (columns of the batch check matrix)
+HEURISTIC_CHECKS = (
+    "sentence_variance_check", "first_person_check", "informal_language_check",
+    "imperfection_check", "ai_words_check"
+)
 
 class DetectorTester:
     """
@@ -28,69 +38,46 @@ class DetectorTester:
         """
         Use local heuristics to estimate AI probability.
         """
-        import nltk
-        
-        score = 0
-        total_checks = 0
-        
-        sentences = nltk.sent_tokenize(text)
-        
-        # Check 1: Sentence length variance
-        if sentences:
-            lengths = [len(s.split()) for s in sentences]
-            variance = sum((l - sum(lengths)/len(lengths))**2 for l in lengths) / len(lengths)
-            std_dev = variance ** 0.5
-            
-            # High variance = more human
-            if std_dev > 8:
-                score += 1
-            total_checks += 1
-        
-        # Check 2: First-person pronouns
-        text_lower = text.lower()
-        first_person_count = sum([
-            text_lower.count(" i "),
-            text_lower.count(" me "),
-            text_lower.count(" my "),
-            text_lower.count(" we ")
-        ])
-        
-        # More first-person = more human
-        if first_person_count > 2:
-            score += 1
-        total_checks += 1
-        
-        # Check 3: Informal language
-        informal_markers = [
-            "lol", "haha", "tbh", "honestly", "like,", "you know,",
-            "i mean,", "basically,", "kind of", "sort of"
-        ]
-        informal_count = sum(text_lower.count(m) for m in informal_markers)
-        
-        if informal_count > 0:
-            score += 1
-        total_checks += 1
-        
-        # Check 4: Imperfections
-        has_double_space = "  " in text
-        has_missing_comma = re.search(r'\w,\w', text) is not None
-        has_casual_start = any(text.startswith(w) for w in ["And ", "But ", "So "])
-        
-        if has_double_space or has_missing_comma or has_casual_start:
-            score += 1
-        total_checks += 1
-        
-        # Check 5: Avoid AI transition words
-        ai_words = [
-            "furthermore", "moreover", "additionally", "consequently",
-            "therefore", "thus", "hence", "notably"
-        ]
-        ai_word_count = sum(text_lower.count(w) for w in ai_words)
-        
-        # Fewer AI words = more human
-        if ai_word_count == 0:
-            score += 1
-        total_checks += 1
+        return self.score_features(extract_features(text))
+
+    def test_with_paragraph_cache(self, text, cache):
+        """
+        Local heuristics with a per-paragraph feature cache.
+
+        `cache` maps a paragraph's content hash to its features; only new or
+        edited paragraphs are analyzed and the cache is pruned to the current
+        paragraphs, so it never outgrows the text.
+        """
+        chunks = split_paragraph_chunks(text)
+        keys = [hashlib.sha1(chunk.encode("utf-8")).hexdigest() for chunk in chunks]
+        current = {}
+        for key, chunk in zip(keys, chunks):
+            current[key] = cache[key] if key in cache else extract_features(chunk)
+        cache.clear()
+        cache.update(current)
+        return self.score_features(merge_features([current[key] for key in keys]))
+
+    def score_features(self, features):
+        """
+        Turn an extract_features() vector into the local heuristic verdict.
+        """
+        checks = {
+            # Check 1: Sentence length variance (high variance = more human)
+            "sentence_variance_check": features["sentence_length_std"] > 8,
+            # Check 2: First-person pronouns (more first-person = more human)
+            "first_person_check": features["first_person_count"] > 2,
+            # Check 3: Informal language
+            "informal_language_check": features["informal_count"] > 0,
+            # Check 4: Imperfections
+            "imperfection_check": (
+                features["has_double_space"] or features["has_missing_comma"] or features["has_casual_start"]
+            ),
+            # Check 5: Avoid AI transition words (fewer AI words = more human)
+            "ai_words_check": features["ai_word_count"] == 0
+        }
+        # The variance check only counts when there is at least one sentence
+        total_checks = len(checks) if features["sentence_count"] else len(checks) - 1
+        score = sum(1 for passed in checks.values() if passed)
         
         # Calculate final score
         human_probability = (score / total_checks) * 100
@@ -101,14 +88,44 @@ class DetectorTester:
             "ai_probability": ai_probability,
             "human_probability": human_probability,
             "confidence": "medium",
-            "details": {
-                "sentence_variance_check": "✓" if std_dev > 8 else "✗",
-                "first_person_check": "✓" if first_person_count > 2 else "✗",
-                "informal_language_check": "✓" if informal_count > 0 else "✗",
-                "imperfection_check": "✓" if (has_double_space or has_missing_comma or has_casual_start) else "✗",
-                "ai_words_check": "✓" if ai_word_count == 0 else "✗"
-            }
+            "details": {name: "✓" if passed else "✗" for name, passed in checks.items()}
         }
+
+    def score_heuristics_batch(self, texts):
+        """
+        Local heuristic verdicts for many texts at once.
+
+        Features come from extract_features_batch() and the checks are
+        evaluated as one boolean matrix.
+
+        Returns:
+            list of dicts shaped like test_with_local_heuristics()
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        features = extract_features_batch(texts)
+
+        checks = np.column_stack([
+            features["sentence_length_std"] > 8,
+            features["first_person_count"] > 2,
+            features["informal_count"] > 0,
+            features["has_double_space"] | features["has_missing_comma"] | features["has_casual_start"],
+            features["ai_word_count"] == 0
+        ])
+        total_checks = np.where(features["sentence_count"] > 0, checks.shape[1], checks.shape[1] - 1)
+        human_probability = checks.sum(axis=1) / total_checks * 100
+
+        results = []
+        for row, human in zip(checks.tolist(), human_probability.tolist()):
+            results.append({
+                "detector": "Local Heuristics",
+                "ai_probability": 100 - human,
+                "human_probability": human,
+                "confidence": "medium",
+                "details": {name: "✓" if passed else "✗" for name, passed in zip(HEURISTIC_CHECKS, row)}
+            })
+        return results
     
     def recommend_improvements(self, result):
         """
@@ -0,0 +1,263 @@
+"""
+Word-Level Diff Engine
+Patience diff over word-token ids with a bounded Myers fallback, plus paged
+HTML rendering for the Visual Diff view.
+"""
+import html
+import re
+from bisect import bisect_left
+from collections import Counter
+
+# A word or punctuation mark together with the whitespace that follows it
+_TOKEN_RE = re.compile(r"(\w+|[^\w\s])\s*")
+
+# Myers keeps one frontier per edit step; past this many edits a gap is
+# reported as a plain replacement instead of being aligned token by token
+MAX_EDIT_DISTANCE = 2000
+
+# Rendered tokens per page of the HTML view
+PAGE_SIZE = 1500
+
+_DELETE_STYLE = "background: rgba(239, 68, 68, 0.15); color: #b91c1c; text-decoration: line-through;"
+_INSERT_STYLE = "background: rgba(34, 197, 94, 0.18); color: #15803d; text-decoration: none;"
+
+
+def tokenize(text):
+    """
+    Split text into (key, surface) tokens: the key is the word or punctuation
+    mark that gets compared, the surface keeps its trailing whitespace.
+    """
+    return [(m.group(1), m.group(0)) for m in _TOKEN_RE.finditer(text)]
+
+
+def diff_sequences(a, b):
+    """
+    Diff two sequences of hashable items.
+
+    Returns:
+        difflib-style opcodes: (tag, i1, i2, j1, j2) with tag in
+        "equal", "delete", "insert", "replace"
+    """
+    raw = []
+    _diff_range(a, b, 0, len(a), 0, len(b), raw)
+    return _coalesce(raw)
+
+
+def _diff_range(a, b, alo, ahi, blo, bhi, out):
+    # Common prefix and suffix
+    start_a, start_b = alo, blo
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        alo += 1
+        blo += 1
+    if alo > start_a:
+        out.append(("equal", start_a, alo, start_b, blo))
+    end_a, end_b = ahi, bhi
+    while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+
+    if alo == ahi or blo == bhi:
+        if alo < ahi:
+            out.append(("delete", alo, ahi, blo, blo))
+        if blo < bhi:
+            out.append(("insert", alo, alo, blo, bhi))
+    else:
+        anchors = _unique_common(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            i, j = alo, blo
+            for ai, bj in anchors:
+                _diff_range(a, b, i, ai, j, bj, out)
+                out.append(("equal", ai, ai + 1, bj, bj + 1))
+                i, j = ai + 1, bj + 1
+            _diff_range(a, b, i, ahi, j, bhi, out)
+        else:
+            _myers(a, b, alo, ahi, blo, bhi, out)
+
+    if ahi < end_a:
+        out.append(("equal", ahi, end_a, bhi, end_b))
+
+
+def _unique_common(a, b, alo, ahi, blo, bhi):
+    """
+    Patience anchors: items occurring exactly once in both ranges, reduced to
+    the longest run that appears in the same order on both sides.
+    """
+    counts_a = Counter(a[alo:ahi])
+    counts_b = Counter(b[blo:bhi])
+    position_b = {b[j]: j for j in range(blo, bhi) if counts_b[b[j]] == 1}
+    pairs = [(i, position_b[a[i]]) for i in range(alo, ahi) if counts_a[a[i]] == 1 and a[i] in position_b]
+    if not pairs:
+        return []
+
+    # Longest increasing subsequence of the b positions (patience sorting)
+    pile_tops = []
+    pile_index = []
+    previous = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pile = bisect_left(pile_tops, j)
+        if pile == len(pile_tops):
+            pile_tops.append(j)
+            pile_index.append(idx)
+        else:
+            pile_tops[pile] = j
+            pile_index[pile] = idx
+        previous[idx] = pile_index[pile - 1] if pile else -1
+
+    anchors = []
+    idx = pile_index[-1]
+    while idx != -1:
+        anchors.append(pairs[idx])
+        idx = previous[idx]
+    anchors.reverse()
+    return anchors
+
+
+def _myers(a, b, alo, ahi, blo, bhi, out):
+    """Myers' O(ND) shortest edit script for a[alo:ahi] -> b[blo:bhi]."""
+    n, m = ahi - alo, bhi - blo
+    max_d = min(n + m, MAX_EDIT_DISTANCE)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+
+    for d in range(max_d + 1):
+        trace.append(v[offset - d:offset + d + 1])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                _myers_backtrack(trace, n, m, alo, blo, out)
+                return
+
+    # Too many edits to align cheaply: report the gap as one replacement
+    out.append(("delete", alo, ahi, blo, blo))
+    out.append(("insert", ahi, ahi, blo, bhi))
+
+
+def _myers_backtrack(trace, n, m, alo, blo, out):
+    steps = []
+    x, y = n, m
+    for d in range(len(trace) - 1, 0, -1):
+        # trace[d] is the frontier after step d - 1, diagonal k at index k + d
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1 + d] < v[k + 1 + d]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k + d]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            steps.append(("equal", x - 1, y - 1))
+            x -= 1
+            y -= 1
+        if x == prev_x:
+            steps.append(("insert", x, y - 1))
+        else:
+            steps.append(("delete", x - 1, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        steps.append(("equal", x - 1, y - 1))
+        x -= 1
+        y -= 1
+
+    for tag, i, j in reversed(steps):
+        if tag == "equal":
+            out.append(("equal", alo + i, alo + i + 1, blo + j, blo + j + 1))
+        elif tag == "delete":
+            out.append(("delete", alo + i, alo + i + 1, blo + j, blo + j))
+        else:
+            out.append(("insert", alo + i, alo + i, blo + j, blo + j + 1))
+
+
+def _coalesce(raw):
+    """Merge adjacent opcodes of one kind and fold delete+insert into replace."""
+    merged = []
+    for tag, i1, i2, j1, j2 in raw:
+        if i1 == i2 and j1 == j2:
+            continue
+        if merged:
+            last_tag, li1, li2, lj1, lj2 = merged[-1]
+            if last_tag == tag or (last_tag != "equal" and tag != "equal"):
+                new_tag = tag if last_tag == tag else "replace"
+                merged[-1] = (new_tag, li1, i2, lj1, j2)
+                continue
+        merged.append((tag, i1, i2, j1, j2))
+    return merged
+
+
+def _split_opcode(opcode, size):
+    tag, i1, i2, j1, j2 = opcode
+    if max(i2 - i1, j2 - j1) <= size:
+        return [opcode]
+    pieces = []
+    while i1 < i2 or j1 < j2:
+        pieces.append((tag, i1, min(i1 + size, i2), j1, min(j1 + size, j2)))
+        i1, j1 = min(i1 + size, i2), min(j1 + size, j2)
+    return pieces
+
+
+def word_diff(original, revised):
+    """
+    Word-level diff of two texts.
+
+    Returns:
+        dict with the token surfaces of both texts, the opcodes, page
+        boundaries for render_page() and word counts per change type
+    """
+    tokens_a = tokenize(original)
+    tokens_b = tokenize(revised)
+    # Compare small integer ids instead of strings
+    ids = {}
+    a = [ids.setdefault(key, len(ids)) for key, _ in tokens_a]
+    b = [ids.setdefault(key, len(ids)) for key, _ in tokens_b]
+    opcodes = diff_sequences(a, b)
+
+    # Cut long opcodes so no single one overflows a page
+    opcodes = [piece for opcode in opcodes for piece in _split_opcode(opcode, PAGE_SIZE)]
+
+    pages = []
+    page_start, page_tokens = 0, 0
+    for idx, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+        # Equal runs are rendered once, changes show both sides
+        page_tokens += (j2 - j1) if tag == "equal" else (i2 - i1) + (j2 - j1)
+        if page_tokens >= PAGE_SIZE:
+            pages.append((page_start, idx + 1))
+            page_start, page_tokens = idx + 1, 0
+    if page_start < len(opcodes) or not pages:
+        pages.append((page_start, len(opcodes)))
+
+    return {
+        "original": [surface for _, surface in tokens_a],
+        "revised": [surface for _, surface in tokens_b],
+        "opcodes": opcodes,
+        "pages": pages,
+        "deleted_words": sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag in ("delete", "replace")),
+        "inserted_words": sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag in ("insert", "replace"))
+    }
+
+
+def _html(surfaces):
+    return html.escape("".join(surfaces)).replace("\n", "<br>")
+
+
+def render_page(diff, page=0):
+    """Inline HTML for one page of a word_diff() result."""
+    start, end = diff["pages"][page]
+    parts = []
+    for tag, i1, i2, j1, j2 in diff["opcodes"][start:end]:
+        if tag == "equal":
+            parts.append(_html(diff["revised"][j1:j2]))
+            continue
+        if i2 > i1:
+            parts.append(f'<del style="{_DELETE_STYLE}">{_html(diff["original"][i1:i2])}</del>')
+        if j2 > j1:
+            parts.append(f'<ins style="{_INSERT_STYLE}">{_html(diff["revised"][j1:j2])}</ins>')
+    return "".join(parts)
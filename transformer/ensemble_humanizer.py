@@ -2,9 +2,17 @@
 Multi-Model Ensemble Humanizer
 Uses multiple paraphrasing models for superior results.
 """
-import random
 from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
+import logging
+import random
+import threading
 import torch
+from . import readability_metrics
+from . import random_context
+from .model_names import model_name
+from .random_context import rng
+
+logger = logging.getLogger(__name__)
 
 class EnsembleHumanizer:
     """
@@ -14,33 +22,35 @@ class EnsembleHumanizer:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.models = []
+        # Serializes seeding + generate + decode across threads
+        self._lock = threading.Lock()
         
         # Load multiple paraphrase models
-        print("Loading ensemble models...")
+        logger.info("Loading ensemble models...")
         
         try:
             # Model 1: T5-based paraphraser
-            print("  Loading T5 paraphraser...")
+            logger.info("Loading T5 paraphraser...")
             self.models.append({
                 "name": "T5-Paraphrase",
-                "tokenizer": AutoTokenizer.from_pretrained("Vamsi/T5_Paraphrase_Paws"),
-                "model": AutoModelForSeq2SeqLM.from_pretrained("Vamsi/T5_Paraphrase_Paws").to(self.device)
+                "tokenizer": AutoTokenizer.from_pretrained(model_name("t5")),
+                "model": AutoModelForSeq2SeqLM.from_pretrained(model_name("t5")).to(self.device)
             })
         except Exception as e:
-            print(f"  Failed to load T5: {e}")
+            logger.warning("Failed to load T5: %s", e)
         
         try:
             # Model 2: Pegasus paraphraser
-            print("  Loading Pegasus paraphraser...")
+            logger.info("Loading Pegasus paraphraser...")
             self.models.append({
                 "name": "Pegasus",
-                "tokenizer": AutoTokenizer.from_pretrained("tuner007/pegasus_paraphrase"),
-                "model": AutoModelForSeq2SeqLM.from_pretrained("tuner007/pegasus_paraphrase").to(self.device)
+                "tokenizer": AutoTokenizer.from_pretrained(model_name("pegasus")),
+                "model": AutoModelForSeq2SeqLM.from_pretrained(model_name("pegasus")).to(self.device)
             })
         except Exception as e:
-            print(f"  Failed to load Pegasus: {e}")
+            logger.warning("Failed to load Pegasus: %s", e)
         
-        print(f"✓ Loaded {len(self.models)} models")
+        logger.info("Loaded %s models", len(self.models))
     
     def paraphrase_with_model(self, text, model_info, num_variations=3):
         """
@@ -50,36 +60,40 @@ class EnsembleHumanizer:
             tokenizer = model_info["tokenizer"]
             model = model_info["model"]
             
-            # Tokenize
-            inputs = tokenizer(
-                f"paraphrase: {text}",
-                return_tensors="pt",
-                max_length=512,
-                truncation=True
-            ).to(self.device)
-            
-            # Generate variations
-            outputs = model.generate(
-                **inputs,
-                max_length=512,
-                num_return_sequences=num_variations,
-                num_beams=num_variations,
-                temperature=1.5,
-                do_sample=True,
-                top_k=50,
-                top_p=0.95,
-                no_repeat_ngram_size=3
-            )
-            
-            # Decode
-            variations = [
-                tokenizer.decode(output, skip_special_tokens=True)
-                for output in outputs
-            ]
+            sampling_seed = random_context.torch_seed()
+            with self._lock:
+                # Tokenize
+                inputs = tokenizer(
+                    f"paraphrase: {text}",
+                    return_tensors="pt",
+                    max_length=512,
+                    truncation=True
+                ).to(self.device)
+            
+                # Generate variations
+                if sampling_seed is not None:
+                    torch.manual_seed(sampling_seed)
+                outputs = model.generate(
+                    **inputs,
+                    max_length=512,
+                    num_return_sequences=num_variations,
+                    num_beams=num_variations,
+                    temperature=1.5,
+                    do_sample=True,
+                    top_k=50,
+                    top_p=0.95,
+                    no_repeat_ngram_size=3
+                )
+            
+                # Decode
+                variations = [
+                    tokenizer.decode(output, skip_special_tokens=True)
+                    for output in outputs
+                ]
             
             return variations
         except Exception as e:
-            print(f"  Error with {model_info['name']}: {e}")
+            logger.warning("Error with %s: %s", model_info['name'], e)
             return [text]
     
     def ensemble_paraphrase(self, text, num_variations=5):
@@ -87,10 +101,10 @@ class EnsembleHumanizer:
         Generate multiple variations using all models and pick best.
         """
         if not self.models:
-            print("  No models available")
+            logger.debug("No models available")
             return text
         
-        print(f"  Generating {num_variations} variations with ensemble...")
+        logger.debug("Generating %s variations with ensemble...", num_variations)
         
         all_variations = []
         
@@ -100,14 +114,15 @@ class EnsembleHumanizer:
             all_variations.extend(variations)
         
         # Remove duplicates and original
-        unique_variations = list(set([v for v in all_variations if v != text]))
+        # Sorted so seeded draws don't depend on PYTHONHASHSEED
+        unique_variations = sorted(set(v for v in all_variations if v != text))
         
         if not unique_variations:
             return text
         
         # Pick one randomly (introduces randomness)
-        selected = random.choice(unique_variations)
-        print(f"  ✓ Selected variation from {len(unique_variations)} options")
+        selected = rng.choice(unique_variations)
+        logger.debug("Selected variation from %s options", len(unique_variations))
         
         return selected
 
@@ -123,8 +138,30 @@ class MarkovTextBlender:
             self.markovify = markovify
             self.enabled = True
         except ImportError:
-            print("Markovify not available")
+            logger.info("Markovify not available")
             self.enabled = False
+        # Chains are built once per corpus and only read afterwards
+        self._models = {}
+        # markovify samples from the global random module, so sampling is
+        # serialized and runs on a generator state seeded from the call's stream
+        self._lock = threading.Lock()
+
+    def _model_for(self, corpus_text):
+        with self._lock:
+            model = self._models.get(corpus_text)
+            if model is None:
+                model = self.markovify.Text(corpus_text, state_size=2)
+                self._models[corpus_text] = model
+            return model
+
+    def _make_sentences(self, model, count):
+        with self._lock:
+            saved_state = random.getstate()
+            random.seed(rng.getrandbits(64))
+            try:
+                return [s for s in (model.make_sentence(tries=100) for _ in range(count)) if s]
+            finally:
+                random.setstate(saved_state)
     
     def blend_with_corpus(self, text, corpus_text=None):
         """
@@ -146,15 +183,11 @@ Not in a dramatic way or anything, just in a practical sense.
             """
         
         try:
-            # Build Markov model from corpus
-            model = self.markovify.Text(corpus_text, state_size=2)
+            # Markov model for this corpus (built on first use)
+            model = self._model_for(corpus_text)
             
             # Generate some sentences
-            markov_sentences = []
-            for _ in range(3):
-                sentence = model.make_sentence(tries=100)
-                if sentence:
-                    markov_sentences.append(sentence)
+            markov_sentences = self._make_sentences(model, 3)
             
             if not markov_sentences:
                 return text
@@ -165,15 +198,15 @@ Not in a dramatic way or anything, just in a practical sense.
             
             # Insert 1-2 Markov sentences
             for markov_sent in markov_sentences[:2]:
-                insert_pos = random.randint(0, len(original_sentences))
+                insert_pos = rng.randint(0, len(original_sentences))
                 original_sentences.insert(insert_pos, markov_sent)
             
             blended = " ".join(original_sentences)
-            print(f"  ✓ Blended with Markov-generated text")
+            logger.debug("Blended with Markov-generated text")
             return blended
             
         except Exception as e:
-            print(f"  Markov blending failed: {e}")
+            logger.warning("Markov blending failed: %s", e)
             return text
 
 
@@ -186,43 +219,23 @@ class StatisticalAnalyzer:
         """
         Analyze readability scores.
         """
-        try:
-            from readability import Readability
-            r = Readability(text)
-            
-            flesch = r.flesch()
-            gunning_fog = r.gunning_fog()
-            
-            return {
-                "flesch_score": flesch.score,
-                "gunning_fog": gunning_fog.score,
-                "grade_level": flesch.grade_level
-            }
-        except Exception as e:
-            print(f"  Readability analysis failed: {e}")
-            return None
+        metrics = readability_metrics.analyze(text)
+        return {
+            "flesch_score": metrics["flesch_reading_ease"],
+            "gunning_fog": metrics["gunning_fog"],
+            "grade_level": metrics["flesch_kincaid_grade"]
+        }
     
     def analyze_word_frequency(self, text):
         """
         Analyze word frequency distribution.
         """
-        try:
-            from wordfreq import word_frequency
-            import nltk
-            
-            words = nltk.word_tokenize(text.lower())
-            
-            # Calculate average word frequency
-            freqs = [word_frequency(w, 'en') for w in words if w.isalpha()]
-            avg_freq = sum(freqs) / len(freqs) if freqs else 0
-            
-            # AI text tends to use more common words (higher freq)
-            # Human text uses more varied vocabulary (lower freq)
-            
-            return {
-                "avg_word_frequency": avg_freq,
-                "human_score": 1.0 - min(avg_freq * 100, 1.0)  # Lower freq = more human
-            }
-        except Exception as e:
-            print(f"  Word frequency analysis failed: {e}")
-            return None
+        avg_freq = readability_metrics.analyze(text)["avg_word_frequency"]
+        
+        # AI text tends to use more common words (higher freq)
+        # Human text uses more varied vocabulary (lower freq)
+        
+        return {
+            "avg_word_frequency": avg_freq,
+            "human_score": 1.0 - min(avg_freq * 100, 1.0)  # Lower freq = more human
+        }
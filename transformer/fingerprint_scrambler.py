@@ -2,9 +2,12 @@
 Statistical Fingerprint Scrambler
 Makes text statistically unique to avoid document similarity detection.
 """
-import random
+import logging
 import re
 import nltk
+from .random_context import rng
+
+logger = logging.getLogger(__name__)
 
 class FingerprintScrambler:
     """
@@ -36,8 +39,8 @@ class FingerprintScrambler:
         for i, sent in enumerate(sentences):
             new_sents.append(sent)
             
-            if i > 0 and i % 5 == 0 and random.random() < 0.3:
-                anecdote = random.choice(anecdotes)
+            if i > 0 and i % 5 == 0 and rng.random() < 0.3:
+                anecdote = rng.choice(anecdotes)
                 # Create a mini personal story
                 story_endings = [
                     "it made sense to me.",
@@ -45,7 +48,7 @@ class FingerprintScrambler:
                     "things clicked.",
                     "I understood what they meant."
                 ]
-                full_anecdote = anecdote + random.choice(story_endings)
+                full_anecdote = anecdote + rng.choice(story_endings)
                 new_sents.append(full_anecdote)
         
         return " ".join(new_sents)
@@ -57,7 +60,7 @@ class FingerprintScrambler:
         # Random capitalization for emphasis (very human)
         words = text.split()
         for i in range(len(words)):
-            if random.random() < 0.03 and len(words[i]) > 4:
+            if rng.random() < 0.03 and len(words[i]) > 4:
                 words[i] = words[i].upper()
         
         text = " ".join(words)
@@ -68,8 +71,8 @@ class FingerprintScrambler:
         new_sents = []
         
         for sent in sentences:
-            if random.random() < 0.08:
-                sent = sent.rstrip('.!?') + " " + random.choice(emojis) + "."
+            if rng.random() < 0.08:
+                sent = sent.rstrip('.!?') + " " + rng.choice(emojis) + "."
             new_sents.append(sent)
         
         return " ".join(new_sents)
@@ -79,7 +82,7 @@ class FingerprintScrambler:
         Add unique writing quirks that are statistically rare.
         """
         # Double punctuation occasionally
-        text = re.sub(r'\.(\s+[A-Z])', lambda m: '.. ' + m.group(1) if random.random() < 0.05 else '. ' + m.group(1), text)
+        text = re.sub(r'\.(\s+[A-Z])', lambda m: '.. ' + m.group(1) if rng.random() < 0.05 else '. ' + m.group(1), text)
         
         # Add parenthetical asides
         sentences = nltk.sent_tokenize(text)
@@ -94,8 +97,8 @@ class FingerprintScrambler:
         ]
         
         for sent in sentences:
-            if random.random() < 0.10:
-                sent = sent.rstrip('.!?') + random.choice(asides) + "."
+            if rng.random() < 0.10:
+                sent = sent.rstrip('.!?') + rng.choice(asides) + "."
             new_sents.append(sent)
         
         return " ".join(new_sents)
@@ -104,21 +107,21 @@ class FingerprintScrambler:
         """
         Apply maximum scrambling to create unique statistical fingerprint.
         """
-        print(f"\n→ Scrambling statistical fingerprint (Level: {level})...")
+        logger.debug("Scrambling statistical fingerprint (Level: %s)...", level)
         
         if level >= 3:
             text = self.add_personal_anecdotes(text, level=level)
-            print(f"  ✓ Personal anecdotes added")
+            logger.debug("Personal anecdotes added")
         
         if level >= 4:
             text = self.extreme_style_variation(text)
-            print(f"  ✓ Extreme style variations applied")
+            logger.debug("Extreme style variations applied")
         
         if level >= 5:
             text = self.inject_unique_quirks(text)
-            print(f"  ✓ Unique quirks injected")
+            logger.debug("Unique quirks injected")
         
-        print(f"  ✓ Fingerprint scrambling complete")
+        logger.debug("Fingerprint scrambling complete")
         return text
 
 
@@ -144,7 +147,7 @@ class SemanticShuffler:
                 middle = sentences[1:-1]
                 
                 # Shuffle middle sentences
-                random.shuffle(middle)
+                rng.shuffle(middle)
                 
                 new_para = " ".join([topic] + middle + [conclusion])
                 new_paragraphs.append(new_para)
@@ -170,8 +173,8 @@ class SemanticShuffler:
         
         for i, sent in enumerate(sentences):
             # Occasionally add detour
-            if i > 2 and random.random() < 0.12:
-                new_sents.append(random.choice(detours) + sent)
+            if i > 2 and rng.random() < 0.12:
+                new_sents.append(rng.choice(detours) + sent)
             else:
                 new_sents.append(sent)
         
@@ -181,15 +184,15 @@ class SemanticShuffler:
         """
         Apply semantic shuffling.
         """
-        print(f"\n→ Semantic shuffling (Aggressiveness: {aggressiveness})...")
+        logger.debug("Semantic shuffling (Aggressiveness: %s)...", aggressiveness)
         
         if aggressiveness >= 3:
             text = self.shuffle_supporting_details(text)
-            print(f"  ✓ Details reordered")
+            logger.debug("Details reordered")
         
         if aggressiveness >= 4:
             text = self.add_conversational_detours(text)
-            print(f"  ✓ Conversational detours added")
+            logger.debug("Conversational detours added")
         
-        print(f"  ✓ Semantic shuffling complete")
+        logger.debug("Semantic shuffling complete")
         return text
@@ -0,0 +1,72 @@
+"""
+Thin client for the local inference server (transformer/inference_server.py).
+Engines use it in place of their own T5 / GPT-2 / MiniLM copies when
+BLIZFLOW_INFERENCE_URL is set.
+"""
+import os
+import requests
+
+
+class InferenceClient:
+    """
+    Sends generate/score/encode calls to a shared inference server.
+    """
+
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    @classmethod
+    def from_env(cls):
+        """Build a client from BLIZFLOW_INFERENCE_URL, or return None if unset."""
+        url = os.getenv("BLIZFLOW_INFERENCE_URL", "").strip()
+        return cls(url) if url else None
+
+    @classmethod
+    def resolve(cls, client):
+        """
+        Normalize an engine's inference_client argument.
+        None -> use the environment, False -> force local models, else as given.
+        """
+        if client is False:
+            return None
+        if client is None:
+            return cls.from_env()
+        return client
+
+    def paraphrase(self, sentences, temperature=1.0):
+        """T5 paraphrases for a list of sentences."""
+        if not sentences:
+            return []
+        return self._post("/generate", {"texts": list(sentences), "temperature": temperature})["outputs"]
+
+    def perplexity(self, texts):
+        """GPT-2 perplexity for each text (nan when a text is too short to score)."""
+        if not texts:
+            return []
+        perplexities = self._post("/score", {"texts": list(texts)})["perplexities"]
+        return [float("nan") if p is None else p for p in perplexities]
+
+    def score(self, texts, include_tokens=False):
+        """Detailed GPT-2 scores (see PerplexityAnalyzer.score_texts)."""
+        if not texts:
+            return []
+        payload = {"texts": list(texts), "include_tokens": include_tokens}
+        results = self._post("/score/detail", payload)["results"]
+        for result in results:
+            for item in [result] + result.get("sentences", []):
+                if item["perplexity"] is None:
+                    item["perplexity"] = float("nan")
+        return results
+
+    def encode(self, texts):
+        """MiniLM embeddings (lists of floats) for each text."""
+        if not texts:
+            return []
+        return self._post("/encode", {"texts": list(texts)})["embeddings"]
+
+    def _post(self, path, payload):
+        response = requests.post(self.base_url + path, json=payload, timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"Inference server error {response.status_code}: {response.text[:200]}")
+        return response.json()
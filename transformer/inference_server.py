@@ -0,0 +1,289 @@
+"""
+Local Inference Server
+Owns the T5, GPT-2 and MiniLM models in one process and gathers concurrent
+generate/score/encode calls from every client into micro-batches.
+
+Run with:
+    python -m transformer.inference_server
+and point clients at it with BLIZFLOW_INFERENCE_URL=http://127.0.0.1:8001
+"""
+import logging
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List
+
+import torch
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from . import metrics
+from . import request_log
+from .model_names import model_name
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent submissions into micro-batches.
+    A batch is flushed once it holds max_batch_size items or once the oldest
+    item has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, name, handler, max_batch_size=16, max_wait_ms=10):
+        self.name = name
+        self.handler = handler
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.batches_run = 0
+        self.items_run = 0
+        self._queue = queue.Queue()
+        metrics.QUEUE_DEPTH.labels(name).set_function(self.queue_depth)
+        self._thread = threading.Thread(target=self._worker, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result."""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def submit_many(self, items):
+        """Queue several items and block until all of their results are in."""
+        futures = [self.submit(item) for item in items]
+        return [f.result() for f in futures]
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._run(batch)
+
+    def _run(self, batch):
+        items = [item for item, _ in batch]
+        try:
+            results = self.handler(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # One bad item must not fail its batch-mates from other requests:
+                # rerun them one by one so only the culprit gets the error
+                logger.warning("%s batch of %s failed (%s); retrying items individually", self.name, len(batch), e)
+                for item, future in batch:
+                    if future.done():
+                        continue
+                    try:
+                        future.set_result(self.handler([item])[0])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+        self.batches_run += 1
+        self.items_run += len(batch)
+
+
+class ModelHost:
+    """
+    Loads each model once and exposes batched handlers for the micro-batchers.
+    """
+
+    def __init__(self, t5_name=None, encoder_name=None, device=None):
+        t5_name = t5_name or model_name("t5")
+        encoder_name = encoder_name or model_name("minilm")
+        self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
+        logger.info("Loading inference models on %s...", self.device)
+
+        try:
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+            self.t5_tokenizer = AutoTokenizer.from_pretrained(t5_name)
+            self.t5_model = AutoModelForSeq2SeqLM.from_pretrained(t5_name).to(self.device)
+            self.t5_model.eval()
+            metrics.MODEL_MEMORY.labels("t5").set(metrics.model_memory_bytes(self.t5_model))
+            logger.info("T5 paraphraser ready")
+        except Exception as e:
+            logger.warning("T5 failed to load: %s", e)
+            self.t5_tokenizer = None
+            self.t5_model = None
+
+        try:
+            from .perplexity_analyzer import PerplexityAnalyzer
+            self.analyzer = PerplexityAnalyzer(inference_client=False)
+        except Exception as e:
+            logger.warning("GPT-2 failed to load: %s", e)
+            self.analyzer = None
+
+        try:
+            from sentence_transformers import SentenceTransformer
+            self.encoder = SentenceTransformer(encoder_name, device=self.device)
+            metrics.MODEL_MEMORY.labels("minilm").set(metrics.model_memory_bytes(self.encoder))
+            logger.info("MiniLM encoder ready")
+        except Exception as e:
+            logger.warning("MiniLM failed to load: %s", e)
+            self.encoder = None
+
+    def generate_batch(self, items):
+        """Paraphrase (sentence, temperature) items; one generate call per temperature."""
+        if self.t5_model is None:
+            raise RuntimeError("T5 paraphraser is not loaded")
+
+        results = [None] * len(items)
+        groups = {}
+        for idx, (sentence, temperature) in enumerate(items):
+            groups.setdefault(temperature, []).append(idx)
+
+        for temperature, indices in groups.items():
+            inputs = ["paraphrase: " + items[i][0] + " </s>" for i in indices]
+            encoding = self.t5_tokenizer(inputs, padding=True, truncation=True, max_length=256, return_tensors="pt").to(self.device)
+            metrics.MODEL_BATCH_SIZE.labels("t5").observe(len(inputs))
+            with torch.no_grad():
+                outputs = self.t5_model.generate(
+                    **encoding, max_length=128, do_sample=True, top_p=0.96, temperature=temperature, early_stopping=True, num_return_sequences=1
+                )
+            decoded = self.t5_tokenizer.batch_decode(outputs, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+            for i, line in zip(indices, decoded):
+                results[i] = line
+        return results
+
+    def score_batch(self, items):
+        """GPT-2 scores for (text, include_tokens) items in padded batches."""
+        if self.analyzer is None:
+            raise RuntimeError("GPT-2 scorer is not loaded")
+        want_tokens = any(include_tokens for _, include_tokens in items)
+        results = self.analyzer.score_texts([text for text, _ in items], include_tokens=want_tokens)
+        for (_, include_tokens), result in zip(items, results):
+            if not include_tokens:
+                result.pop("tokens", None)
+        return results
+
+    def encode_batch(self, texts):
+        """MiniLM sentence embeddings as plain lists."""
+        if self.encoder is None:
+            raise RuntimeError("MiniLM encoder is not loaded")
+        metrics.MODEL_BATCH_SIZE.labels("minilm").observe(len(texts))
+        embeddings = self.encoder.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+        return [e.tolist() for e in embeddings]
+
+
+def _json_safe_perplexity(result):
+    """JSON has no NaN; send unscorable perplexities as null."""
+    if isinstance(result.get("perplexity"), float) and math.isnan(result["perplexity"]):
+        result["perplexity"] = None
+    for sent in result.get("sentences", []):
+        if math.isnan(sent["perplexity"]):
+            sent["perplexity"] = None
+    return result
+
+
+# --- Service ---
+MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", 16))
+MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 10))
+
+app = FastAPI(
+    title="BlizFlow Inference Server",
+    description="Shared T5 / GPT-2 / MiniLM inference with cross-request batching"
+)
+
+_host = None
+_batchers = {}
+_host_lock = threading.Lock()
+
+
+def get_batchers():
+    global _host
+    with _host_lock:
+        if _host is None:
+            _host = ModelHost()
+            _batchers["generate"] = MicroBatcher("generate", _host.generate_batch, MAX_BATCH_SIZE, MAX_WAIT_MS)
+            _batchers["score"] = MicroBatcher("score", _host.score_batch, MAX_BATCH_SIZE, MAX_WAIT_MS)
+            _batchers["encode"] = MicroBatcher("encode", _host.encode_batch, MAX_BATCH_SIZE, MAX_WAIT_MS)
+    return _batchers
+
+
+class GenerateRequest(BaseModel):
+    texts: List[str]
+    temperature: float = 1.0
+
+
+class TextsRequest(BaseModel):
+    texts: List[str]
+
+
+class ScoreRequest(BaseModel):
+    texts: List[str]
+    include_tokens: bool = False
+
+
+@app.get("/")
+def health_check():
+    stats = {
+        name: {"queue_depth": b.queue_depth(), "batches": b.batches_run, "items": b.items_run}
+        for name, b in _batchers.items()
+    }
+    return {"status": "online", "max_batch_size": MAX_BATCH_SIZE, "max_wait_ms": MAX_WAIT_MS, "batchers": stats}
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# Handlers are plain `def` so FastAPI runs them on its threadpool; each one
+# blocks on its futures while the batcher threads do the model work.
+@app.post("/generate")
+def generate(request: GenerateRequest):
+    try:
+        outputs = get_batchers()["generate"].submit_many([(t, request.temperature) for t in request.texts])
+        return {"outputs": outputs}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/score")
+def score(request: TextsRequest):
+    try:
+        results = get_batchers()["score"].submit_many([(t, False) for t in request.texts])
+        return {"perplexities": [_json_safe_perplexity(dict(r))["perplexity"] for r in results]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/score/detail")
+def score_detail(request: ScoreRequest):
+    try:
+        results = get_batchers()["score"].submit_many([(t, request.include_tokens) for t in request.texts])
+        return {"results": [_json_safe_perplexity(r) for r in results]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/encode")
+def encode(request: TextsRequest):
+    try:
+        return {"embeddings": get_batchers()["encode"].submit_many(request.texts)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    request_log.configure()
+    get_batchers()
+    port = int(os.getenv("INFERENCE_PORT", 8001))
+    uvicorn.run(app, host="127.0.0.1", port=port)
@@ -0,0 +1,267 @@
+"""
+Document Ingestion
+Streams paragraphs out of PDF and DOCX files, extracting large PDFs across
+worker processes and repairing hyphenation and line-wrap artifacts.
+"""
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+try:
+    import docx
+except ImportError:
+    docx = None
+
+_PDF_MISSING = "PDF processing library (PyPDF2) is not installed."
+_DOCX_MISSING = "Word processing library (python-docx) is not installed."
+
+PDF_MIME = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# PDFs with at least this many pages are extracted in worker processes
+PARALLEL_PAGE_THRESHOLD = 24
+PAGES_PER_TASK = 16
+PDF_WORKERS = int(os.getenv("INGEST_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+# A line shorter than this fraction of the page's full line width ends its paragraph
+SHORT_LINE_RATIO = 0.6
+# A vertical gap this many times the usual line advance separates paragraphs
+PARAGRAPH_GAP_RATIO = 1.3
+
+# "exam-\nple" -> "example", "well-\nknown" -> "well-known"; only when the
+# next line continues in lowercase
+_HYPHEN_BREAK_RE = re.compile(r"(\w+)-[ \t]*\n[ \t]*([a-z]+)")
+# Common English words, to tell a wrapped compound from a word split in two
+_WORDS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "google_10000.txt")
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s+)?\d+(?:\s+of\s+\d+)?$", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def document_kind(filename="", content_type=""):
+    """'pdf' or 'docx' from the MIME type or file extension, None if unsupported."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if content_type == PDF_MIME or extension == ".pdf":
+        return "pdf"
+    if content_type == DOCX_MIME or extension == ".docx":
+        return "docx"
+    return None
+
+
+def extract_page_text(page):
+    """
+    Text of one PyPDF2 page, with a blank line wherever the vertical gap
+    between two lines is clearly larger than the page's usual line advance.
+    """
+    lines = [["", None]]
+
+    def visit(text, cm, tm, font_dict, font_size):
+        y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+        pieces = text.split("\n")
+        if pieces[0].strip() and lines[-1][1] is None:
+            lines[-1][1] = y
+        lines[-1][0] += pieces[0]
+        for piece in pieces[1:]:
+            lines.append([piece, y if piece.strip() else None])
+
+    page.extract_text(visitor_text=visit)
+
+    positioned = [y for text, y in lines if y is not None]
+    advances = sorted(a - b for a, b in zip(positioned, positioned[1:]) if a > b)
+    if not advances:
+        return "\n".join(text for text, _ in lines)
+    gap = PARAGRAPH_GAP_RATIO * advances[len(advances) // 2]
+
+    out = []
+    previous_y = None
+    for text, y in lines:
+        if y is not None:
+            if previous_y is not None and previous_y - y > gap:
+                out.append("")
+            previous_y = y
+        out.append(text)
+    return "\n".join(out)
+
+
+def _extract_page_range(path, start, stop):
+    # Runs in a worker process: each task opens its own reader
+    reader = PyPDF2.PdfReader(path)
+    return [extract_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def iter_pdf_pages(source, workers=None):
+    """
+    Yield the text of each PDF page in order.
+
+    Short documents are read in-process. Long ones are cut into page ranges
+    that worker processes extract concurrently, with only a few ranges in
+    flight at a time so memory stays bounded by the window, not the file.
+    """
+    if PyPDF2 is None:
+        raise RuntimeError(_PDF_MISSING)
+    workers = PDF_WORKERS if workers is None else max(1, int(workers))
+
+    reader = PyPDF2.PdfReader(source)
+    page_count = len(reader.pages)
+    if workers == 1 or page_count < PARALLEL_PAGE_THRESHOLD:
+        for page in reader.pages:
+            yield extract_page_text(page)
+        return
+    del reader
+
+    # Workers need something they can reopen: a path on disk
+    temp_path = None
+    if isinstance(source, (str, os.PathLike)):
+        path = source
+    else:
+        source.seek(0)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            shutil.copyfileobj(source, f)
+            temp_path = path = f.name
+
+    pending = deque()
+    try:
+        # Spawned, not forked: callers such as the API run this on one thread
+        # of a multi-threaded process, and a fork can inherit a held lock
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for start in range(0, page_count, PAGES_PER_TASK):
+                pending.append(pool.submit(_extract_page_range, path, start, min(start + PAGES_PER_TASK, page_count)))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if temp_path:
+            os.remove(temp_path)
+
+
+@lru_cache(maxsize=1)
+def _known_words():
+    try:
+        with open(_WORDS_PATH, "r", encoding="utf-8") as f:
+            return frozenset(line.strip().lower() for line in f if line.strip())
+    except OSError:
+        return frozenset()
+
+
+def _join_hyphen_break(match):
+    left, right = match.group(1), match.group(2)
+    words = _known_words()
+    # A complete word before the hyphen, and no such word once joined: a real compound
+    if left.lower() in words and (left + right).lower() not in words:
+        return left + "-" + right
+    return left + right
+
+
+def split_page(text):
+    """
+    Rebuild the paragraphs of one page of extracted PDF text.
+
+    Hyphenated line breaks are joined (keeping the hyphen of compounds such
+    as "well-known"), wrapped lines are unwrapped, bare page
+    numbers are dropped, and a paragraph ends at a blank line or a line that
+    stops well short of the page's full width.
+
+    Returns:
+        (paragraphs, open_ended): open_ended is True when the last paragraph
+        runs to the bottom of the page and may continue on the next one
+    """
+    text = _HYPHEN_BREAK_RE.sub(_join_hyphen_break, text.replace("\r\n", "\n").replace("\r", "\n"))
+    lines = [line.strip() for line in text.split("\n")]
+    lines = [line for line in lines if not _PAGE_NUMBER_RE.match(line)]
+
+    widths = sorted(len(line) for line in lines if line)
+    full_width = widths[int(len(widths) * 0.9)] if widths else 0
+
+    paragraphs = []
+    current = []
+    for line in lines:
+        if line:
+            current.append(line)
+            if len(line) >= SHORT_LINE_RATIO * full_width:
+                continue
+        if current:
+            paragraphs.append(" ".join(current))
+            current = []
+
+    if current:
+        paragraphs.append(" ".join(current))
+    return paragraphs, bool(current)
+
+
+def iter_pdf_paragraphs(source, workers=None):
+    """
+    Yield PDF paragraphs, stitching paragraphs that run across page breaks.
+    A page that ends a sentence and a next page that starts a capitalized one
+    are treated as a paragraph boundary.
+    """
+    carry = ""
+    for page_text in iter_pdf_pages(source, workers):
+        paragraphs, open_ended = split_page(page_text)
+        if not paragraphs:
+            continue
+        if carry:
+            head = paragraphs[0]
+            if carry[-1] in ".!?" and head[:1].isupper():
+                yield carry
+            elif carry.endswith("-") and head[:1].islower():
+                paragraphs[0] = carry[:-1] + head
+            else:
+                paragraphs[0] = carry + " " + head
+            carry = ""
+        if open_ended:
+            carry = paragraphs.pop()
+        yield from paragraphs
+    if carry:
+        yield carry
+
+
+def iter_docx_paragraphs(source):
+    """Yield the non-empty paragraphs of a DOCX file with soft breaks unwrapped."""
+    if docx is None:
+        raise RuntimeError(_DOCX_MISSING)
+    for para in docx.Document(source).paragraphs:
+        text = _WHITESPACE_RE.sub(" ", para.text).strip()
+        if text:
+            yield text
+
+
+def iter_paragraphs(source, filename="", content_type="", workers=None):
+    """
+    Stream the paragraphs of an uploaded document.
+
+    Args:
+        source: path or binary file-like object
+        filename: used with content_type to tell PDF from DOCX
+        content_type: MIME type, if known
+        workers: PDF extraction processes (default INGEST_PDF_WORKERS)
+    """
+    if not filename and isinstance(source, (str, os.PathLike)):
+        filename = os.fspath(source)
+    # Missing libraries are reported here, before any paragraph is requested
+    kind = document_kind(filename, content_type)
+    if kind == "pdf":
+        if PyPDF2 is None:
+            raise RuntimeError(_PDF_MISSING)
+        return iter_pdf_paragraphs(source, workers)
+    if kind == "docx":
+        if docx is None:
+            raise RuntimeError(_DOCX_MISSING)
+        return iter_docx_paragraphs(source)
+    raise ValueError(f"Unsupported document type: {filename or content_type or 'unknown'}")
+
+
+def read_document(source, filename="", content_type="", workers=None):
+    """Whole document as one string, paragraphs separated by blank lines."""
+    return "\n\n".join(iter_paragraphs(source, filename, content_type, workers))
@@ -0,0 +1,153 @@
+"""
+LLM Chunking
+Splits long text into paragraph-aligned chunks within a token budget so the
+LLM passes can rewrite a long document as several concurrent requests,
+instead of one slow request whose output gets cut off at max_tokens.
+
+Each chunk carries the tail of the text before it as read-only context for
+continuity, and outputs are reassembled in the original order. Long-document
+latency becomes roughly that of the slowest chunk.
+"""
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import nltk
+
+from . import random_context
+from . import request_log
+
+logger = logging.getLogger(__name__)
+
+# No tokenizer is shared by every OpenRouter model; ~4 chars per token is the usual estimate
+CHARS_PER_TOKEN = 4
+# Input tokens per request. Rewrites run longer than their input, and the
+# reply is capped at max_tokens=2000, so leave room for that.
+CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", 1000))
+OVERLAP_TOKENS = int(os.getenv("LLM_OVERLAP_TOKENS", 100))
+MAX_PARALLEL = int(os.getenv("LLM_MAX_PARALLEL", 4))
+
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+
+
+class Chunk(NamedTuple):
+    text: str
+    separator: str   # joins this chunk's output to the next: "\n\n" or " " mid-paragraph
+    context: str     # end of the preceding text, for continuity only
+    index: int
+    total: int
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _units(text, max_tokens):
+    # (piece, separator after it): paragraphs, or sentences of paragraphs over budget
+    paragraphs = [p.strip() for p in _PARAGRAPH_BREAK_RE.split(text) if p.strip()]
+    units = []
+    for paragraph in paragraphs:
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append((paragraph, "\n\n"))
+            continue
+        pieces = []
+        for sentence in nltk.sent_tokenize(paragraph):
+            if estimate_tokens(sentence) <= max_tokens:
+                pieces.append(sentence)
+                continue
+            # A single sentence over budget: cut between words
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // estimate_tokens(sentence))
+            pieces.extend(" ".join(words[i:i + step]) for i in range(0, len(words), step))
+        units.extend((piece, " ") for piece in pieces[:-1])
+        units.append((pieces[-1], "\n\n"))
+    return units
+
+
+def _tail(text, tokens):
+    # Last ~tokens of text, starting on a word boundary
+    if tokens <= 0:
+        return ""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    tail = text[-limit:]
+    space = tail.find(" ")
+    return tail[space + 1:] if space != -1 else tail
+
+
+def split_for_budget(text, max_tokens=None, overlap_tokens=None):
+    """
+    Pack paragraphs (or sentences of an over-long paragraph) into chunks of at
+    most max_tokens estimated tokens, in order.
+
+    Returns:
+        list of Chunk; a single chunk when the text fits the budget
+    """
+    max_tokens = CHUNK_TOKENS if max_tokens is None else max_tokens
+    overlap_tokens = OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    if estimate_tokens(text) <= max_tokens:
+        return [Chunk(text, "", "", 0, 1)]
+
+    groups = []
+    current, size = [], 0
+    for piece, separator in _units(text, max_tokens):
+        tokens = estimate_tokens(piece)
+        if current and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append((piece, separator))
+        size += tokens
+    if current:
+        groups.append(current)
+
+    chunks = []
+    previous = ""
+    for index, group in enumerate(groups):
+        body = "".join(piece + separator for piece, separator in group[:-1]) + group[-1][0]
+        separator = group[-1][1] if index < len(groups) - 1 else ""
+        chunks.append(Chunk(body, separator, _tail(previous, overlap_tokens), index, len(groups)))
+        previous = body
+    return chunks
+
+
+def continuity_note(chunk):
+    """System prompt addition telling the model where this chunk sits."""
+    if chunk.total <= 1:
+        return ""
+    note = f"\n- This is part {chunk.index + 1} of {chunk.total} of a longer text; rewrite only the text you are given."
+    if chunk.context:
+        note += (
+            " For continuity, the previous part ended with:\n"
+            f"\"\"\"{chunk.context}\"\"\"\n"
+            "Continue naturally from it, but do not repeat or rewrite it."
+        )
+    return note
+
+
+def map_chunks(fn, chunks, max_parallel=None):
+    """
+    fn(chunk) for every chunk, at most max_parallel at a time, results in
+    chunk order. Each call keeps the caller's request id and draws from its
+    own random substream, so seeded runs don't depend on scheduling.
+    """
+    max_parallel = MAX_PARALLEL if max_parallel is None else max_parallel
+    rid = request_log.current_request_id()
+
+    def run(chunk):
+        with request_log.request_id(rid):
+            return fn(chunk)
+
+    # Streams are bound here, in the calling thread
+    calls = [random_context.bind(run, "llm_chunk", chunk.index) for chunk in chunks]
+    if len(chunks) == 1 or max_parallel <= 1:
+        return [call(chunk) for call, chunk in zip(calls, chunks)]
+    with ThreadPoolExecutor(max_workers=min(max_parallel, len(chunks))) as pool:
+        return list(pool.map(lambda call, chunk: call(chunk), calls, chunks))
+
+
+def reassemble(chunks, outputs):
+    """Chunk outputs joined back in order with the separators the split removed."""
+    return "".join(output.strip() + chunk.separator for chunk, output in zip(chunks, outputs))
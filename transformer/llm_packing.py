@@ -0,0 +1,192 @@
+"""
+LLM Request Packing
+Packs the LLM calls of many short texts (the lines of a document humanized
+with preserve_formatting) into one request. Each text goes in under its own
+marker line, the reply is split back on the same markers, and a text whose
+rewrite can't be found in the reply is sent again on its own.
+
+The lines run concurrently, each on its own thread, and share an LLMPacker
+that holds their calls until a batch is worth sending. A two-line paragraph
+then costs a fraction of a request instead of a full round trip that repeats
+the system prompt.
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+from concurrent.futures import Future, TimeoutError
+from contextlib import contextmanager
+
+from . import llm_chunking
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PACK_MAX_ITEMS = int(os.getenv("LLM_PACK_MAX_ITEMS", 16))
+# Only texts up to this size are packed; longer ones are worth their own request
+PACK_ITEM_TOKENS = int(os.getenv("LLM_PACK_ITEM_TOKENS", 200))
+PACK_MAX_WAIT_MS = float(os.getenv("LLM_PACK_MAX_WAIT_MS", 250))
+
+_MARKER = "<<<ITEM {}>>>"
+# Tolerates the decoration models like to add around a marker line (**, #, quotes)
+_MARKER_RE = re.compile(r"^[^\w\n]*<<<\s*ITEM\s*(\d+)\s*>>>[^\w\n]*$", re.MULTILINE)
+
+_packer = contextvars.ContextVar("blizflow_llm_packer", default=None)
+
+
+def current():
+    """The LLMPacker calls in this context go through, or None."""
+    return _packer.get()
+
+
+@contextmanager
+def active(packer):
+    token = _packer.set(packer)
+    try:
+        yield packer
+    finally:
+        _packer.reset(token)
+
+
+def packable(text):
+    return (
+        PACK_MAX_ITEMS > 1
+        and llm_chunking.estimate_tokens(text) <= PACK_ITEM_TOKENS
+        and "<<<" not in text
+    )
+
+
+def pack(system_prompt, texts):
+    """
+    One (system_prompt, user_text) request for several texts that share a
+    system prompt.
+    """
+    prompt = system_prompt + (
+        f"\n\nBATCH FORMAT: The input holds {len(texts)} separate texts, each under its own "
+        f"marker line ({_MARKER.format(1)}, {_MARKER.format(2)}, ...). Rewrite each text on its own, "
+        "following all the rules above, and write each rewrite under the same marker line, in the same "
+        "order. Output every marker exactly once, on a line by itself, and nothing before the first one."
+    )
+    user_text = "\n\n".join(f"{_MARKER.format(i + 1)}\n{text}" for i, text in enumerate(texts))
+    return prompt, user_text
+
+
+def unpack(response, count):
+    """
+    The rewrite of each of count packed texts, in order; None where it can't
+    be trusted. A text's rewrite runs up to the next marker, so it only counts
+    when that marker is the next number (or the reply ends after the last
+    text): a dropped or repeated marker would otherwise fold one rewrite into
+    another.
+    """
+    matches = list(_MARKER_RE.finditer(response))
+    numbers = [int(match.group(1)) for match in matches]
+    outputs = [None] * count
+    for i, match in enumerate(matches):
+        number = numbers[i]
+        following = numbers[i + 1] if i + 1 < len(matches) else count + 1
+        if not 1 <= number <= count or following != number + 1 or numbers.count(number) > 1:
+            continue
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+        outputs[number - 1] = response[match.end():end].strip() or None
+    return outputs
+
+
+class LLMPacker:
+    """
+    Gathers the LLM calls of concurrent participants into packed requests,
+    one per system prompt. A batch is sent once every running participant is
+    waiting on a call, once it holds max_items texts or max_tokens estimated
+    tokens, or once its oldest call has waited max_wait_ms.
+
+    The packer is told up front how many participants there are and how many
+    run at once (a thread pool's max_workers); each one calls leave() when it
+    is done, so the packer knows when nobody else is coming.
+    """
+
+    def __init__(self, call, participants, concurrency=None, max_items=None, max_tokens=None, max_wait_ms=None):
+        self._call = call   # call(system_prompt, user_text) -> str, e.g. engine._call_llm
+        self._remaining = participants
+        self._concurrency = participants if concurrency is None else concurrency
+        self.max_items = max(1, int(PACK_MAX_ITEMS if max_items is None else max_items))
+        self.max_tokens = llm_chunking.CHUNK_TOKENS if max_tokens is None else max_tokens
+        self.max_wait = max(0.0, float(PACK_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms)) / 1000.0
+        self.requests_sent = 0
+        self.items_sent = 0
+        self._lock = threading.Lock()
+        self._pending = {}  # system prompt -> [(text, future)]
+        self._waiting = 0
+
+    def leave(self):
+        with self._lock:
+            self._remaining -= 1
+            batches = self._take_ready()
+        self._send(batches)
+
+    def call(self, system_prompt, text):
+        """Same contract as call(system_prompt, text), answered from a packed request when possible."""
+        future = Future()
+        with self._lock:
+            batches = []
+            pending = self._pending.get(system_prompt)
+            if pending and sum(llm_chunking.estimate_tokens(t) for t, _ in pending) + llm_chunking.estimate_tokens(text) > self.max_tokens:
+                batches.append(self._take(system_prompt))
+            pending = self._pending.setdefault(system_prompt, [])
+            pending.append((text, future))
+            self._waiting += 1
+            if len(pending) >= self.max_items:
+                batches.append(self._take(system_prompt))
+            batches.extend(self._take_ready())
+        self._send(batches)
+
+        try:
+            result = future.result(timeout=self.max_wait)
+        except TimeoutError:
+            # Waited long enough for batch-mates: send what there is
+            with self._lock:
+                queued = any(f is future for _, f in self._pending.get(system_prompt, ()))
+                batches = [self._take(system_prompt)] if queued else []
+            self._send(batches)
+            result = future.result()
+        if result is None:
+            # Sent alone, or lost in the packed reply: one request of its own
+            return self._call(system_prompt, text)
+        return result
+
+    def _take(self, system_prompt):
+        items = self._pending.pop(system_prompt)
+        self._waiting -= len(items)
+        return system_prompt, items
+
+    def _take_ready(self):
+        # Everyone still running is waiting: nobody else can join a batch. A
+        # pool starts the next participant as soon as one finishes, so
+        # min(remaining, concurrency) are running at any time.
+        if not self._pending or self._waiting < min(self._remaining, self._concurrency):
+            return []
+        return [self._take(system_prompt) for system_prompt in list(self._pending)]
+
+    def _send(self, batches):
+        for system_prompt, items in batches:
+            if len(items) == 1:
+                items[0][1].set_result(None)
+                continue
+            texts = [text for text, _ in items]
+            try:
+                prompt, user_text = pack(system_prompt, texts)
+                with self._lock:
+                    self.requests_sent += 1
+                    self.items_sent += len(items)
+                metrics.LLM_PACK_SIZE.observe(len(items))
+                outputs = unpack(self._call(prompt, user_text), len(items))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            missing = sum(1 for output in outputs if output is None)
+            if missing:
+                logger.warning("Packed LLM reply missing %s of %s texts; sending them one by one", missing, len(items))
+            logger.debug("Packed %s texts into one LLM request", len(items))
+            for (_, future), output in zip(items, outputs):
+                future.set_result(output)
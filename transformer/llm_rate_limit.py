@@ -0,0 +1,180 @@
+"""
+LLM Rate Limiting
+Client-side token buckets for OpenRouter, one pair per API key and model:
+requests per second and tokens per minute. A call reserves its share before
+it is sent and waits its turn, so bursts queue at the provider's limit
+instead of collecting 429s and falling through to slower fallbacks.
+
+Waiting is bounded: a call that would still be queued past its deadline
+raises RateLimited and the caller moves on (next model, T5, original text).
+A 429 pauses that key and model for as long as the Retry-After header says.
+
+Limits come from the environment:
+    OPENROUTER_RPS=3                 # requests per second, per key and model
+    OPENROUTER_TPM=200000            # prompt + completion tokens per minute
+    OPENROUTER_MODEL_LIMITS='{"google/gemini-2.0-flash-exp:free": {"rps": 0.3}}'
+    LLM_QUEUE_TIMEOUT=30             # seconds a call may wait for its turn
+"""
+import email.utils
+import json
+import logging
+import os
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPS = float(os.getenv("OPENROUTER_RPS", 3))
+DEFAULT_TPM = float(os.getenv("OPENROUTER_TPM", 200000))
+MODEL_LIMITS = json.loads(os.getenv("OPENROUTER_MODEL_LIMITS", "{}"))
+QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", 30))
+# Pause after a 429 that says nothing about when to come back
+DEFAULT_BACKOFF = 1.0
+
+
+class RateLimited(Exception):
+    """The call could not get a slot before its deadline."""
+
+
+class TokenBucket:
+    """
+    Holds up to capacity units, refilled at rate units per second. take()
+    may drive it below zero: the debt is the queue, and each caller waits
+    until its own share has been refilled, so callers are served in order.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount would be available, if nothing else is taken."""
+        self._refill(now)
+        # Something bigger than the whole bucket can only go once it is full
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self._level) / self.rate) if self.rate > 0 else 0.0
+
+    def take(self, amount, now):
+        self._refill(now)
+        self._level -= amount
+
+    def give_back(self, amount):
+        self._level = min(self.capacity, self._level + amount)
+
+
+class RateLimiter:
+    """Request and token buckets per (API key, model), plus 429 pauses."""
+
+    def __init__(self, rps=None, tpm=None, model_limits=None):
+        self.rps = DEFAULT_RPS if rps is None else rps
+        self.tpm = DEFAULT_TPM if tpm is None else tpm
+        self.model_limits = MODEL_LIMITS if model_limits is None else model_limits
+        self._lock = threading.Lock()
+        self._buckets = {}        # (key, model) -> (requests bucket, tokens bucket)
+        self._paused_until = {}   # (key, model) -> monotonic time
+
+    def _buckets_for(self, key, model):
+        buckets = self._buckets.get((key, model))
+        if buckets is None:
+            limits = self.model_limits.get(model, {})
+            rps = float(limits.get("rps", self.rps))
+            tpm = float(limits.get("tpm", self.tpm))
+            buckets = (TokenBucket(rps, max(1.0, rps)), TokenBucket(tpm / 60.0, tpm))
+            self._buckets[(key, model)] = buckets
+        return buckets
+
+    def acquire(self, key, model, tokens, deadline):
+        """
+        Reserve one request and `tokens` tokens for key/model, sleeping until
+        they are available.
+
+        Args:
+            deadline: time.monotonic() value after which the call gives up
+
+        Returns:
+            seconds spent waiting
+
+        Raises:
+            RateLimited: the slot would come after the deadline; nothing is reserved
+        """
+        with self._lock:
+            now = time.monotonic()
+            requests_bucket, tokens_bucket = self._buckets_for(key, model)
+            wait = max(
+                requests_bucket.wait_time(1, now),
+                tokens_bucket.wait_time(tokens, now),
+                self._paused_until.get((key, model), now) - now,
+            )
+            if wait > 0 and now + wait > deadline:
+                raise RateLimited(f"{model} rate limited; next slot in {wait:.1f}s, past the deadline")
+            requests_bucket.take(1, now)
+            tokens_bucket.take(tokens, now)
+        waited = 0.0
+        while wait > 0:
+            logger.debug("Queued %.2fs for %s", wait, model)
+            time.sleep(wait)
+            waited += wait
+            # A 429 may have paused key/model while we slept
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until.get((key, model), now) - now
+            if wait > 0 and now + wait > deadline:
+                self.release(key, model, tokens)
+                raise RateLimited(f"{model} paused by the provider past the deadline")
+        metrics.LLM_QUEUE_SECONDS.labels(model).observe(waited)
+        return waited
+
+    def settle(self, key, model, reserved, used):
+        """Correct a reservation once the reply reports the tokens actually used."""
+        with self._lock:
+            self._buckets_for(key, model)[1].give_back(reserved - used)
+
+    def release(self, key, model, tokens):
+        """Return a whole reservation (one request and `tokens`) that was never used, e.g. after a 429."""
+        with self._lock:
+            requests_bucket, tokens_bucket = self._buckets_for(key, model)
+            requests_bucket.give_back(1)
+            tokens_bucket.give_back(tokens)
+
+    def pause(self, key, model, seconds):
+        """Hold every call for key/model for `seconds` (e.g. after a 429)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until[(key, model)] = max(until, self._paused_until.get((key, model), 0.0))
+        logger.warning("%s rate limited by the provider; pausing %.1fs", model, seconds)
+
+
+def parse_retry_after(headers, default=DEFAULT_BACKOFF):
+    """
+    Seconds to wait from a 429's headers: Retry-After as seconds or an HTTP
+    date, else OpenRouter's X-RateLimit-Reset (epoch milliseconds).
+    """
+    value = headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    reset = headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) / 1000.0 - time.time())
+        except ValueError:
+            pass
+    return default
+
+
+# Shared by every engine in the process, since the provider's limits are per key
+limiter = RateLimiter()
@@ -0,0 +1,336 @@
+"""
+Service Metrics
+Counters, gauges and histograms kept in process and rendered in the
+Prometheus text exposition format (version 0.0.4) for a /metrics route.
+
+Every metric the services report is defined at the bottom of this module so
+the pipeline, the API and the inference server share one registry. Values
+are per process: run one scrape target per API worker.
+"""
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a regex pass (~1ms) up to a slow LLM round trip
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_string(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    """Shared label handling: one child per combination of label values."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values, **kwargs):
+        """The child for one set of label values, by position or by name."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} is labelled; call labels() first")
+        return self._children[()]
+
+    def exposed_name(self):
+        return self.name
+
+    def collect(self):
+        name = self.exposed_name()
+        lines = [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._samples(key, child))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only go up")
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic total. Exposed with the conventional _total suffix."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+    def exposed_name(self):
+        return self.name if self.name.endswith("_total") else self.name + "_total"
+
+    def _samples(self, key, child):
+        return [f"{self.exposed_name()}{_label_string(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _GaugeChild:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = float(value)
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Read the value from function() at scrape time instead."""
+        self.function = function
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def get(self):
+        if self.function is None:
+            return self.value
+        try:
+            return float(self.function())
+        except Exception:
+            return math.nan
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is computed when scraped."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._unlabelled().set(value)
+
+    def inc(self, amount=1):
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount=1):
+        self._unlabelled().dec(amount)
+
+    def set_function(self, function):
+        self._unlabelled().set_function(function)
+
+    def track_inprogress(self):
+        return self._unlabelled().track_inprogress()
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_label_string(self.labelnames, key)} {_format_value(child.get())}"]
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with cumulative _bucket, _sum and _count series."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._unlabelled().observe(value)
+
+    def time(self):
+        return self._unlabelled().time()
+
+    def _samples(self, key, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _label_string(self.labelnames, key, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _label_string(self.labelnames, key, [("le", "+Inf")])
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_sum{_label_string(self.labelnames, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_label_string(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    """The metrics one /metrics route renders."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def render(self):
+        """All metrics in the text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(histogram, *label_values):
+    """Decorator: observe the wrapped function's duration in histogram."""
+    def decorator(fn):
+        child = histogram.labels(*label_values) if label_values else histogram._unlabelled()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with child.time():
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def model_memory_bytes(model):
+    """Bytes held by a torch module's parameters and buffers."""
+    if model is None:
+        return 0
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def resident_memory_bytes():
+    # Linux: second field of statm is resident pages
+    with open("/proc/self/statm", "r") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def hit_ratio(counter, cache):
+    """Hits / lookups for one cache of CACHE_LOOKUPS (nan before the first lookup)."""
+    hits = counter.labels(cache, "hit").value
+    total = hits + counter.labels(cache, "miss").value
+    return hits / total if total else math.nan
+
+
+# --- Metrics reported by the services ---
+REQUEST_SECONDS = Histogram(
+    "blizflow_http_request_duration_seconds", "HTTP request latency by route.",
+    ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = Gauge("blizflow_http_requests_in_flight", "HTTP requests being served.")
+
+HUMANIZE_SECONDS = Histogram(
+    "blizflow_humanize_duration_seconds", "End-to-end humanize() latency by stealth level and mode (llm or local).",
+    ("stealth_level", "mode")
+)
+PASS_SECONDS = Histogram("blizflow_pass_duration_seconds", "Duration of each humanization pass.", ("pass",))
+
+LLM_SECONDS = Histogram("blizflow_llm_request_duration_seconds", "OpenRouter call latency by model.", ("model",))
+LLM_REQUESTS = Counter(
+    "blizflow_llm_requests", "OpenRouter calls by model and outcome (ok, http_error, rate_limited, throttled, error).",
+    ("model", "outcome")
+)
+LLM_QUEUE_SECONDS = Histogram("blizflow_llm_queue_seconds", "Time OpenRouter calls waited in the client-side rate limiter.", ("model",))
+LLM_PACK_SIZE = Histogram("blizflow_llm_pack_size", "Texts per packed OpenRouter request.", buckets=BATCH_SIZE_BUCKETS)
+
+MODEL_BATCH_SIZE = Histogram(
+    "blizflow_model_batch_size", "Sequences per T5 generate / GPT-2 forward call.",
+    ("model",), buckets=BATCH_SIZE_BUCKETS
+)
+MODEL_MEMORY = Gauge("blizflow_model_memory_bytes", "Parameter and buffer bytes of each loaded model.", ("model",))
+QUEUE_DEPTH = Gauge("blizflow_queue_depth", "Items waiting in each inference micro-batcher.", ("queue",))
+
+CACHE_LOOKUPS = Counter("blizflow_cache_lookups", "Memoization lookups by cache and result (hit or miss).", ("cache", "result"))
+CACHE_HIT_RATIO = Gauge("blizflow_cache_hit_ratio", "Hits / lookups for each memoization cache.", ("cache",))
+
+RESIDENT_MEMORY = Gauge("process_resident_memory_bytes", "Resident memory size in bytes.")
+if os.path.exists("/proc/self/statm"):
+    RESIDENT_MEMORY.set_function(resident_memory_bytes)
@@ -0,0 +1,31 @@
+"""
+Model Names
+One place that says which checkpoint each engine loads, so deployments and CI
+can swap models without touching the engines.
+
+For each kind, the first of these that is set wins:
+    BLIZFLOW_T5_MODEL=<hub id or path>      # likewise _PEGASUS_, _GPT2_, _MINILM_
+    BLIZFLOW_MODEL_FIXTURES=<dir>           # <dir>/<kind>/ if it exists
+and otherwise the production checkpoint below is used.
+"""
+import os
+
+DEFAULTS = {
+    "t5": "Vamsi/T5_Paraphrase_Paws",
+    "pegasus": "tuner007/pegasus_paraphrase",
+    "gpt2": "gpt2",
+    "minilm": "paraphrase-MiniLM-L6-v2"
+}
+
+
+def model_name(kind):
+    """Hub id or local path to load for one model kind ("t5", "pegasus", "gpt2", "minilm")."""
+    if kind not in DEFAULTS:
+        raise ValueError(f"Unknown model kind: {kind}")
+    explicit = os.getenv(f"BLIZFLOW_{kind.upper()}_MODEL", "").strip()
+    if explicit:
+        return explicit
+    fixtures = os.getenv("BLIZFLOW_MODEL_FIXTURES", "").strip()
+    if fixtures and os.path.isdir(os.path.join(fixtures, kind)):
+        return os.path.join(fixtures, kind)
+    return DEFAULTS[kind]
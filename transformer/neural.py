@@ -1,34 +1,68 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import nltk
-import random
 import re
 import requests
 import json
 import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from .vocabulary import vocab_enhancer
 from .pattern_breaker import PatternBreaker, NgramDiversifier
 from .fingerprint_scrambler import FingerprintScrambler, SemanticShuffler
 from .ensemble_humanizer import EnsembleHumanizer, MarkovTextBlender
+from .inference_client import InferenceClient
+from .text_features import extract_features
+from . import random_context
+from .random_context import rng
+from . import request_log
+from . import metrics
+from . import model_names
+from . import token_transducers
+from . import streaming
+from . import llm_chunking
+from . import llm_packing
+from . import llm_rate_limit
 
 import os
 
+logger = logging.getLogger(__name__)
+
 class NeuralTextHumanizer:
     """
     Uses OpenRouter API (LLM) + Heuristic/Rule-based passes to humanize text.
     Follows a multi-pass architecture to bypass AI detection.
+
+    Thread safety: one instance may serve many threads at once. Everything set
+    up in __init__ is read-only afterwards; per-call state lives in locals and
+    in the call's random stream (random_context). The pieces that are not
+    safe to share run under locks: local T5 tokenize+generate (_generate_lock),
+    the ensemble models, Markov sampling and the nlpaug augmenter.
     """
-    def __init__(self, model_name="Vamsi/T5_Paraphrase_Paws", device=None):
+    def __init__(self, model_name=None, device=None, inference_client=None):
         self.device = device if device else ("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"Initializing NeuralTextHumanizer on {self.device}...")
-        
-        try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-            self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
-        except Exception as e:
-            print(f"Warning: Local model failed to load: {e}. Using API-only mode.")
+        logger.info("Initializing NeuralTextHumanizer on %s...", self.device)
+        # Fast tokenizers mutate padding state per call, and torch.manual_seed
+        # plus generate must happen back to back for seeded runs to reproduce
+        self._generate_lock = threading.Lock()
+        
+        # Shared inference server (BLIZFLOW_INFERENCE_URL) replaces the local T5 copy
+        self.inference = InferenceClient.resolve(inference_client)
+        if self.inference:
+            logger.info("Using inference server at %s for T5 paraphrasing.", self.inference.base_url)
             self.tokenizer = None
             self.model = None
+        else:
+            try:
+                model_name = model_name or model_names.model_name("t5")
+                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+                self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
+                metrics.MODEL_MEMORY.labels("t5").set(metrics.model_memory_bytes(self.model))
+            except Exception as e:
+                logger.warning("Local model failed to load: %s. Using API-only mode.", e)
+                self.tokenizer = None
+                self.model = None
 
         # Load external resources
         self.pattern_breaker = PatternBreaker()
@@ -46,44 +80,135 @@ class NeuralTextHumanizer:
         try:
             path = "C:\\Users\\setup\\Pictures\\AI-Text-Humanizer-App-main\\google_10000.txt"
             with open(path, 'r', encoding='utf-8') as f:
-                return set([line.strip().lower() for line in f if line.strip()])
+                return frozenset(line.strip().lower() for line in f if line.strip())
         except:
-            return set()
+            return frozenset()
 
     def _load_rare_vocab(self):
         try:
             path = "C:\\Users\\setup\\Pictures\\AI-Text-Humanizer-App-main\\transformer\\rare_vocab.txt"
             with open(path, 'r', encoding='utf-8') as f:
-                return set([line.strip().lower() for line in f if line.strip()])
+                return frozenset(line.strip().lower() for line in f if line.strip())
         except:
-            return set()
+            return frozenset()
 
-    def humanize(self, text, stealth_level=3, use_artifacts=False, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False):
+    def humanize(self, text, stealth_level=3, use_artifacts=False, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False, seed=None):
         """
         FINAL HUMANIZATION ENGINE
         Multi-pass system to completely bypass AI detection.
+
+        Every call runs on its own random stream (see random_context); pass a
+        seed to make the output reproducible.
         """
         if not text: 
             return ""
 
+        if seed is not None or not random_context.active():
+            mode = "llm" if stealth_level >= 5 or tone != "Balanced" else "local"
+            with request_log.request_scope("humanize", stealth_level=stealth_level, tone=tone, input_chars=len(text)) as summary:
+                with metrics.HUMANIZE_SECONDS.labels(stealth_level, mode).time(), random_context.seeded(seed) as used_seed:
+                    summary["seed"] = used_seed
+                    result = self.humanize(text, stealth_level, use_artifacts, tone, audience, preserve_formatting, use_emojis)
+                summary["output_chars"] = len(result)
+                return result
+
         # Recursive Paragraph Handling
         if preserve_formatting and "\n" in text:
-            print("→ Mode: Preserve Structure (Processing paragraphs individually)")
             paragraphs = text.split("\n")
+            logger.debug("Preserve structure: humanizing %d lines individually", len(paragraphs))
+            uses_llm = stealth_level >= 5 or tone != "Balanced"
+            if uses_llm and llm_packing.PACK_MAX_ITEMS > 1 and sum(1 for p in paragraphs if p.strip()) > 1:
+                return "\n".join(self._humanize_lines_packed(paragraphs, stealth_level, use_artifacts, tone, audience, use_emojis))
             humanized_paras = []
-            for p in paragraphs:
+            for index, p in enumerate(paragraphs):
                 if p.strip():
-                    humanized_paras.append(self.humanize(p, stealth_level, use_artifacts, tone, audience, preserve_formatting=False, use_emojis=use_emojis))
+                    # Each paragraph draws from a stream derived from its index alone
+                    with random_context.substream("paragraph", index):
+                        humanized_paras.append(self.humanize(p, stealth_level, use_artifacts, tone, audience, preserve_formatting=False, use_emojis=use_emojis))
                 else:
                     humanized_paras.append("") # Keep empty lines
             return "\n".join(humanized_paras)
 
-        print(f"\n{'='*60}")
-        print(f"HUMANIZATION ENGINE - Level {stealth_level} - Tone: {tone}")
-        print(f"Features: Preserve={preserve_formatting}, Emojis={use_emojis}")
-        print(f"{'='*60}")
-        print(f"Input length: {len(text)} chars")
+        logger.debug("Humanizing %d chars (level=%s, tone=%s, emojis=%s)", len(text), stealth_level, tone, use_emojis)
+
+        text = self.humanize_base(text, stealth_level, tone, audience)
+        text = self.humanize_from_base(text, stealth_level, use_artifacts, tone, use_emojis)
+
+        logger.debug("Humanization complete: %d chars", len(text))
+        return text
+
+    def _humanize_lines_packed(self, lines, stealth_level, use_artifacts, tone, audience, use_emojis):
+        """
+        The per-line humanize() calls of preserve_formatting, run concurrently
+        so their LLM calls can share packed requests (see llm_packing) instead
+        of a round trip per line. Each line keeps its own random substream, so
+        seeded output is the same as running them one by one.
+        """
+        rid = request_log.current_request_id()
+
+        def run(line):
+            try:
+                with request_log.request_id(rid), llm_packing.active(packer):
+                    return self.humanize(line, stealth_level, use_artifacts, tone, audience, preserve_formatting=False, use_emojis=use_emojis)
+            finally:
+                packer.leave()
+
+        # Streams are bound here, in the calling thread
+        calls = {index: random_context.bind(run, "paragraph", index) for index, line in enumerate(lines) if line.strip()}
+        workers = min(llm_packing.PACK_MAX_ITEMS, len(calls))
+        packer = llm_packing.LLMPacker(self._call_llm, participants=len(calls), concurrency=workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {index: pool.submit(call, lines[index]) for index, call in calls.items()}
+            results = [futures[index].result() if index in futures else "" for index in range(len(lines))]
+        logger.debug("Packed %s LLM calls into %s requests", packer.items_sent, packer.requests_sent)
+        return results
 
+    def humanize_stream(self, chunks, stealth_level=3, use_artifacts=False, tone="Balanced", audience="General", use_emojis=False, seed=None, window_chars=None):
+        """
+        Streaming humanize() for inputs too large to hold: chunks is any
+        iterable of str/bytes, and output text is yielded one window at a time.
+        "".join() of the output equals humanize(text, seed=seed) whenever no
+        line is longer than window_chars (see streaming).
+        """
+        if seed is None:
+            seed = random_context.fresh_seed()
+        rid = request_log.current_request_id() or request_log.new_request_id()
+        start_time = time.time()
+        windows = 0
+        status = "ok"
+        try:
+            for window in streaming.iter_windows(chunks, window_chars):
+                windows += 1
+                if window.whole or window.text.strip():
+                    # Scopes never span a yield: the consumer may resume us on another thread
+                    with request_log.request_id(rid), request_log.request_scope("humanize_stream", summary=False):
+                        result = self.humanize(
+                            window.text, stealth_level, use_artifacts, tone, audience,
+                            preserve_formatting=False, use_emojis=use_emojis,
+                            seed=streaming.window_seed(seed, window)
+                        )
+                else:
+                    result = "" # Keep empty lines
+                yield result + window.tail
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            with request_log.request_id(rid):
+                request_log.log_summary(
+                    "humanize_stream", time.time() - start_time,
+                    stealth_level=stealth_level, tone=tone, seed=seed, windows=windows, status=status
+                )
+
+    def humanize_base(self, text, stealth_level=3, tone="Balanced", audience="General"):
+        """
+        Shared early passes (0-2): vocabulary cleanup, de-structuring and the
+        semantic rebuild. This is where the LLM/T5 cost sits, so callers that
+        want several variations of one text run it once and branch afterwards.
+        """
         # Ensure NLTK
         try:
             nltk.data.find('tokenizers/punkt')
@@ -92,245 +217,231 @@ class NeuralTextHumanizer:
 
         # Pass 0: Strip AI Voice (Level 3+)
         if stealth_level >= 3:
-            print("→ Running Pass 0: Obfuscate Intent...")
+            logger.debug("Running Pass 0: Obfuscate Intent...")
             try:
                 text = self._pass_0_obfuscate_intent(text)
-                print(f"  ✓ Pass 0 complete ({len(text)} chars)")
+                logger.debug("Pass 0 complete (%s chars)", len(text))
             except Exception as e:
-                print(f"  ✗ Pass 0 failed: {e}")
+                logger.warning("Pass 0 failed: %s", e)
 
         # Pass 1: De-structure
-        print("→ Running Pass 1: De-structure...")
+        logger.debug("Running Pass 1: De-structure...")
         try:
             text = self._pass_1_destructure(text)
-            print(f"  ✓ Pass 1 complete ({len(text)} chars)")
+            logger.debug("Pass 1 complete (%s chars)", len(text))
         except Exception as e:
-            print(f"  ✗ Pass 1 failed: {e}")
+            logger.warning("Pass 1 failed: %s", e)
         
         # Pass 2: Semantic Rebuild (LLM for Level 5, else T5)
         if stealth_level >= 2:
-            print(f"→ Running Pass 2: Semantic Rebuild (Level {stealth_level})...")
+            logger.debug("Running Pass 2: Semantic Rebuild (Level %s)...", stealth_level)
             try:
                 if stealth_level >= 5 or tone != "Balanced":
-                    print(f"  using OpenRouter LLM (Tone: {tone})...")
+                    logger.debug("using OpenRouter LLM (Tone: %s)...", tone)
                     text = self._pass_2_semantic_rebuild_llm(text, level=stealth_level, tone=tone, audience=audience)
-                elif self.model:
-                    print("  using T5 Paraphraser...")
+                elif self.model or self.inference:
+                    logger.debug("using T5 Paraphraser...")
                     text = self._pass_2_semantic_rebuild_t5(text, temperature=1.2)
                 
                 # Add human-like Markov blending (Level 4+)
                 if stealth_level >= 4:
-                    print("  applying human-like Markov blending...")
-                    text = self.blender.blend_with_corpus(text)
+                    logger.debug("applying human-like Markov blending...")
+                    with metrics.PASS_SECONDS.labels("2_markov").time():
+                        text = self.blender.blend_with_corpus(text)
                     
-                print(f"  ✓ Pass 2 complete ({len(text)} chars)")
+                logger.debug("Pass 2 complete (%s chars)", len(text))
             except Exception as e:
-                print(f"  ✗ Pass 2 failed: {e}")
+                logger.warning("Pass 2 failed: %s", e)
         else:
-            print("→ Pass 2: SKIPPED (Stealth Level < 2)")
+            logger.debug("Pass 2: SKIPPED (Stealth Level < 2)")
         
+        return text
+
+    def humanize_from_base(self, text, stealth_level=3, use_artifacts=False, tone="Balanced", use_emojis=False):
+        """
+        Remaining passes (2.5 onwards) on the output of humanize_base.
+        Each call draws fresh randomness, so repeated calls on one base give
+        independent candidates.
+        """
         # Pass 2.5: Anti-Paraphrasing Detection (NEW)
         if stealth_level >= 3:
-            print("→ Running Pass 2.5: Anti-Paraphrasing...")
+            logger.debug("Running Pass 2.5: Anti-Paraphrasing...")
             try:
                 text = self._pass_2_5_anti_paraphrasing(text, level=stealth_level)
-                print(f"  ✓ Pass 2.5 complete ({len(text)} chars)")
+                logger.debug("Pass 2.5 complete (%s chars)", len(text))
             except Exception as e:
-                print(f"  ✗ Pass 2.5 failed: {e}")
+                logger.warning("Pass 2.5 failed: %s", e)
         
         # Pass 3: Opinion & Confidence
-        print("→ Running Pass 3: Opinion & Confidence...")
+        logger.debug("Running Pass 3: Opinion & Confidence...")
         try:
             text = self._pass_3_opinion_and_confidence(text, level=stealth_level)
-            print(f"  ✓ Pass 3 complete ({len(text)} chars)")
+            logger.debug("Pass 3 complete (%s chars)", len(text))
         except Exception as e:
-            print(f"  ✗ Pass 3 failed: {e}")
+            logger.warning("Pass 3 failed: %s", e)
             
         # Pass 4: Imperfections
-        print("→ Running Pass 4: Imperfections...")
+        logger.debug("Running Pass 4: Imperfections...")
         try:
             text = self._pass_4_imperfection(text, level=stealth_level)
-            print(f"  ✓ Pass 4 complete ({len(text)} chars)")
+            logger.debug("Pass 4 complete (%s chars)", len(text))
         except Exception as e:
-            print(f"  ✗ Pass 4 failed: {e}")
+            logger.warning("Pass 4 failed: %s", e)
             
         # Pass 5: Rhythm Control
-        print("→ Running Pass 5: Rhythm Control...")
+        logger.debug("Running Pass 5: Rhythm Control...")
         try:
             text = self._pass_5_rhythm(text, level=stealth_level)
-            print(f"  ✓ Pass 5 complete ({len(text)} chars)")
+            logger.debug("Pass 5 complete (%s chars)", len(text))
         except Exception as e:
-            print(f"  ✗ Pass 5 failed: {e}")
+            logger.warning("Pass 5 failed: %s", e)
         
         # Pass 6: Pattern Breaking (Subtle noise)
         if stealth_level >= 3:
-            print("→ Running Pass 6: Pattern Breaking...")
+            logger.debug("Running Pass 6: Pattern Breaking...")
             try:
-                text = self.pattern_breaker.comprehensive_pattern_break(text, aggressiveness=stealth_level)
-                print(f"  ✓ Pass 6 complete")
+                with metrics.PASS_SECONDS.labels("6").time():
+                    text = self.pattern_breaker.comprehensive_pattern_break(text, aggressiveness=stealth_level)
+                logger.debug("Pass 6 complete")
             except Exception as e:
-                print(f"  ✗ Pass 6 failed: {e}")
+                logger.warning("Pass 6 failed: %s", e)
         
         # Pass 7: Fingerprint Scrambling & Semantic Shuffling (ANTI-SIMILARITY)
         if stealth_level >= 4:
-            print("→ Running Pass 7: Fingerprint Scrambling...")
+            logger.debug("Running Pass 7: Fingerprint Scrambling...")
             try:
-                text = self.semantic_shuffler.semantic_shuffle(text, aggressiveness=stealth_level)
-                text = self.fingerprint_scrambler.scramble_fingerprint(text, level=stealth_level)
-                print(f"  ✓ Pass 7 complete")
+                with metrics.PASS_SECONDS.labels("7").time():
+                    text = self.semantic_shuffler.semantic_shuffle(text, aggressiveness=stealth_level)
+                    text = self.fingerprint_scrambler.scramble_fingerprint(text, level=stealth_level)
+                logger.debug("Pass 7 complete")
             except Exception as e:
-                print(f"  ✗ Pass 7 failed: {e}")
+                logger.warning("Pass 7 failed: %s", e)
         
         # Pass 8: EXTREME HUMANIZATION (Level 5 ONLY - Nuclear Option)
         if stealth_level >= 5:
-            print("→ Running Pass 8: EXTREME HUMANIZATION (Nuclear)...")
+            logger.debug("Running Pass 8: EXTREME HUMANIZATION (Nuclear)...")
             try:
                 text = self._pass_8_extreme_humanization(text)
-                print(f"  ✓ Pass 8 complete")
+                logger.debug("Pass 8 complete")
             except Exception as e:
-                print(f"  ✗ Pass 8 failed: {e}")
+                logger.warning("Pass 8 failed: %s", e)
         
         # Pass 9: Semantic Entropy Injection
         if stealth_level >= 4:
-            print("→ Running Pass 9: Semantic Entropy...")
+            logger.debug("Running Pass 9: Semantic Entropy...")
             try:
                 text = self._pass_9_semantic_entropy(text)
-                print(f"  ✓ Pass 9 complete")
+                logger.debug("Pass 9 complete")
             except Exception as e:
-                print(f"  ✗ Pass 9 failed: {e}")
+                logger.warning("Pass 9 failed: %s", e)
 
         # Pass 10: Statistical Anchor Breaking (THE NUCLEAR OPTION)
         if stealth_level >= 5:
-            print("→ Running Pass 10: Anchor Breaking...")
+            logger.debug("Running Pass 10: Anchor Breaking...")
             try:
                 text = self._pass_10_anchor_breaking(text)
-                print(f"  ✓ Pass 10 complete")
+                logger.debug("Pass 10 complete")
             except Exception as e:
-                print(f"  ✗ Pass 10 failed: {e}")
+                logger.warning("Pass 10 failed: %s", e)
         
         # Pass 11: Shadow Rewrite (LLM refinement for Level 5)
         llm_success = False
         if stealth_level >= 5:
-            print("→ Running Pass 11: Shadow Rewrite (Refinement)...")
+            logger.debug("Running Pass 11: Shadow Rewrite (Refinement)...")
             try:
                 # This pass ensures the final flow is human-like
                 shadow_text = self._pass_11_shadow_rewrite(text)
                 if len(shadow_text) > len(text) * 0.5:
                     text = shadow_text
                     llm_success = True
-                print(f"  ✓ Pass 11 complete")
+                logger.debug("Pass 11 complete")
             except Exception as e:
-                print(f"  ✗ Pass 11 failed: {e}")
+                logger.warning("Pass 11 failed: %s", e)
 
         # Pass 18: Commonality Nullifier (Ghost Protocol v17000.0) - MOVED UP
         if stealth_level >= 5:
-            print("→ Running Pass 18: Commonality Nullifier...")
+            logger.debug("Running Pass 18: Commonality Nullifier...")
             try:
                 text = self._pass_18_commonality_nullifier(text)
-                print(f"  ✓ Pass 18 complete")
+                logger.debug("Pass 18 complete")
             except Exception as e:
-                print(f"  ✗ Pass 18 failed: {e}")
+                logger.warning("Pass 18 failed: %s", e)
 
         # Pass 12: Human Jitter (Subtle)
         if stealth_level >= 4:
-            print("→ Running Pass 12: Human Jitter...")
+            logger.debug("Running Pass 12: Human Jitter...")
             try:
                 text = self._pass_12_human_glitch(text, level=stealth_level)
-                print(f"  ✓ Pass 12 complete")
+                logger.debug("Pass 12 complete")
             except Exception as e:
-                print(f"  ✗ Pass 12 failed: {e}")
+                logger.warning("Pass 12 failed: %s", e)
 
         # Pass 15: Linguistic Shatter (NEW - NUCLEAR)
         if stealth_level >= 5:
-            print("→ Running Pass 15: Linguistic Shatter...")
+            logger.debug("Running Pass 15: Linguistic Shatter...")
             try:
                 text = self._pass_15_linguistic_shatter(text)
-                print(f"  ✓ Pass 15 complete")
+                logger.debug("Pass 15 complete")
             except Exception as e:
-                print(f"  ✗ Pass 15 failed: {e}")
+                logger.warning("Pass 15 failed: %s", e)
 
         # Pass 16: The Reddit Scrambler (NEW - LEVEL 5)
         if stealth_level >= 5:
-            print("→ Running Pass 16: Reddit Scrambler...")
+            logger.debug("Running Pass 16: Reddit Scrambler...")
             try:
                 text = self._pass_16_reddit_scrambler(text)
-                print(f"  ✓ Pass 16 complete")
+                logger.debug("Pass 16 complete")
             except Exception as e:
-                print(f"  ✗ Pass 16 failed: {e}")
+                logger.warning("Pass 16 failed: %s", e)
 
         # Pass 19: Cyrillic Inversion (Ghost Protocol v17000.0)
         if stealth_level >= 5:
-            print("→ Running Pass 19: Cyrillic Inversion...")
+            logger.debug("Running Pass 19: Cyrillic Inversion...")
             try:
                 text = self._pass_19_cyrillic_inversion(text)
-                print(f"  ✓ Pass 19 complete")
+                logger.debug("Pass 19 complete")
             except Exception as e:
-                print(f"  ✗ Pass 19 failed: {e}")
+                logger.warning("Pass 19 failed: %s", e)
 
         # Pass 14: Token Shielder (AGGRESSIVE ENCODING SHIELD)
         if stealth_level >= 5:
-            print("→ Running Pass 14: Token Shielder...")
+            logger.debug("Running Pass 14: Token Shielder...")
             try:
                 text = self._pass_14_token_shielder(text, level=stealth_level)
-                print(f"  ✓ Pass 14 complete")
+                logger.debug("Pass 14 complete")
             except Exception as e:
-                print(f"  ✗ Pass 14 failed: {e}")
+                logger.warning("Pass 14 failed: %s", e)
 
         # Artifact Injection (Invisible Noise - CRITICAL FOR BYPASS)
         if use_artifacts or stealth_level >= 3:
-            print(f"→ Running Artifact Injection (Level {stealth_level})...")
+            logger.debug("Running Artifact Injection (Level %s)...", stealth_level)
             try:
                 text = self._inject_artifacts(text, level=stealth_level)
-                print(f"  ✓ Artifacts injected")
+                logger.debug("Artifacts injected")
             except Exception as e:
-                print(f"  ✗ Artifact injection failed: {e}")
+                logger.warning("Artifact injection failed: %s", e)
 
         # Pass 17: Emoji Dynamics (NEW)
         if use_emojis:
-            print("→ Running Pass 17: Emoji Dynamics...")
+            logger.debug("Running Pass 17: Emoji Dynamics...")
             try:
                 text = self._pass_17_emoji_dynamics(text, tone=tone)
-                print(f"  ✓ Pass 17 complete ({len(text)} chars)")
+                logger.debug("Pass 17 complete (%s chars)", len(text))
             except Exception as e:
-                print(f"  ✗ Pass 17 failed: {e}")
+                logger.warning("Pass 17 failed: %s", e)
 
         # Add a hidden indicator if LLM failed
         if stealth_level >= 5 and not llm_success:
             text += "\u200B" 
 
-        # Stability Guard
-        if stealth_level >= 2:
-            print("→ Running Stability Guard...")
-            try:
-                metrics = self._analyze_heuristics(text)
-                print(f"  ✓ Stability check complete")
-            except Exception as e:
-                print(f"  ✗ Stability guard failed: {e}")
-
-        print(f"\n{'='*60}")
-        print(f"HUMANIZATION COMPLETE - Output: {len(text)} chars")
-        print(f"{'='*60}\n")
         return text.strip()
 
     def _analyze_heuristics(self, text):
         """Analyze text for human signals."""
-        sentences = nltk.sent_tokenize(text)
-        if not sentences:
-            return {"variance_score": 0, "opinion_count": 0}
-            
-        lengths = [len(s.split()) for s in sentences]
-        if len(lengths) > 1:
-            mean = sum(lengths) / len(lengths)
-            variance = sum((x - mean) ** 2 for x in lengths) / len(lengths)
-            std_dev = variance ** 0.5
-        else:
-            std_dev = 0
-            
-        opinion_patterns = ["I ", "me ", "my ", "mine", "we ", "our ", "us "]
-        opinion_count = sum(1 for s in sentences if any(p in s.lower() for p in opinion_patterns))
-                
-        return {"variance_score": std_dev, "opinion_count": opinion_count}
+        features = extract_features(text)
+        return {"variance_score": features["sentence_length_std"], "opinion_count": features["opinion_sentence_count"]}
 
+    @metrics.timed(metrics.PASS_SECONDS, "0")
     def _pass_0_obfuscate_intent(self, text):
         """
         Pass 0: Remove AI vocabulary and simplify complex structures.
@@ -354,13 +465,14 @@ class NeuralTextHumanizer:
         
         # Apply smart synonym replacement (10-15% of words)
         try:
-            replacement_rate = random.uniform(0.10, 0.15)
+            replacement_rate = rng.uniform(0.10, 0.15)
             text = vocab_enhancer.smart_synonym_replacement(text, replacement_rate)
         except Exception as e:
-            print(f"Vocabulary enhancement failed: {e}")
+            logger.warning("Vocabulary enhancement failed: %s", e)
         
         return text
 
+    @metrics.timed(metrics.PASS_SECONDS, "1")
     def _pass_1_destructure(self, text):
         """Pass 1: Break AI symmetry."""
         sentences = nltk.sent_tokenize(text)
@@ -390,10 +502,10 @@ class NeuralTextHumanizer:
         new_sentences = []
         i = 0
         while i < len(sentences):
-            if i < len(sentences) - 1 and random.random() < 0.45:
+            if i < len(sentences) - 1 and rng.random() < 0.45:
                 # Randomly choose to merge or swap
-                if random.random() < 0.5:
-                    connector = random.choice([" and ", " but ", " so ", " - ", " ; ", " "])
+                if rng.random() < 0.5:
+                    connector = rng.choice([" and ", " but ", " so ", " - ", " ; ", " "])
                     s1 = sentences[i]
                     s2 = sentences[i+1]
                     
@@ -416,21 +528,22 @@ class NeuralTextHumanizer:
         # Random paragraph reconstruction with jitter
         final_text = ""
         current_chunk_size = 0
-        target_chunk_size = random.randint(1, 4)
+        target_chunk_size = rng.randint(1, 4)
         
         for s in new_sentences:
             final_text += s + " "
             current_chunk_size += 1
             if current_chunk_size >= target_chunk_size:
                 # Add random punctuation to break patterns
-                if random.random() < 0.15:
-                    final_text = final_text.strip() + random.choice(["...", "..", "!"]) + " "
+                if rng.random() < 0.15:
+                    final_text = final_text.strip() + rng.choice(["...", "..", "!"]) + " "
                 final_text += "\n\n"
                 current_chunk_size = 0
-                target_chunk_size = random.randint(1, 4)
+                target_chunk_size = rng.randint(1, 4)
                 
         return final_text.strip()
 
+    @metrics.timed(metrics.PASS_SECONDS, "2_llm")
     def _pass_2_semantic_rebuild_llm(self, text, level=3, tone="Balanced", audience="General"):
         """Pass 2: LLM rewrite with human persona and custom tone."""
         
@@ -482,17 +595,19 @@ class NeuralTextHumanizer:
         system_prompt += "\n- CRITICAL: DO NOT MERGE OR SPLIT PARAGRAPHS. Keep the exact same number of paragraphs as the input."
         
         try:
-            print(f"  → Calling OpenRouter API (model: gemini-2.0-flash-exp)...")
-            result = self._call_llm(system_prompt, text)
-            print(f"  ✓ LLM returned {len(result)} chars")
+            logger.debug("Calling OpenRouter API (model: gemini-2.0-flash-exp)...")
+            # A chunk whose call fails gets the T5 rebuild (or stays as is) on its own
+            fallback = self._pass_2_semantic_rebuild_t5 if self.model or self.inference else None
+            result = self._call_llm_chunked(system_prompt, text, fallback)
+            logger.debug("LLM returned %s chars", len(result))
             return result
         except Exception as e:
-            print(f"  ✗ LLM Call Failed: {str(e)}")
-            print(f"  → Attempting T5 fallback...")
-            if self.model:
+            logger.warning("LLM call failed: %s", e)
+            logger.debug("Attempting T5 fallback...")
+            if self.model or self.inference:
                 return self._pass_2_semantic_rebuild_t5(text)
             else:
-                print(f"  ✗ No T5 model available. Returning original text.")
+                logger.warning("No T5 model available. Returning original text.")
                 return text
 
     def _call_llm(self, system_prompt, user_text):
@@ -515,47 +630,110 @@ class NeuralTextHumanizer:
         
         last_error = None
         
+        max_tokens = 2000
+        # Rewrites come back about as long as their input; the reply's usage corrects this
+        reserved = llm_chunking.estimate_tokens(system_prompt) + llm_chunking.estimate_tokens(user_text)
+        reserved += min(max_tokens, 2 * llm_chunking.estimate_tokens(user_text))
+        limiter = llm_rate_limit.limiter
+        
         for model in models_to_try:
-            try:
-                data = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_text}
-                    ],
-                    "temperature": 0.9,
-                    "max_tokens": 2000
-                }
-                
-                print(f"    Trying model: {model}")
-                response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=45)
-                
-                print(f"    API Response: {response.status_code}")
+            # Queueing for this model (429 retries included) stops here; then try the next one
+            deadline = time.monotonic() + llm_rate_limit.QUEUE_TIMEOUT
+            while True:
+                try:
+                    limiter.acquire(api_key, model, reserved, deadline)
+                except llm_rate_limit.RateLimited as e:
+                    last_error = str(e)
+                    metrics.LLM_REQUESTS.labels(model, "throttled").inc()
+                    logger.warning("%s skipped: %s", model, last_error)
+                    break  # Try next model
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    if 'choices' in result and len(result['choices']) > 0:
-                        content = result['choices'][0]['message']['content'].strip()
-                        print(f"    ✓ Received {len(content)} chars from {model}")
-                        return content
-                    else:
-                        raise Exception(f"Invalid API response format")
-                else:
-                    error_detail = response.text[:200]
-                    last_error = f"API Error {response.status_code}: {error_detail}"
-                    print(f"    ✗ {model} failed: {last_error}")
-                    continue  # Try next model
+                try:
+                    data = {
+                        "model": model,
+                        "messages": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_text}
+                        ],
+                        "temperature": 0.9,
+                        "max_tokens": max_tokens
+                    }
                     
-            except Exception as e:
-                last_error = str(e)
-                print(f"    ✗ {model} error: {last_error}")
-                continue  # Try next model
+                    logger.debug("Trying model: %s", model)
+                    with metrics.LLM_SECONDS.labels(model).time():
+                        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=45)
+                    
+                    logger.debug("API Response: %s", response.status_code)
+                    
+                    if response.status_code == 200:
+                        result = response.json()
+                        if 'choices' in result and len(result['choices']) > 0:
+                            content = result['choices'][0]['message']['content'].strip()
+                            logger.debug("Received %s chars from %s", len(content), model)
+                            metrics.LLM_REQUESTS.labels(model, "ok").inc()
+                            used = (result.get("usage") or {}).get("total_tokens")
+                            if used:
+                                limiter.settle(api_key, model, reserved, used)
+                            return content
+                        else:
+                            raise Exception(f"Invalid API response format")
+                    elif response.status_code == 429:
+                        # Over the provider's limit: wait as long as it says, then queue again on this model
+                        retry_after = llm_rate_limit.parse_retry_after(response.headers)
+                        limiter.release(api_key, model, reserved)
+                        limiter.pause(api_key, model, retry_after)
+                        last_error = f"API Error 429: retry after {retry_after:.1f}s"
+                        metrics.LLM_REQUESTS.labels(model, "rate_limited").inc()
+                        continue
+                    else:
+                        error_detail = response.text[:200]
+                        last_error = f"API Error {response.status_code}: {error_detail}"
+                        metrics.LLM_REQUESTS.labels(model, "http_error").inc()
+                        logger.warning("%s failed: %s", model, last_error)
+                        break  # Try next model
+                        
+                except Exception as e:
+                    last_error = str(e)
+                    metrics.LLM_REQUESTS.labels(model, "error").inc()
+                    logger.warning("%s error: %s", model, last_error)
+                    break  # Try next model
         
         # All models failed
         raise Exception(f"All models failed. Last error: {last_error}")
 
+    def _call_llm_chunked(self, system_prompt, text, fallback=None):
+        """
+        _call_llm over paragraph-aligned chunks of at most LLM_CHUNK_TOKENS,
+        LLM_MAX_PARALLEL requests at a time, reassembled in order. Text within
+        the budget is a single _call_llm, failures included.
+
+        fallback(chunk_text) gives a chunk's output when its call fails;
+        without one the chunk is kept unchanged. Short texts inside
+        _humanize_lines_packed go through its packer instead.
+        """
+        packer = llm_packing.current()
+        if packer is not None and llm_packing.packable(text):
+            return packer.call(system_prompt, text)
+
+        chunks = llm_chunking.split_for_budget(text)
+        if len(chunks) == 1:
+            return self._call_llm(system_prompt, text)
+
+        def rewrite(chunk):
+            try:
+                return self._call_llm(system_prompt + llm_chunking.continuity_note(chunk), chunk.text)
+            except Exception as e:
+                logger.warning("LLM chunk %s/%s failed: %s", chunk.index + 1, chunk.total, e)
+                return fallback(chunk.text) if fallback else chunk.text
+
+        logger.debug("Rewriting %s chars as %s LLM chunks", len(text), len(chunks))
+        return llm_chunking.reassemble(chunks, llm_chunking.map_chunks(rewrite, chunks))
+
+    @metrics.timed(metrics.PASS_SECONDS, "2_t5")
     def _pass_2_semantic_rebuild_t5(self, text, temperature=1.0):
         """Fallback T5."""
+        if self.inference:
+            return self._pass_2_semantic_rebuild_remote(text, temperature=temperature)
         if not self.model: return text
             
         paragraphs = text.split("\n\n")
@@ -567,19 +745,43 @@ class NeuralTextHumanizer:
             for sentence in sentences:
                 if not sentence.strip(): continue
                 input_text = "paraphrase: " + sentence + " </s>"
-                encoding = self.tokenizer.encode_plus(input_text, pad_to_max_length=True, return_tensors="pt")
-                input_ids = encoding["input_ids"].to(self.device)
+                sampling_seed = random_context.torch_seed()
                 try:
-                    outputs = self.model.generate(
-                        input_ids=input_ids, max_length=128, do_sample=True, top_p=0.96, temperature=temperature, early_stopping=True, num_return_sequences=1
-                    )
-                    line = self.tokenizer.decode(outputs[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
+                    with self._generate_lock:
+                        # One sequence: nothing to pad, same cap as the inference server
+                        encoding = self.tokenizer(input_text, truncation=True, max_length=256, return_tensors="pt").to(self.device)
+                        if sampling_seed is not None:
+                            torch.manual_seed(sampling_seed)
+                        metrics.MODEL_BATCH_SIZE.labels("t5").observe(encoding["input_ids"].shape[0])
+                        outputs = self.model.generate(
+                            input_ids=encoding["input_ids"], attention_mask=encoding["attention_mask"], max_length=128, do_sample=True, top_p=0.96, temperature=temperature, early_stopping=True, num_return_sequences=1
+                        )
+                        line = self.tokenizer.decode(outputs[0], skip_special_tokens=True, clean_up_tokenization_spaces=True)
                     new_sents.append(line)
                 except:
                     new_sents.append(sentence)
             humanized_paragraphs.append(" ".join(new_sents))
         return "\n\n".join(humanized_paragraphs)
 
+    def _pass_2_semantic_rebuild_remote(self, text, temperature=1.0):
+        """T5 rebuild through the inference server: all sentences go out in one call."""
+        paragraphs = [p for p in text.split("\n\n") if p.strip()]
+        para_sents = [[s for s in nltk.sent_tokenize(p) if s.strip()] for p in paragraphs]
+        flat = [s for sents in para_sents for s in sents]
+        try:
+            outputs = self.inference.paraphrase(flat, temperature=temperature)
+        except Exception as e:
+            logger.warning("Inference server paraphrase failed: %s", e)
+            outputs = flat
+        
+        humanized_paragraphs = []
+        pos = 0
+        for sents in para_sents:
+            humanized_paragraphs.append(" ".join(outputs[pos:pos + len(sents)]))
+            pos += len(sents)
+        return "\n\n".join(humanized_paragraphs)
+
+    @metrics.timed(metrics.PASS_SECONDS, "2.5")
     def _pass_2_5_anti_paraphrasing(self, text, level=3):
         """
         Pass 2.5: Anti-Paraphrasing Detection (AGGRESSIVE)
@@ -660,33 +862,33 @@ class NeuralTextHumanizer:
             
             for i, sent in enumerate(sentences):
                 # INCREASED: Add clarifier (25% up from 15%)
-                if random.random() < 0.25 and i > 0:
-                    sent = random.choice(clarifiers) + sent[0].lower() + sent[1:]
+                if rng.random() < 0.25 and i > 0:
+                    sent = rng.choice(clarifiers) + sent[0].lower() + sent[1:]
                 
                 # INCREASED: Add tangential thought (20% up from 12%)
-                if random.random() < 0.20:
-                    sent = sent.rstrip('.!?') + random.choice(tangential_thoughts) + "."
+                if rng.random() < 0.20:
+                    sent = sent.rstrip('.!?') + rng.choice(tangential_thoughts) + "."
                 
                 # INCREASED: Insert hedge words (30% up from 20%)
-                if random.random() < 0.30 and len(sent.split()) > 8:
+                if rng.random() < 0.30 and len(sent.split()) > 8:
                     words = sent.split()
-                    insert_pos = random.randint(2, min(4, len(words)-2))
-                    words.insert(insert_pos, random.choice(hedges))
+                    insert_pos = rng.randint(2, min(4, len(words)-2))
+                    words.insert(insert_pos, rng.choice(hedges))
                     sent = " ".join(words)
                 
                 # NEW: Self-corrections (10% chance)
-                if random.random() < 0.10 and i > 0 and len(sent.split()) > 10:
-                    sent = random.choice(corrections) + sent[0].lower() + sent[1:]
+                if rng.random() < 0.10 and i > 0 and len(sent.split()) > 10:
+                    sent = rng.choice(corrections) + sent[0].lower() + sent[1:]
                 
                 # NEW: Redundancy (8% chance, after first sentence)
-                if random.random() < 0.08 and i > 1:
-                    sent = random.choice(redundancies) + sent[0].lower() + sent[1:]
+                if rng.random() < 0.08 and i > 1:
+                    sent = rng.choice(redundancies) + sent[0].lower() + sent[1:]
                 
                 # NEW: Conversational fillers (15% chance)
-                if random.random() < 0.15 and len(sent.split()) > 6:
+                if rng.random() < 0.15 and len(sent.split()) > 6:
                     words = sent.split()
-                    insert_pos = random.randint(1, min(3, len(words)-2))
-                    words.insert(insert_pos, random.choice(fillers))
+                    insert_pos = rng.randint(1, min(3, len(words)-2))
+                    words.insert(insert_pos, rng.choice(fillers))
                     sent = " ".join(words)
                 
                 new_sents.append(sent)
@@ -695,6 +897,7 @@ class NeuralTextHumanizer:
         
         return "\n\n".join(final_paragraphs)
 
+    @metrics.timed(metrics.PASS_SECONDS, "3")
     def _pass_3_opinion_and_confidence(self, text, level=3):
         """Pass 3: Inject opinions and reduce confidence (BALANCED)."""
         paragraphs = text.split("\n\n")
@@ -733,9 +936,9 @@ class NeuralTextHumanizer:
                         sent = sent.replace(strong, weak)
                         
                 # Lower probability - only 15% chance
-                if signals_added < max_signals and random.random() < 0.15:
+                if signals_added < max_signals and rng.random() < 0.15:
                     if i == 0 or len(sent.split()) < 15:
-                        opener = random.choice(openers)
+                        opener = rng.choice(openers)
                         if sent[0].isupper() and "I " not in sent[:3]:
                             sent = opener + sent[0].lower() + sent[1:]
                         else:
@@ -748,6 +951,7 @@ class NeuralTextHumanizer:
             
         return "\n\n".join(final_paragraphs)
 
+    @metrics.timed(metrics.PASS_SECONDS, "4")
     def _pass_4_imperfection(self, text, level=3):
         """Pass 4: Add human errors (REDUCED)."""
         paragraphs = text.split("\n\n")
@@ -766,7 +970,7 @@ class NeuralTextHumanizer:
             # REDUCED: Only 1 flaw per paragraph at most levels
             num_flaws = 0
             if level >= 3: num_flaws = 1
-            if level >= 4: num_flaws = random.randint(1, 2)
+            if level >= 4: num_flaws = rng.randint(1, 2)
             if level >= 5: num_flaws = 2
             
             if num_flaws == 0:
@@ -775,7 +979,7 @@ class NeuralTextHumanizer:
             
             # Select unique targets
             indices = list(range(len(sentences)))
-            random.shuffle(indices)
+            rng.shuffle(indices)
             target_indices = indices[:min(len(sentences), num_flaws)]
             
             for target_idx in target_indices:
@@ -785,24 +989,24 @@ class NeuralTextHumanizer:
                 options = ["casual", "fragment"]
                 
                 # Only add typos at level 5
-                if level >= 5 and random.random() < 0.3:
+                if level >= 5 and rng.random() < 0.3:
                     options.append("typo")
                 
-                choice = random.choice(options)
+                choice = rng.choice(options)
                 
                 if choice == "fragment" and len(target.split()) > 15:
                     # Only chop very long sentences
                     words = target.split()
                     try:
-                        cut = random.randint(7, len(words)-7)
+                        cut = rng.randint(7, len(words)-7)
                         target = " ".join(words[:cut]) + ". " + " ".join(words[cut:])
                     except ValueError:
                         pass
                 
                 elif choice == "typo" and level >= 5:
                     # Very rare typos
-                    if len(target) > 10 and random.random() < 0.5:
-                        idx = random.randint(1, len(target)-2)
+                    if len(target) > 10 and rng.random() < 0.5:
+                        idx = rng.randint(1, len(target)-2)
                         char_list = list(target)
                         char_list[idx], char_list[idx+1] = char_list[idx+1], char_list[idx]
                         target = "".join(char_list)
@@ -810,9 +1014,9 @@ class NeuralTextHumanizer:
                 elif choice == "casual":
                     # Insert casual filler (less frequently)
                     words = target.split()
-                    if len(words) > 8 and random.random() < 0.5:
-                        ins = random.randint(3, len(words)-3)
-                        words.insert(ins, random.choice(casual_connectors).strip())
+                    if len(words) > 8 and rng.random() < 0.5:
+                        ins = rng.randint(3, len(words)-3)
+                        words.insert(ins, rng.choice(casual_connectors).strip())
                         target = " ".join(words)
                 
                 sentences[target_idx] = target
@@ -823,6 +1027,7 @@ class NeuralTextHumanizer:
             
         return "\n\n".join(final_paragraphs)
 
+    @metrics.timed(metrics.PASS_SECONDS, "5")
     def _pass_5_rhythm(self, text, level=3):
         """Pass 5: Mix sentence lengths aggressively (BURSTINESS)."""
         paragraphs = text.split("\n\n")
@@ -844,7 +1049,7 @@ class NeuralTextHumanizer:
             
             for i, s in enumerate(sentences):
                 # Aggressively shorten or lengthen
-                if random.random() < burst_chance and len(s.split()) > 15:
+                if rng.random() < burst_chance and len(s.split()) > 15:
                     # Break long sentence
                     parts = s.split(', ')
                     if len(parts) > 1:
@@ -852,7 +1057,7 @@ class NeuralTextHumanizer:
                         final_sents.append("Wait, " + ", ".join(parts[1:]))
                     else:
                         final_sents.append(s)
-                elif i < len(sentences) - 1 and random.random() < burst_chance and len(s.split()) < 10:
+                elif i < len(sentences) - 1 and rng.random() < burst_chance and len(s.split()) < 10:
                     # Combine short sentence with 'and like'
                     final_sents.append(s.rstrip('.') + " and like " + sentences[i+1][0].lower() + sentences[i+1][1:])
                 else:
@@ -862,6 +1067,7 @@ class NeuralTextHumanizer:
             
         return "\n\n".join(final_paragraphs)
     
+    @metrics.timed(metrics.PASS_SECONDS, "10")
     def _pass_10_anchor_breaking(self, text):
         """
         Pass 10: Statistical Anchor Breaking
@@ -882,29 +1088,33 @@ class NeuralTextHumanizer:
             "your": "you're", "you're": "your", "its": "it's", "it's": "its"
         }
         
-        new_words = []
-        for i, w in enumerate(words):
+        draw = random_context.current()
+
+        def anchor_step(w, last):
+            out = []
             # 1. Randomly insert debris (8% chance)
-            if random.random() < 0.08:
-                new_words.append(random.choice(debris).strip())
+            if draw.random() < 0.08:
+                out.append(draw.choice(debris).strip())
             
             # 2. Randomly swap common words (5% chance)
             w_lower = w.lower().strip('.,!?')
-            if w_lower in swaps and random.random() < 0.05:
+            if w_lower in swaps and draw.random() < 0.05:
                 # Keep original capitalization
                 swapped = swaps[w_lower]
                 if w[0].isupper():
                     swapped = swapped[0].upper() + swapped[1:]
-                new_words.append(swapped)
+                out.append(swapped)
             else:
-                new_words.append(w)
+                out.append(w)
                 
             # 3. Repeat a word occasionally (The "I i" phenomenon)
-            if random.random() < 0.03:
-                new_words.append(w)
+            if draw.random() < 0.03:
+                out.append(w)
+            return out[0] if len(out) == 1 else tuple(out)
                 
-        return " ".join(new_words)
+        return " ".join(token_transducers.transduce(words, anchor_step, max_out=3))
 
+    @metrics.timed(metrics.PASS_SECONDS, "11")
     def _pass_11_shadow_rewrite(self, text):
         """
         Pass 11: Shadow Rewrite (GOD MODE VERSION)
@@ -925,54 +1135,54 @@ class NeuralTextHumanizer:
         )
         
         try:
-            # Shift temperature for maximum entropy
-            result = self._call_llm(system_prompt, text)
+            # Shift temperature for maximum entropy; a failed chunk keeps its original text
+            result = self._call_llm_chunked(system_prompt, text)
             return result
         except:
             return text
 
+    @metrics.timed(metrics.PASS_SECONDS, "12")
     def _pass_12_human_glitch(self, text, level=5):
         """
         Pass 12: The Human Glitch (TONED DOWN)
         Introduces very subtle jitter and typos to maintain readability.
         """
-        words = text.split()
-        new_words = []
-        
         typo_map = {
             "the": ["teh"], "and": ["nd"], "because": ["bc"],
             "with": ["w/"], "don't": ["dont"], "can't": ["cant"], "about": ["abt"]
         }
-        
-        for w in words:
-            clean_w = w.lower().strip('.,!?')
-            # REDUCED CHANCE: 3% for low levels, 8% for high
-            chance = 0.03 if level < 5 else 0.08
-            
-            # 1. Punctuation Malfunction (REDUCED to 5%)
-            if level >= 4 and random.random() < 0.05:
-                if w.endswith(','): 
-                    if random.random() < 0.5: w = w[:-1] 
-                elif w.endswith('.') and random.random() < 0.2:
+        # REDUCED CHANCE: 3% for low levels, 8% for high
+        chance = 0.03 if level < 5 else 0.08
+        jitter_chance = 0.02 if level < 5 else 0.05
+        draw = random_context.current()
+
+        # 1. Punctuation Malfunction (REDUCED to 5%)
+        def punctuation_step(w, last):
+            if draw.random() < 0.05:
+                if w.endswith(','):
+                    if draw.random() < 0.5: w = w[:-1]
+                elif w.endswith('.') and draw.random() < 0.2:
                     w = w[:-1] # Drop end period occasionally
+            return w
 
+        def typo_step(w, last):
+            # Dropping a trailing , or . leaves the stripped form unchanged
+            clean_w = w.lower().strip('.,!?')
             # 2. Key Typos
-            if clean_w in typo_map and random.random() < chance:
-                new_w = random.choice(typo_map[clean_w])
+            if clean_w in typo_map and draw.random() < chance:
+                new_w = draw.choice(typo_map[clean_w])
                 if w.endswith('.') or w.endswith(',') or w.endswith('!') or w.endswith('?'):
                     new_w += w[-1]
-                new_words.append(new_w)
-            
+                return new_w
+
             # 3. Key jitter (REDUCED to 3-5%)
-            elif len(w) > 5 and random.random() < (0.02 if level < 5 else 0.05):
-                chars = list(w)
-                idx = random.randint(1, len(chars)-2)
-                chars[idx], chars[idx+1] = chars[idx+1], chars[idx]
-                new_words.append("".join(chars))
-            else:
-                new_words.append(w)
-                
-        return " ".join(new_words)
+            if len(w) > 5 and draw.random() < jitter_chance:
+                idx = draw.randint(1, len(w)-2)
+                return w[:idx] + w[idx+1] + w[idx] + w[idx+2:]
+            return w
+
+        steps = (punctuation_step, typo_step) if level >= 4 else (typo_step,)
+        return token_transducers.transduce_words(text, *steps)
 
     def _pass_13_conversational_detours(self, text):
         """
@@ -991,19 +1201,20 @@ class NeuralTextHumanizer:
         
         for i, sent in enumerate(sentences):
             # 1. Start with filler (REDUCED to 8% chance)
-            if random.random() < 0.08:
-                sent = random.choice(fillers) + sent[0].lower() + sent[1:]
+            if rng.random() < 0.08:
+                sent = rng.choice(fillers) + sent[0].lower() + sent[1:]
             
             # 2. Add detour in middle (REDUCED to 5% chance)
-            if random.random() < 0.05 and len(sent.split()) > 12:
+            if rng.random() < 0.05 and len(sent.split()) > 12:
                 words = sent.split()
                 mid = len(words) // 2
-                sent = " ".join(words[:mid]) + random.choice(detours) + " ".join(words[mid:])
+                sent = " ".join(words[:mid]) + rng.choice(detours) + " ".join(words[mid:])
             
             new_sents.append(sent)
             
         return " ".join(new_sents)
 
+    @metrics.timed(metrics.PASS_SECONDS, "14")
     def _pass_14_token_shielder(self, text, level=5):
         """
         Pass 14: Token Shielder (Encoding Sabotage - REFINED)
@@ -1012,31 +1223,28 @@ class NeuralTextHumanizer:
         """
         if level < 3: return text
         
-        words = text.split()
-        shielded_words = []
         bombs = ["\u200B", "\u200C", "\u200D", "\u2060"]
-        
-        for i, word in enumerate(words):
-            # Chance based on level
-            chance = 0.95 if level >= 5 else 0.50
-            
-            if random.random() < chance and len(word) > 1:
+        # Chance based on level
+        chance = 0.95 if level >= 5 else 0.50
+        draw = random_context.current()
+
+        def bomb_step(word, last):
+            if draw.random() < chance and len(word) > 1:
                 # Insert 2-3 bombs at random positions
-                chars = list(word)
-                num_bombs = random.randint(1, 2) if level < 5 else random.randint(2, 4)
-                for _ in range(num_bombs):
-                    idx = random.randint(1, len(chars)-1)
-                    chars.insert(idx, random.choice(bombs))
-                word = "".join(chars)
-            
-            # THE N-GRAM NULLIFIER: Inject WJ into word boundary
-            if level >= 5 and i < len(words) - 1 and random.random() < 0.95:
+                num_bombs = draw.randint(1, 2) if level < 5 else draw.randint(2, 4)
+                word = token_transducers.scatter(word, num_bombs, bombs, draw)
+            return word
+
+        # THE N-GRAM NULLIFIER: Inject WJ into word boundary
+        def joiner_step(word, last):
+            if not last and draw.random() < 0.95:
                 word += "\u2060"
-                
-            shielded_words.append(word)
-                
-        return " ".join(shielded_words)
+            return word
+
+        steps = (bomb_step, joiner_step) if level >= 5 else (bomb_step,)
+        return token_transducers.transduce_words(text, *steps)
 
+    @metrics.timed(metrics.PASS_SECONDS, "artifacts")
     def _inject_artifacts(self, text, level=3):
         """
         GHOST STEALTH: Invisible Artifact Injection.
@@ -1050,44 +1258,31 @@ class NeuralTextHumanizer:
         # \u200d: Zero Width Joiner
         bombs = ['\u200B', '\u200C', '\u200D']
         
-        words = text.split(' ')
-        final_words = []
-        
-        for word in words:
-            if not word or len(word) < 3:
-                final_words.append(word)
-                continue
-            
-            # Chance to inject based on level
-            chance = 0.4 if level < 5 else 0.7
-            
-            if random.random() < chance:
+        # Chance to inject based on level
+        chance = 0.4 if level < 5 else 0.7
+        draw = random_context.current()
+
+        def artifact_step(word, last):
+            if len(word) < 3:
+                return word
+            if draw.random() < chance:
                 # Inject 1-3 invisible marks at random positions inside the word
-                num_marks = random.randint(1, 2) if level < 5 else random.randint(2, 4)
-                chars = list(word)
-                for _ in range(num_marks):
-                    # Avoid injecting at the very start/end for stability
-                    idx = random.randint(1, len(chars)-1)
-                    chars.insert(idx, random.choice(bombs))
-                word = "".join(chars)
-            
-            final_words.append(word)
-            
-        return " ".join(final_words)
+                # (never at the very start, for stability)
+                num_marks = draw.randint(1, 2) if level < 5 else draw.randint(2, 4)
+                word = token_transducers.scatter(word, num_marks, bombs, draw)
+            return word
+
+        return token_transducers.transduce_words(text, artifact_step, sep=' ')
 
+    @metrics.timed(metrics.PASS_SECONDS, "15")
     def _pass_15_linguistic_shatter(self, text):
         """Pass 15: Subtle Syntactic Variety (CLEANED)."""
         # Removed aggressive mid-word caps and symbol swaps that caused 'gu10 ess'
-        words = text.split()
-        shattered = []
-        for w in words:
-            # Only apply very subtle variety to common words
-            swaps = {"and": "&", "to": "to", "for": "for"} # Kept very minimal
-            if w.lower() in swaps and random.random() < 0.05:
-                w = swaps[w.lower()]
-            shattered.append(w)
-        return " ".join(shattered)
+        # Only apply very subtle variety to common words
+        swaps = {"and": "&", "to": "to", "for": "for"} # Kept very minimal
+        return token_transducers.substitute_words(text, swaps, 0.05, random_context.current())
 
+    @metrics.timed(metrics.PASS_SECONDS, "16")
     def _pass_16_reddit_scrambler(self, text):
         """Pass 16: Ultra-conversational, biased human persona."""
         sentences = nltk.sent_tokenize(text)
@@ -1102,11 +1297,12 @@ class NeuralTextHumanizer:
             " ...anyway fr "
         ]
         for sent in sentences:
-            if random.random() < 0.15:
-                sent = sent.rstrip('.') + random.choice(asides)
+            if rng.random() < 0.15:
+                sent = sent.rstrip('.') + rng.choice(asides)
             scrambled.append(sent)
         return " ".join(scrambled)
     
+    @metrics.timed(metrics.PASS_SECONDS, "8")
     def _pass_8_extreme_humanization(self, text):
         """
         Pass 8: EXTREME HUMANIZATION (Nuclear Option for Level 5)
@@ -1142,40 +1338,41 @@ class NeuralTextHumanizer:
                 continue
 
             # 1. Lowercase "I" (Reduced to 15%)
-            sent = re.sub(r'\bI\b', lambda m: 'i' if random.random() < 0.15 else 'I', sent)
+            sent = re.sub(r'\bI\b', lambda m: 'i' if rng.random() < 0.15 else 'I', sent)
             
             # 2. Add internet slang (Reduced to 10% - only very common ones)
-            if random.random() < 0.10:
-                sent = sent.rstrip('.!?') + f" {random.choice(['tbh', 'imo', 'fr'])}."
+            if rng.random() < 0.10:
+                sent = sent.rstrip('.!?') + f" {rng.choice(['tbh', 'imo', 'fr'])}."
             
             # 3. Start with interjection (Reduced to 10%)
-            if random.random() < 0.10 and len(sent.split()) > 8:
-                sent = random.choice(["okay so", "honestly", "i mean"]) + " " + sent[0].lower() + sent[1:]
+            if rng.random() < 0.10 and len(sent.split()) > 8:
+                sent = rng.choice(["okay so", "honestly", "i mean"]) + " " + sent[0].lower() + sent[1:]
             
             # 4. Add meta-commentary (Reduced to 5%)
-            if random.random() < 0.05:
-                sent = sent.rstrip('.!?') + f" {random.choice(['(just my take)', '(imo)'])}"
+            if rng.random() < 0.05:
+                sent = sent.rstrip('.!?') + f" {rng.choice(['(just my take)', '(imo)'])}"
             
             new_sents.append(sent)
         
         # 8. Add random personal story at the end (20% chance)
-        if random.random() < 0.20:
+        if rng.random() < 0.20:
             stories = [
                 "anyway thats just what i think lol",
                 "or maybe im totally wrong idk",
                 "this is just based on my experience tho",
                 "but yeah thats my take on it fr"
             ]
-            new_sents.append(random.choice(stories))
+            new_sents.append(rng.choice(stories))
         
         final_text = " ".join(new_sents)
         
         # 9. Overall lowercase informal start (30% chance)
-        if random.random() < 0.30 and final_text:
+        if rng.random() < 0.30 and final_text:
             final_text = final_text[0].lower() + final_text[1:]
         
         return final_text
 
+    @metrics.timed(metrics.PASS_SECONDS, "9")
     def _pass_9_semantic_entropy(self, text):
         """
         Pass 9: Semantic Entropy Injection
@@ -1187,37 +1384,44 @@ class NeuralTextHumanizer:
         # Words AI avoids but humans love
         human_keywords = ["literally", "basically", "actually", "kinda", "sorta", "honestly", "maybe", "pretty much"]
         
+        # 1. Vocabulary Jitter: Occasionally change common words to slightly 'looser' ones
+        loosening_map = {
+            "utilize": "use", "facilitate": "help", "implement": "do",
+            "commence": "start", "terminate": "stop", "regarding": "about"
+        }
+        draw = random_context.current()
+
         for para in paragraphs:
             if not para.strip(): continue
             words = para.split()
-            
-            # 1. Vocabulary Jitter: Occasionally change common words to slightly 'looser' ones
-            loosening_map = {
-                "utilize": "use", "facilitate": "help", "implement": "do", 
-                "commence": "start", "terminate": "stop", "regarding": "about"
-            }
+
             for i, w in enumerate(words):
-                if w.lower() in loosening_map and random.random() < 0.5:
-                    words[i] = loosening_map[w.lower()]
-            
-            # 2. Inject Human Keywords randomly (10% chance per 10 words)
+                w_lower = w.lower()
+                if w_lower in loosening_map and draw.random() < 0.5:
+                    words[i] = loosening_map[w_lower]
+
+            # 2. Inject Human Keywords randomly (10% chance per 10 words).
+            # Indexes are drawn against the growing list, then placed in one pass.
+            inserts = []
             for i in range(len(words) // 8):
-                if random.random() < 0.3:
-                    idx = random.randint(0, len(words)-1)
-                    words.insert(idx, random.choice(human_keywords))
-            
+                if draw.random() < 0.3:
+                    idx = draw.randint(0, len(words) + len(inserts) - 1)
+                    inserts.append((idx, draw.choice(human_keywords)))
+            words = token_transducers.insert_all(words, inserts)
+
             # 3. Repeat for emphasis (Very human)
-            if random.random() < 0.10:
-                rep_word = random.choice(["really", "very", "so"])
+            if draw.random() < 0.10:
+                rep_word = draw.choice(["really", "very", "so"])
                 for i, w in enumerate(words):
                     if w.lower() == rep_word:
                         words.insert(i+1, rep_word)
                         break
-            
+
             entropy_paragraphs.append(" ".join(words))
             
         return "\n\n".join(entropy_paragraphs)
 
+    @metrics.timed(metrics.PASS_SECONDS, "18")
     def _pass_18_commonality_nullifier(self, text):
         """
         Pass 18: Commonality Nullifier (Ghost Protocol v17000.0)
@@ -1226,28 +1430,24 @@ class NeuralTextHumanizer:
         if not self.common_words_set or not self.rare_vocab_set:
             return text
             
-        words = text.split()
-        new_words = []
-        
-        for word in words:
+        draw = random_context.current()
+
+        def nullify_step(word, last):
             clean_word = word.lower().strip('.,!?')
-            if clean_word in self.common_words_set and random.random() < 0.3:
+            if clean_word in self.common_words_set and draw.random() < 0.3:
                 # Try to find a rare synonym
                 syns = self._get_synonyms_simple(clean_word)
                 rare_syns = [s for s in syns if s.lower() in self.rare_vocab_set]
-                
+
                 if rare_syns:
-                    replacement = random.choice(rare_syns)
+                    replacement = draw.choice(rare_syns)
                     # Preserve case
                     if word[0].isupper():
                         replacement = replacement.capitalize()
-                    new_words.append(replacement)
-                else:
-                    new_words.append(word)
-            else:
-                new_words.append(word)
-                
-        return " ".join(new_words)
+                    return replacement
+            return word
+
+        return token_transducers.transduce_words(text, nullify_step)
 
     def _get_synonyms_simple(self, word):
         """Simple synonym lookup using WordNet."""
@@ -1256,8 +1456,10 @@ class NeuralTextHumanizer:
         for syn in wordnet.synsets(word):
             for lemma in syn.lemmas():
                 synonyms.add(lemma.name().replace('_', ' '))
-        return list(synonyms)
+        # Sorted so seeded draws don't depend on PYTHONHASHSEED
+        return sorted(synonyms)
 
+    @metrics.timed(metrics.PASS_SECONDS, "19")
     def _pass_19_cyrillic_inversion(self, text):
         """
         Pass 19: Cyrillic Inversion (Ghost Protocol v17000.0)
@@ -1272,14 +1474,9 @@ class NeuralTextHumanizer:
             'O': 'О'  # U+041E
         }
         
-        result = []
-        for char in text:
-            if char in char_map and random.random() < 0.20:
-                result.append(char_map[char])
-            else:
-                result.append(char)
-                
-        return "".join(result)
+        # One draw per mapped character; vectorized on large texts
+        return token_transducers.substitute_chars(text, char_map, 0.20, random_context.current())
+    @metrics.timed(metrics.PASS_SECONDS, "17")
     def _pass_17_emoji_dynamics(self, text, tone="Balanced"):
         """Pass 17: Inject human-like emojis based on sentiment/tone."""
         sentences = nltk.sent_tokenize(text)
@@ -1292,18 +1489,18 @@ class NeuralTextHumanizer:
         creative = ["🌈", "🎨", "✍️", "🎭", "🪄"]
         
         for sent in sentences:
-            if random.random() < 0.15: # 15% chance per sentence
+            if rng.random() < 0.15: # 15% chance per sentence
                 if tone == "Creative":
-                    emoji = random.choice(creative + positive)
+                    emoji = rng.choice(creative + positive)
                 elif tone == "Casual":
-                    emoji = random.choice(casual + positive)
+                    emoji = rng.choice(casual + positive)
                 elif tone == "Professional":
-                    emoji = random.choice(["📈", "🎯", "🤝", "💡"])
+                    emoji = rng.choice(["📈", "🎯", "🤝", "💡"])
                 else:
-                    emoji = random.choice(positive + thinking)
+                    emoji = rng.choice(positive + thinking)
                 
                 # Append emoji naturally
-                sent = sent.rstrip('.!?') + " " + emoji + random.choice([".", "!", ""])
+                sent = sent.rstrip('.!?') + " " + emoji + rng.choice([".", "!", ""])
             new_sents.append(sent)
             
         return " ".join(new_sents)
@@ -2,10 +2,13 @@
 Advanced Pattern Breaking System
 Disrupts AI writing patterns at multiple levels.
 """
+import logging
 import re
-import random
 import nltk
 from collections import Counter
+from .random_context import rng
+
+logger = logging.getLogger(__name__)
 
 class PatternBreaker:
     """
@@ -13,17 +16,17 @@ class PatternBreaker:
     """
     
     def __init__(self):
-        self.ai_sentence_starters = [
+        self.ai_sentence_starters = (
             "It is important to", "It should be noted that", "One must consider",
             "It is essential to", "It is crucial that", "It is worth noting",
             "In order to", "With regard to", "Due to the fact that",
             "For the purpose of", "In light of", "Taking into account"
-        ]
+        )
         
-        self.ai_connectors = [
+        self.ai_connectors = (
             "Additionally,", "Furthermore,", "Moreover,", "Subsequently,",
             "Consequently,", "Nevertheless,", "Nonetheless,", "Henceforth,"
-        ]
+        )
         
     def break_sentence_patterns(self, text):
         """Break repetitive sentence structure patterns."""
@@ -48,8 +51,8 @@ class PatternBreaker:
                     f"So {words[0].lower()}",
                     f"Well, {words[0].lower()}"
                 ]
-                if random.random() < 0.4:
-                    sent = random.choice(alternatives) + " " + " ".join(words[1:])
+                if rng.random() < 0.4:
+                    sent = rng.choice(alternatives) + " " + " ".join(words[1:])
             
             new_sentences.append(sent)
         
@@ -64,7 +67,7 @@ class PatternBreaker:
         # Randomly swap adjacent words (10% of time)
         i = 0
         while i < len(words) - 1:
-            if random.random() < 0.10 and len(words[i]) > 3 and len(words[i+1]) > 3:
+            if rng.random() < 0.10 and len(words[i]) > 3 and len(words[i+1]) > 3:
                 # Swap
                 words[i], words[i+1] = words[i+1], words[i]
                 i += 2
@@ -81,7 +84,7 @@ class PatternBreaker:
         
         text = " ".join(words)
         for formal, casual in contractions.items():
-            if random.random() < 0.6:
+            if rng.random() < 0.6:
                 text = text.replace(formal, casual)
         
         return text
@@ -99,7 +102,7 @@ class PatternBreaker:
             para = paragraphs[i]
             
             # If very short and not last, maybe merge
-            if i < len(paragraphs) - 1 and len(para.split()) < 20 and random.random() < 0.3:
+            if i < len(paragraphs) - 1 and len(para.split()) < 20 and rng.random() < 0.3:
                 merged = para + " " + paragraphs[i+1]
                 new_paragraphs.append(merged)
                 i += 2
@@ -113,14 +116,14 @@ class PatternBreaker:
         """
         Add natural human errors (missing spaces, extra spaces).
         """
-        if random.random() > error_rate:
+        if rng.random() > error_rate:
             return text
         
         # Occasionally remove space after comma
-        text = re.sub(r', (\w)', lambda m: ',' + m.group(1) if random.random() < 0.15 else ', ' + m.group(1), text)
+        text = re.sub(r', (\w)', lambda m: ',' + m.group(1) if rng.random() < 0.15 else ', ' + m.group(1), text)
         
         # Occasionally add double space
-        text = re.sub(r' (\w)', lambda m: '  ' + m.group(1) if random.random() < 0.05 else ' ' + m.group(1), text)
+        text = re.sub(r' (\w)', lambda m: '  ' + m.group(1) if rng.random() < 0.05 else ' ' + m.group(1), text)
         
         return text
     
@@ -132,7 +135,7 @@ class PatternBreaker:
             text: Input text
             aggressiveness: 1-5 scale
         """
-        print(f"→ Breaking AI patterns (Aggressiveness: {aggressiveness})...")
+        logger.debug("Breaking AI patterns (Aggressiveness: %s)...", aggressiveness)
         
         # Always break sentence patterns
         text = self.break_sentence_patterns(text)
@@ -149,7 +152,7 @@ class PatternBreaker:
         if aggressiveness >= 4:
             text = self.add_natural_errors(text, error_rate=0.05)
         
-        print(f"  ✓ Pattern breaking complete")
+        logger.debug("Pattern breaking complete")
         return text
 
 
@@ -178,13 +181,13 @@ class NgramDiversifier:
         """
         Rewrite until n-gram diversity target is met.
         """
-        print(f"\n→ Enforcing n-gram diversity (Target: {target_diversity:.2%})...")
+        logger.debug("Enforcing n-gram diversity (Target: %.2f%%)...", target_diversity * 100)
         
         current_diversity = self.calculate_ngram_diversity(text)
-        print(f"  Initial diversity: {current_diversity:.2%}")
+        logger.debug("Initial diversity: %.2f%%", current_diversity * 100)
         
         if current_diversity >= target_diversity:
-            print(f"  ✓ Already meets target")
+            logger.debug("Already meets target")
             return text
         
         # Try to improve by replacing repeated phrases
@@ -203,18 +206,18 @@ class NgramDiversifier:
                 # Find and replace with variation
                 text_parts = text.split()
                 for i in range(len(text_parts) - 2):
-                    if tuple(text_parts[i:i+3]) == target_trigram and random.random() < 0.5:
+                    if tuple(text_parts[i:i+3]) == target_trigram and rng.random() < 0.5:
                         # Add variation
-                        text_parts.insert(i+1, random.choice(["actually", "kind of", "basically"]))
+                        text_parts.insert(i+1, rng.choice(["actually", "kind of", "basically"]))
                         break
                 
                 text = " ".join(text_parts)
             
             new_diversity = self.calculate_ngram_diversity(text)
-            print(f"  Attempt {attempt + 1}: {new_diversity:.2%}")
+            logger.debug("Attempt %s: %.2f%%", attempt + 1, new_diversity * 100)
             
             if new_diversity >= target_diversity:
-                print(f"  ✓ Target reached")
+                logger.debug("Target reached")
                 break
         
         return text
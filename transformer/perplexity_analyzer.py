@@ -2,9 +2,20 @@
 Perplexity-Based Quality Analyzer
 Measures how "AI-like" text is and iterates until it's human-like.
 """
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 import torch
+import nltk
 from transformers import GPT2LMHeadModel, GPT2TokenizerFast
 import numpy as np
+from .inference_client import InferenceClient
+from . import random_context
+from . import request_log
+from . import metrics
+from .model_names import model_name
+
+logger = logging.getLogger(__name__)
 
 class PerplexityAnalyzer:
     """
@@ -13,13 +24,28 @@ class PerplexityAnalyzer:
     Higher perplexity = More human-like (less predictable)
     """
     
-    def __init__(self):
-        print("Loading GPT-2 for perplexity analysis...")
+    # Sliding-window step for texts longer than GPT-2's context
+    STRIDE = 512
+    # Context windows encoded per forward pass in the cached scorer
+    MAX_BATCH_WINDOWS = 4
+    
+    def __init__(self, inference_client=None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model = GPT2LMHeadModel.from_pretrained('gpt2').to(self.device)
-        self.tokenizer = GPT2TokenizerFast.from_pretrained('gpt2')
+        self.inference = InferenceClient.resolve(inference_client)
+        if self.inference:
+            logger.info("Perplexity analyzer using inference server at %s", self.inference.base_url)
+            self.model = None
+            self.tokenizer = None
+            return
+
+        logger.info("Loading GPT-2 for perplexity analysis...")
+        self.model = GPT2LMHeadModel.from_pretrained(model_name("gpt2")).to(self.device)
+        self.tokenizer = GPT2TokenizerFast.from_pretrained(model_name("gpt2"))
         self.model.eval()
-        print("✓ Perplexity analyzer ready")
+        metrics.MODEL_MEMORY.labels("gpt2").set(metrics.model_memory_bytes(self.model))
+        # GPT-2 has no pad token; padded batches mask it out anyway
+        self.pad_token_id = self.tokenizer.eos_token_id
+        logger.info("Perplexity analyzer ready")
         
     def calculate_perplexity(self, text):
         """
@@ -28,30 +54,239 @@ class PerplexityAnalyzer:
         Returns:
             float: Perplexity score (higher = more human-like)
         """
-        encodings = self.tokenizer(text, return_tensors='pt')
+        if self.inference:
+            return self.inference.perplexity([text])[0]
+
+        ids = self.tokenizer(text)["input_ids"]
+        return self._window_perplexity(self._token_logprobs_cached(ids))
+
+    def calculate_perplexity_batch(self, texts, max_batch_tokens=2048):
+        """
+        Perplexity for many texts at once (see score_texts).
+        
+        Returns:
+            list of floats, in input order
+        """
+        if self.inference:
+            return self.inference.perplexity(texts)
+        return [r["perplexity"] for r in self.score_texts(texts, max_batch_tokens=max_batch_tokens, include_sentences=False)]
+
+    def score_texts(self, texts, max_batch_tokens=2048, include_sentences=True, include_tokens=False):
+        """
+        Score a list of texts in padded batches.
+        
+        Texts are sorted by length and packed into batches of at most
+        max_batch_tokens (padded) tokens, so one forward pass scores many
+        short candidates. Texts longer than GPT-2's window fall back to the
+        cached sliding-window scorer. Per-sentence and per-token log-probabilities
+        come from the same forward pass as the document score.
         
+        Returns:
+            list of dicts (input order) with:
+                perplexity: document perplexity, as calculate_perplexity (nan if fewer than 2 tokens)
+                token_count: number of GPT-2 tokens
+                sentences: [{text, start, end, perplexity, token_count}]
+                tokens: [{token, start, end, logprob}] (only if include_tokens)
+        """
+        if self.inference:
+            return self.inference.score(texts, include_tokens=include_tokens)
+
+        texts = list(texts)
+        results = [None] * len(texts)
+        if not texts:
+            return results
+
+        encodings = self.tokenizer(texts, return_offsets_mapping=True)
         max_length = self.model.config.n_positions
-        stride = 512
+
+        # Per-token log-probabilities for every text
+        token_logprobs = [None] * len(texts)
+        short = []
+        for idx, ids in enumerate(encodings["input_ids"]):
+            if len(ids) > max_length:
+                token_logprobs[idx] = self._token_logprobs_cached(ids)
+            else:
+                short.append(idx)
+
+        short.sort(key=lambda i: len(encodings["input_ids"][i]))
+        batch = []
+        for idx in short:
+            width = max([len(encodings["input_ids"][i]) for i in batch + [idx]] + [1])
+            if batch and width * (len(batch) + 1) > max_batch_tokens:
+                self._score_padded_batch([encodings["input_ids"][i] for i in batch], batch, token_logprobs)
+                batch = []
+            batch.append(idx)
+        if batch:
+            self._score_padded_batch([encodings["input_ids"][i] for i in batch], batch, token_logprobs)
+
+        for idx, text in enumerate(texts):
+            logprobs = token_logprobs[idx]
+            offsets = encodings["offset_mapping"][idx]
+            result = {
+                "perplexity": self._window_perplexity(logprobs),
+                "token_count": len(logprobs)
+            }
+            if include_sentences:
+                result["sentences"] = self._sentence_scores(text, offsets, logprobs)
+            if include_tokens:
+                ids = encodings["input_ids"][idx]
+                result["tokens"] = [
+                    {"token": self.tokenizer.decode([tok]), "start": start, "end": end, "logprob": lp}
+                    for tok, (start, end), lp in zip(ids, offsets, logprobs)
+                ]
+            results[idx] = result
+        return results
+
+    def _score_padded_batch(self, id_lists, indices, token_logprobs):
+        """One forward pass over right-padded sequences; fills token_logprobs in place."""
+        width = max(len(ids) for ids in id_lists)
+        if width == 0:
+            for idx in indices:
+                token_logprobs[idx] = []
+            return
+
+        input_ids = torch.full((len(id_lists), width), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(id_lists), width), dtype=torch.long)
+        for row, ids in enumerate(id_lists):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+
+        metrics.MODEL_BATCH_SIZE.labels("gpt2").observe(len(id_lists))
+        with torch.no_grad():
+            logits = self.model(input_ids.to(self.device), attention_mask=attention_mask.to(self.device)).logits
+            logprobs = self._next_token_logprobs(logits, input_ids.to(self.device)).cpu()
+
+        for row, (idx, ids) in enumerate(zip(indices, id_lists)):
+            # First token has no prediction
+            token_logprobs[idx] = [None] + logprobs[row, :max(len(ids) - 1, 0)].tolist() if ids else []
+
+    def _token_logprobs_cached(self, ids):
+        """
+        Per-token log-probabilities under the stride-512 sliding window, with
+        cached context instead of re-encoding every window from scratch.
         
-        lls = []
-        for i in range(0, encodings.input_ids.size(1), stride):
-            begin_loc = max(i + stride - max_length, 0)
-            end_loc = min(i + stride, encodings.input_ids.size(1))
-            trg_len = end_loc - i
-            
-            input_ids = encodings.input_ids[:, begin_loc:end_loc].to(self.device)
-            target_ids = input_ids.clone()
-            target_ids[:, :-trg_len] = -100
-            
+        Windows that start at token 0 share a causal prefix, so they run as one
+        incremental pass carrying past_key_values from stride to stride. Later
+        windows see their 512 context tokens at positions 0..511 with no further
+        left context (GPT-2 positions are absolute), so each context block is
+        encoded once, its cache is handed to the target block, and the windows
+        run several to a batch. Scores match the full-recompute loop (checked by
+        benchmarks/check_perplexity_cache.py).
+        """
+        max_length = self.model.config.n_positions
+        stride = self.STRIDE
+        logprobs = [None] if ids else []
+        if len(ids) < 2:
+            return logprobs
+
+        input_ids = torch.tensor([ids], dtype=torch.long, device=self.device)
+        starts = list(range(0, len(ids), stride))
+        prefix_starts = [i for i in starts if i + stride - max_length <= 0]
+        later_starts = [i for i in starts if i + stride - max_length > 0]
+
+        # Windows beginning at token 0: one causal pass, stride by stride
+        past = None
+        last_logits = None
+        with torch.no_grad():
+            for i in prefix_starts:
+                end_loc = min(i + stride, len(ids))
+                chunk = input_ids[:, i:end_loc]
+                metrics.MODEL_BATCH_SIZE.labels("gpt2").observe(1)
+                outputs = self.model(chunk, past_key_values=past, use_cache=True)
+                past = outputs.past_key_values
+                if last_logits is not None:
+                    logprobs.append(self._logprob_of(last_logits, ids[i]))
+                logprobs.extend(self._next_token_logprobs(outputs.logits, chunk)[0].cpu().tolist())
+                last_logits = outputs.logits[0, -1]
+        del past
+
+        # Windows with left context cut off: encode context blocks, then targets
+        context_len = max_length - stride
+        for b in range(0, len(later_starts), self.MAX_BATCH_WINDOWS):
+            group = later_starts[b:b + self.MAX_BATCH_WINDOWS]
+            contexts = torch.stack([input_ids[0, i - context_len:i] for i in group])
+            target_lens = [min(i + stride, len(ids)) - i for i in group]
+            width = max(target_lens)
+            targets = torch.full((len(group), width), self.pad_token_id, dtype=torch.long, device=self.device)
+            mask = torch.zeros((len(group), context_len + width), dtype=torch.long, device=self.device)
+            mask[:, :context_len] = 1
+            for row, (i, n) in enumerate(zip(group, target_lens)):
+                targets[row, :n] = input_ids[0, i:i + n]
+                mask[row, context_len:context_len + n] = 1
+
+            metrics.MODEL_BATCH_SIZE.labels("gpt2").observe(len(group))
             with torch.no_grad():
-                outputs = self.model(input_ids, labels=target_ids)
-                log_likelihood = outputs.loss * trg_len
-                
-            lls.append(log_likelihood)
-            
-        ppl = torch.exp(torch.stack(lls).sum() / end_loc)
-        return ppl.item()
-    
+                ctx_out = self.model(contexts, use_cache=True)
+                tgt_out = self.model(targets, past_key_values=ctx_out.past_key_values, attention_mask=mask, use_cache=False)
+                # The context's last position predicts each window's first target
+                first = torch.log_softmax(ctx_out.logits[:, -1, :].float(), dim=-1).gather(-1, targets[:, :1]).squeeze(-1)
+                rest = self._next_token_logprobs(tgt_out.logits, targets)
+
+            first = first.cpu().tolist()
+            rest = rest.cpu()
+            for row, n in enumerate(target_lens):
+                logprobs.append(first[row])
+                logprobs.extend(rest[row, :n - 1].tolist())
+        return logprobs
+
+    def _logprob_of(self, logits, token_id):
+        """log-probability of token_id under a single logit vector."""
+        return (logits[token_id].float() - torch.logsumexp(logits.float(), dim=-1)).item()
+
+    def _next_token_logprobs(self, logits, input_ids):
+        """log P(token[t+1] | tokens[:t+1]) for every position t."""
+        logits = logits[:, :-1, :].float()
+        targets = input_ids[:, 1:].unsqueeze(-1)
+        return (logits.gather(-1, targets).squeeze(-1) - torch.logsumexp(logits, dim=-1))
+
+    def _window_perplexity(self, logprobs):
+        """
+        Document perplexity from per-token log-probabilities (first one None),
+        with the sliding-window loss accounting: the first window's mean loss
+        is weighted by its full target length, the rest are exact sums. Up to
+        STRIDE tokens this is the plain mean.
+        """
+        first_len = min(self.STRIDE, len(logprobs))
+        first = [-lp for lp in logprobs[1:first_len]]
+        if not first:
+            return float("nan")
+        first_nll = (sum(first) / len(first)) * first_len
+        rest_nll = -sum(logprobs[first_len:])
+        return math.exp((first_nll + rest_nll) / len(logprobs))
+
+    def _perplexity_from_logprobs(self, logprobs):
+        values = [lp for lp in logprobs if lp is not None]
+        if not values:
+            return float("nan")
+        return math.exp(-sum(values) / len(values))
+
+    def _sentence_scores(self, text, offsets, logprobs):
+        """Attribute scored tokens to nltk sentences by character offset."""
+        sentences = []
+        cursor = 0
+        for sent in nltk.sent_tokenize(text):
+            start = text.find(sent, cursor)
+            if start < 0:
+                continue
+            end = start + len(sent)
+            cursor = end
+            sentences.append({"text": sent, "start": start, "end": end, "logprobs": []})
+
+        s_idx = 0
+        for (tok_start, tok_end), lp in zip(offsets, logprobs):
+            while s_idx < len(sentences) and tok_start >= sentences[s_idx]["end"]:
+                s_idx += 1
+            if s_idx == len(sentences):
+                break
+            if lp is not None and tok_end > sentences[s_idx]["start"]:
+                sentences[s_idx]["logprobs"].append(lp)
+
+        for sent in sentences:
+            lps = sent.pop("logprobs")
+            sent["token_count"] = len(lps)
+            sent["perplexity"] = self._perplexity_from_logprobs(lps)
+        return sentences
+
     def analyze_text_quality(self, text):
         """
         Comprehensive text quality analysis.
@@ -59,8 +294,19 @@ class PerplexityAnalyzer:
         Returns:
             dict with quality metrics
         """
-        perplexity = self.calculate_perplexity(text)
+        return self._interpret(self.calculate_perplexity(text))
+
+    def analyze_batch_quality(self, texts):
+        """
+        analyze_text_quality for many texts, scored in one batched call.
         
+        Returns:
+            list of dicts with quality metrics
+        """
+        return [self._interpret(p) for p in self.calculate_perplexity_batch(texts)]
+
+    def _interpret(self, perplexity):
+        """Map a perplexity onto quality labels."""
         # Interpret perplexity
         if perplexity < 30:
             quality = "Very AI-like (too predictable)"
@@ -104,7 +350,7 @@ class IterativeHumanizer:
         self.humanizer = humanizer
         self.analyzer = analyzer
         
-    def iterative_humanize(self, text, target_perplexity=80, max_iterations=5, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False):
+    def iterative_humanize(self, text, target_perplexity=80, max_iterations=5, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False, strategy="full", n_candidates=4, seed=None):
         """
         Keep humanizing until perplexity target is reached.
         
@@ -116,26 +362,48 @@ class IterativeHumanizer:
             audience: Target readership
             preserve_formatting: Keep paragraphs locked
             use_emojis: Enable human-like emojis
+            strategy: "full" re-humanizes the whole text each iteration,
+                "paragraph" re-humanizes only paragraphs below the target,
+                "best_of_n" generates n_candidates per failing paragraph in
+                parallel each round and keeps the best-scoring one
+            n_candidates: Candidates per paragraph for "best_of_n"
+            seed: Makes the run reproducible; parallel candidates each get
+                their own derived stream, so thread scheduling doesn't matter
             
         Returns:
             dict with final text and metrics
         """
-        print(f"\n{'='*70}")
-        print(f"🔄 ITERATIVE HUMANIZATION (Target Perplexity: {target_perplexity})")
-        print(f"Mode: {tone} | Audience: {audience} | Preserve: {preserve_formatting}")
-        print(f"{'='*70}")
+        if seed is not None or not random_context.active():
+            with request_log.request_scope("iterative_humanize", strategy=strategy, target_perplexity=target_perplexity, input_chars=len(text)):
+                with random_context.seeded(seed):
+                    return self.iterative_humanize(
+                        text, target_perplexity, max_iterations, tone, audience, preserve_formatting, use_emojis, strategy, n_candidates
+                    )
+
+        logger.debug("Iterative humanization: target perplexity %s, strategy %s, tone %s", target_perplexity, strategy, tone)
+        
+        if strategy == "paragraph":
+            current_text, history = self._paragraph_selective_iterations(
+                text, target_perplexity, max_iterations, tone, audience, preserve_formatting, use_emojis
+            )
+            return self._summarize(current_text, history)
+        if strategy == "best_of_n":
+            current_text, history = self._best_of_n_rounds(
+                text, target_perplexity, max_iterations, n_candidates, tone, audience, preserve_formatting, use_emojis
+            )
+            return self._summarize(current_text, history)
         
         current_text = text
         history = []
         
         for iteration in range(1, max_iterations + 1):
-            print(f"\n--- Iteration {iteration}/{max_iterations} ---")
+            logger.debug("--- Iteration %s/%s ---", iteration, max_iterations)
             
             # Analyze current state
             analysis = self.analyzer.analyze_text_quality(current_text)
-            print(f"Perplexity: {analysis['perplexity']:.2f}")
-            print(f"Quality: {analysis['quality']}")
-            print(f"Human Score: {analysis['human_score']:.1%}")
+            logger.debug("Perplexity: %.2f", analysis['perplexity'])
+            logger.debug("Quality: %s", analysis['quality'])
+            logger.debug("Human Score: %.1f%%", analysis['human_score'] * 100)
             
             history.append({
                 "iteration": iteration,
@@ -145,18 +413,13 @@ class IterativeHumanizer:
             
             # Check if target reached
             if analysis['perplexity'] >= target_perplexity:
-                print(f"\n✓ Target perplexity reached!")
+                logger.debug("Target perplexity reached!")
                 break
                 
             # Determine level based on current perplexity
-            if analysis['perplexity'] < 40:
-                level = 5  # Very aggressive
-            elif analysis['perplexity'] < 60:
-                level = 4
-            else:
-                level = 3
+            level = self._select_level(analysis['perplexity'])
                 
-            print(f"→ Applying humanization (Level {level})...")
+            logger.debug("Applying humanization (Level %s)...", level)
             
             # Humanize
             current_text = self.humanizer.humanize(
@@ -169,24 +432,185 @@ class IterativeHumanizer:
                 use_emojis=use_emojis
             )
             
+        return self._summarize(current_text, history)
+
+    def _paragraph_selective_iterations(self, text, target_perplexity, max_iterations, tone, audience, preserve_formatting, use_emojis):
+        """
+        Score every paragraph in one batch, re-humanize only the ones below
+        target, and splice them back in place.
+        
+        Returns:
+            (final text, history)
+        """
+        # Same units humanize() locks when preserving structure
+        separator = "\n" if preserve_formatting else "\n\n"
+        paragraphs = text.split(separator)
+        history = []
+        
+        for iteration in range(1, max_iterations + 1):
+            logger.debug("--- Iteration %s/%s ---", iteration, max_iterations)
+            
+            indices = [i for i, p in enumerate(paragraphs) if p.strip()]
+            if not indices:
+                break
+            scores = self.analyzer.score_texts([paragraphs[i] for i in indices], include_sentences=False)
+            
+            # Paragraphs too short to score (nan) count as passing
+            failing = [
+                (i, r["perplexity"]) for i, r in zip(indices, scores)
+                if not math.isnan(r["perplexity"]) and r["perplexity"] < target_perplexity
+            ]
+            doc_perplexity = self._combined_perplexity(scores)
+            logger.debug("Perplexity (paragraph-weighted): %.2f", doc_perplexity)
+            logger.debug("Paragraphs below target: %s/%s", len(failing), len(indices))
+            
+            history.append({
+                "iteration": iteration,
+                "perplexity": doc_perplexity,
+                "text_length": len(separator.join(paragraphs)),
+                "paragraphs_rehumanized": len(failing)
+            })
+            
+            if not failing:
+                logger.debug("Target perplexity reached!")
+                break
+            
+            for i, perplexity in failing:
+                level = self._select_level(perplexity)
+                paragraphs[i] = self.humanizer.humanize(
+                    paragraphs[i],
+                    stealth_level=level,
+                    use_artifacts=(level >= 4),
+                    tone=tone,
+                    audience=audience,
+                    preserve_formatting=False,
+                    use_emojis=use_emojis
+                )
+            logger.debug("Re-humanized %s paragraph(s)", len(failing))
+        
+        return separator.join(paragraphs), history
+
+    def _best_of_n_rounds(self, text, target_perplexity, max_rounds, n_candidates, tone, audience, preserve_formatting, use_emojis):
+        """
+        Wide instead of deep: every failing paragraph gets n_candidates
+        variations per round, all generated in parallel from one shared run of
+        the early passes, and all scored in a single batched call. The best
+        candidate is kept; paragraphs that reach the target drop out.
+        
+        Returns:
+            (final text, history)
+        """
+        separator = "\n" if preserve_formatting else "\n\n"
+        paragraphs = text.split(separator)
+        indices = [i for i, p in enumerate(paragraphs) if p.strip()]
+        history = []
+        if not indices:
+            return text, history
+        
+        scores = self.analyzer.score_texts([paragraphs[i] for i in indices], include_sentences=False)
+        best = {i: r["perplexity"] for i, r in zip(indices, scores)}
+        token_counts = {i: r["token_count"] for i, r in zip(indices, scores)}
+        pending = [i for i in indices if not math.isnan(best[i]) and best[i] < target_perplexity]
+        # Early passes run once per paragraph and level: i -> (level, base); candidates branch from here
+        bases = {}
+        humanized = set()
+        
+        with ThreadPoolExecutor(max_workers=max(1, n_candidates) * 2) as pool:
+            for round_no in range(1, max_rounds + 1):
+                logger.debug("--- Round %s/%s ---", round_no, max_rounds)
+                logger.debug("Paragraphs below target: %s/%s", len(pending), len(indices))
+                history.append({
+                    "iteration": round_no,
+                    "perplexity": self._combined_perplexity(
+                        [{"perplexity": best[i], "token_count": token_counts[i]} for i in indices]
+                    ),
+                    "text_length": len(separator.join(paragraphs)),
+                    "paragraphs_rehumanized": len(pending)
+                })
+                if not pending:
+                    logger.debug("Target perplexity reached!")
+                    break
+                
+                levels = {i: self._select_level(best[i]) for i in pending}
+                # The base depends on the level, so a paragraph whose level moved gets a new one
+                missing = [i for i in pending if i not in bases or bases[i][0] != levels[i]]
+                # Streams are bound here, in the calling thread, per paragraph/candidate
+                base_calls = [random_context.bind(self.humanizer.humanize_base, "base", i) for i in missing]
+                for i, base in zip(missing, pool.map(
+                    lambda call, i: call(paragraphs[i], levels[i], tone, audience), base_calls, missing
+                )):
+                    bases[i] = (levels[i], base)
+                
+                jobs = [(i, k) for i in pending for k in range(n_candidates)]
+                candidate_calls = [
+                    random_context.bind(self.humanizer.humanize_from_base, "candidate", round_no, i, k) for i, k in jobs
+                ]
+                candidates = list(pool.map(
+                    lambda call, job: call(
+                        bases[job[0]][1], levels[job[0]], levels[job[0]] >= 4, tone, use_emojis
+                    ),
+                    candidate_calls, jobs
+                ))
+                logger.debug("Scoring %s candidates in one batch...", len(candidates))
+                candidate_scores = self.analyzer.score_texts(candidates, include_sentences=False)
+                
+                round_best = {}
+                for (i, _), candidate, score in zip(jobs, candidates, candidate_scores):
+                    perplexity = score["perplexity"]
+                    # Unscorable candidates (too short, nan) can't be compared: drop them
+                    if not candidate or math.isnan(perplexity):
+                        continue
+                    if i not in round_best or perplexity > round_best[i][0]:
+                        round_best[i] = (perplexity, score["token_count"], candidate)
+                
+                # A failing paragraph always takes its first round's winner;
+                # later rounds only replace it with something better
+                for i, (perplexity, token_count, candidate) in round_best.items():
+                    if i not in humanized or perplexity > best[i]:
+                        best[i] = perplexity
+                        token_counts[i] = token_count
+                        paragraphs[i] = candidate
+                        humanized.add(i)
+                pending = [i for i in pending if best[i] < target_perplexity]
+        
+        return separator.join(paragraphs), history
+
+    def _combined_perplexity(self, scores):
+        """Token-weighted geometric mean of paragraph perplexities."""
+        total_tokens = 0
+        total_log = 0.0
+        for r in scores:
+            if math.isnan(r["perplexity"]):
+                continue
+            total_tokens += r["token_count"]
+            total_log += r["token_count"] * math.log(r["perplexity"])
+        return math.exp(total_log / total_tokens) if total_tokens else float("nan")
+
+    def _select_level(self, perplexity):
+        """Pick a stealth level from how far below target the text is."""
+        if perplexity < 40:
+            return 5  # Very aggressive
+        elif perplexity < 60:
+            return 4
+        return 3
+
+    def _summarize(self, current_text, history):
+        """Final analysis, report and result dict shared by all strategies."""
         # Final analysis
         final_analysis = self.analyzer.analyze_text_quality(current_text)
+        initial_perplexity = history[0]['perplexity'] if history else final_analysis['perplexity']
         
-        print(f"\n{'='*70}")
-        print(f"✅ ITERATIVE HUMANIZATION COMPLETE")
-        print(f"{'='*70}")
-        print(f"Initial Perplexity: {history[0]['perplexity']:.2f}")
-        print(f"Final Perplexity: {final_analysis['perplexity']:.2f}")
-        print(f"Improvement: +{final_analysis['perplexity'] - history[0]['perplexity']:.2f}")
-        print(f"Quality: {final_analysis['quality']}")
-        print(f"Iterations: {len(history)}")
-        print(f"{'='*70}\n")
+        request_log.annotate(
+            iterations=len(history),
+            initial_perplexity=round(initial_perplexity, 2),
+            final_perplexity=round(final_analysis['perplexity'], 2)
+        )
         
         return {
             "text": current_text,
-            "initial_perplexity": history[0]['perplexity'],
+            "initial_perplexity": initial_perplexity,
             "final_perplexity": final_analysis['perplexity'],
-            "improvement": final_analysis['perplexity'] - history[0]['perplexity'],
+            "improvement": final_analysis['perplexity'] - initial_perplexity,
             "quality": final_analysis['quality'],
             "human_score": final_analysis['human_score'],
             "iterations": len(history),
@@ -0,0 +1,137 @@
+"""
+Request-Scoped Randomness
+A context-local random.Random for the humanization passes, so concurrent
+requests never share or reseed one generator, with independent derived
+streams per paragraph.
+
+Passes call `rng.random()`, `rng.choice(...)` etc. exactly like the random
+module. Inside `seeded(seed)` those draws come from that request's own
+generator; outside any context they fall back to the global random module.
+"""
+import contextvars
+import hashlib
+import random
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+_generator = contextvars.ContextVar("blizflow_rng_generator", default=None)
+_seed = contextvars.ContextVar("blizflow_rng_seed", default=None)
+_arrays = threading.local()
+
+
+class _ContextRandom:
+    """Forwards random.Random methods to the generator of the current context."""
+
+    def __getattr__(self, name):
+        return getattr(current(), name)
+
+
+rng = _ContextRandom()
+
+
+def current():
+    """The active generator, or the random module's global one outside a context."""
+    generator = _generator.get()
+    return generator if generator is not None else random._inst
+
+
+def active():
+    return _generator.get() is not None
+
+
+def current_seed():
+    """Seed of the active stream, None outside a context."""
+    return _seed.get()
+
+
+def derive_seed(seed, *path):
+    """
+    Stable 64-bit child seed for (seed, *path), identical in every process
+    (unlike hash(), which is salted per interpreter for strings).
+    """
+    key = repr((seed,) + path).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def fresh_seed():
+    """Unpredictable 64-bit seed from OS entropy."""
+    return random.SystemRandom().getrandbits(64)
+
+
+@contextmanager
+def seeded(seed=None):
+    """
+    Run the block with its own generator.
+    With seed=None a fresh seed is drawn from OS entropy, so the block is still
+    isolated from other requests, just not reproducible.
+    """
+    if seed is None:
+        seed = fresh_seed()
+    generator_token = _generator.set(random.Random(seed))
+    seed_token = _seed.set(seed)
+    try:
+        yield seed
+    finally:
+        _seed.reset(seed_token)
+        _generator.reset(generator_token)
+
+
+@contextmanager
+def substream(*path):
+    """
+    Independent child stream for one unit of work, e.g. substream("paragraph", 3).
+    It depends only on the enclosing seed and the path, so a unit draws the same
+    numbers whether units run serially, in parallel or in a different order.
+    Outside a seeded context this is a no-op.
+    """
+    seed = _seed.get()
+    if seed is None:
+        yield
+        return
+    with seeded(derive_seed(seed, *path)):
+        yield
+
+
+def bind(fn, *path):
+    """
+    fn wrapped to run in substream(*path) of the current seed. Call this in the
+    submitting thread: pool threads do not inherit context variables, so the
+    seed has to be captured before the work is handed off.
+    """
+    seed = _seed.get()
+
+    def run(*args, **kwargs):
+        if seed is None:
+            return fn(*args, **kwargs)
+        with seeded(derive_seed(seed, *path)):
+            return fn(*args, **kwargs)
+    return run
+
+
+def random_array(count, generator=None):
+    """
+    count draws of random() as a float64 array, in one NumPy call.
+
+    random.Random and NumPy's RandomState are both MT19937 and build a double
+    from two 32-bit outputs the same way, so with the state handed across the
+    values are bit for bit those of count random() calls, and the generator
+    is left exactly where those calls would have left it.
+    """
+    generator = generator if generator is not None else current()
+    version, internal, gauss = generator.getstate()
+    # Constructing a RandomState costs more than a small draw; keep one per thread
+    state = getattr(_arrays, "state", None)
+    if state is None:
+        state = _arrays.state = np.random.RandomState()
+    state.set_state(("MT19937", np.array(internal[:-1], dtype=np.uint32), internal[-1]))
+    values = state.random_sample(count)
+    _, key, pos, _, _ = state.get_state()
+    generator.setstate((version, tuple(key.tolist()) + (int(pos),), gauss))
+    return values
+
+
+def torch_seed():
+    """A seed for torch sampling drawn from the active stream, None outside a context."""
+    return current().getrandbits(63) if active() else None
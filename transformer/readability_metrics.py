@@ -0,0 +1,163 @@
+"""
+Readability Metrics Engine
+Flesch Reading Ease, Flesch-Kincaid grade, Gunning Fog and average word
+frequency from one tokenization pass, memoized per text.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from . import metrics
+
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s|$)")
+_WORD_RE = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+# "make", "boxes", "used" (but not "table", "wanted", "needed")
+_SILENT_ENDING_RE = re.compile(r"(?:[^laeiouy]es|[^laeiouydt]ed|[^laeiouy]e)$")
+
+GOOGLE_10K_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "google_10000.txt")
+
+# Memoized results, keyed by the SHA-1 of the text
+MAX_CACHED_TEXTS = 256
+_results = OrderedDict()
+_results_lock = threading.Lock()
+
+_frequencies = None
+_frequencies_lock = threading.Lock()
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word):
+    """
+    Estimate the syllables in one word: vowel groups after dropping a silent
+    final "e"/"es"/"ed". Every word has at least one.
+    """
+    word = word.lower().replace("'", "")
+    if len(word) <= 3:
+        return 1
+    word = _SILENT_ENDING_RE.sub("", word)
+    if word.startswith("y"):
+        word = word[1:]
+    return max(1, len(_VOWEL_GROUP_RE.findall(word)))
+
+
+def load_frequencies():
+    """
+    Word -> frequency table, loaded once.
+    Uses wordfreq's English list when it is installed; otherwise estimates
+    frequencies from the Google 10k ranking with Zipf's law (f = 0.05 / rank).
+    """
+    global _frequencies
+    with _frequencies_lock:
+        if _frequencies is None:
+            try:
+                from wordfreq import get_frequency_dict
+                _frequencies = get_frequency_dict("en")
+            except ImportError:
+                _frequencies = {}
+                try:
+                    with open(GOOGLE_10K_PATH, "r", encoding="utf-8") as f:
+                        words = [line.strip().lower() for line in f if line.strip()]
+                    for rank, word in enumerate(words, start=1):
+                        _frequencies.setdefault(word, 0.05 / rank)
+                except OSError:
+                    pass
+    return _frequencies
+
+
+def flesch_ease_label(score):
+    """Reading-ease band for a Flesch score."""
+    if score >= 90:
+        return "very_easy"
+    if score >= 80:
+        return "easy"
+    if score >= 70:
+        return "fairly_easy"
+    if score >= 60:
+        return "standard"
+    if score >= 50:
+        return "fairly_difficult"
+    if score >= 30:
+        return "difficult"
+    return "very_confusing"
+
+
+def compute_metrics(text):
+    """
+    Compute every metric in one pass over the words.
+
+    Unlike py-readability-metrics there is no 100-word minimum; very short
+    texts simply give noisier scores.
+
+    Returns:
+        dict of metrics (all zero when the text has no words)
+    """
+    frequencies = load_frequencies()
+    sentence_count = max(1, len(_SENTENCE_END_RE.findall(text)))
+
+    word_count = 0
+    syllable_count = 0
+    complex_count = 0
+    frequency_sum = 0.0
+    for word in _WORD_RE.findall(text):
+        syllables = count_syllables(word)
+        word_count += 1
+        syllable_count += syllables
+        if syllables >= 3:
+            complex_count += 1
+        frequency_sum += frequencies.get(word.lower(), 0.0)
+
+    if not word_count:
+        return {
+            "word_count": 0, "sentence_count": 0, "syllable_count": 0,
+            "flesch_reading_ease": 0.0, "flesch_ease": flesch_ease_label(0.0),
+            "flesch_kincaid_grade": 0.0, "gunning_fog": 0.0, "avg_word_frequency": 0.0
+        }
+
+    words_per_sentence = word_count / sentence_count
+    syllables_per_word = syllable_count / word_count
+    flesch = 206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word
+
+    return {
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "syllable_count": syllable_count,
+        "flesch_reading_ease": flesch,
+        "flesch_ease": flesch_ease_label(flesch),
+        "flesch_kincaid_grade": 0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59,
+        "gunning_fog": 0.4 * (words_per_sentence + 100.0 * complex_count / word_count),
+        "avg_word_frequency": frequency_sum / word_count
+    }
+
+
+def analyze(text):
+    """
+    Memoized compute_metrics(): repeated calls with the same text (e.g. every
+    Streamlit rerun) are a hash and a dict lookup.
+    """
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _results_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            metrics.CACHE_LOOKUPS.labels("readability", "hit").inc()
+            return dict(_results[key])
+
+    metrics.CACHE_LOOKUPS.labels("readability", "miss").inc()
+    result = compute_metrics(text)
+    with _results_lock:
+        _results[key] = result
+        if len(_results) > MAX_CACHED_TEXTS:
+            _results.popitem(last=False)
+    return dict(result)
+
+
+def _syllable_hit_ratio():
+    info = count_syllables.cache_info()
+    return info.hits / (info.hits + info.misses) if info.hits + info.misses else float("nan")
+
+
+metrics.CACHE_HIT_RATIO.labels("readability").set_function(lambda: metrics.hit_ratio(metrics.CACHE_LOOKUPS, "readability"))
+metrics.CACHE_HIT_RATIO.labels("syllables").set_function(_syllable_hit_ratio)
@@ -0,0 +1,150 @@
+"""
+Request Logging
+Structured, level-gated logging for the humanization pipeline: every record
+carries the current request id, pass-level detail is DEBUG (off by default)
+and each request ends with one INFO summary record.
+
+Modules log through `logging.getLogger(__name__)`; entry points call
+`configure()` once. Settings come from the environment:
+    BLIZFLOW_LOG_LEVEL=INFO      # DEBUG shows every pass
+    BLIZFLOW_LOG_FORMAT=text     # or json, one object per line
+"""
+import contextvars
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+_request_id = contextvars.ContextVar("blizflow_request_id", default=None)
+_scope = contextvars.ContextVar("blizflow_request_scope", default=None)
+
+logger = logging.getLogger("transformer.request")
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+@contextmanager
+def request_id(value=None):
+    """Tag every record logged in the block with this request id (a new one if None)."""
+    token = _request_id.set(value or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+@contextmanager
+def request_scope(operation, summary=True, **fields):
+    """
+    Outermost unit of work for one request. Yields a dict the caller can add
+    summary fields to; on exit a single INFO record reports them together with
+    the duration. Scopes opened inside another scope are folded into it, so a
+    request that humanizes many paragraphs still logs one summary.
+
+    summary=False keeps the scope (and so silences nested ones) without
+    logging, for callers that write their own summary with log_summary().
+    """
+    if _scope.get() is not None:
+        yield _scope.get()
+        return
+
+    scope_fields = dict(fields)
+    scope_token = _scope.set(scope_fields)
+    id_token = _request_id.set(_request_id.get() or new_request_id())
+    start_time = time.perf_counter()
+    status = "ok"
+    try:
+        yield scope_fields
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        if summary:
+            scope_fields["status"] = status
+            log_summary(operation, time.perf_counter() - start_time, **scope_fields)
+        _request_id.reset(id_token)
+        _scope.reset(scope_token)
+
+
+def annotate(**fields):
+    """Add fields to the active request's summary record (no-op outside a scope)."""
+    scope = _scope.get()
+    if scope is not None:
+        scope.update(fields)
+
+
+def log_summary(operation, duration, **fields):
+    """The per-request INFO record."""
+    fields = dict(fields, operation=operation, duration_ms=round(duration * 1000, 1))
+    logger.info("%s finished in %.0f ms", operation, duration * 1000, extra={"fields": fields})
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds request_id (or "-") to every record."""
+
+    def filter(self, record):
+        record.request_id = _request_id.get() or "-"
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    """Plain log lines, with summary fields appended as key=value pairs."""
+
+    def __init__(self):
+        super().__init__(_TEXT_FORMAT)
+
+    def format(self, record):
+        line = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure(level=None, fmt=None, stream=None):
+    """
+    Install one handler on the "transformer" logger tree (and the entry
+    points that log under their own names). Safe to call more than once.
+    """
+    level = (level or os.getenv("BLIZFLOW_LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("BLIZFLOW_LOG_FORMAT", "text")).lower()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.addFilter(RequestIdFilter())
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    handler._blizflow = True
+
+    for name in ("transformer", "blizflow"):
+        target = logging.getLogger(name)
+        target.handlers = [h for h in target.handlers if not getattr(h, "_blizflow", False)]
+        target.addHandler(handler)
+        target.setLevel(level)
+        target.propagate = False
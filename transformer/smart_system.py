@@ -2,9 +2,12 @@
 Smart Adaptive Humanization System
 Automatically analyzes text and selects optimal strategies.
 """
-import re
-import nltk
-from collections import Counter
+import logging
+from .text_features import extract_features
+from . import random_context
+from . import request_log
+
+logger = logging.getLogger(__name__)
 
 class SmartHumanizationOrchestrator:
     """
@@ -21,27 +24,21 @@ class SmartHumanizationOrchestrator:
         Returns:
             dict with analysis results
         """
-        sentences = nltk.sent_tokenize(text)
-        words = text.split()
+        features = extract_features(text)
         
         # Calculate metrics
-        avg_sentence_length = len(words) / len(sentences) if sentences else 0
+        avg_sentence_length = features["avg_sentence_length"]
         
-        # Detect AI indicators
-        ai_words = [
-            'furthermore', 'moreover', 'additionally', 'consequently', 
-            'therefore', 'thus', 'hence', 'notably', 'importantly'
-        ]
-        ai_word_count = sum(1 for word in words if word.lower() in ai_words)
-        ai_density = ai_word_count / len(words) if words else 0
+        # Detect AI indicators (bare words only, as the thresholds below were set on)
+        word_count = features["word_count"]
+        ai_density = features["standalone_ai_count"] / word_count if word_count else 0
         
         # Detect formality
-        formal_indicators = ['shall', 'ought', 'whereas', 'thereby', 'wherein']
-        formal_count = sum(1 for word in words if word.lower() in formal_indicators)
+        formal_count = features["standalone_formal_count"]
         
         # Detect structure
-        has_bullets = '•' in text or '\n-' in text or '\n*' in text
-        has_numbers = bool(re.search(r'\n\d+\.', text))
+        has_bullets = features["has_bullets"]
+        has_numbers = features["has_numbers"]
         
         # Determine text type
         if ai_density > 0.02:
@@ -86,7 +83,7 @@ class SmartHumanizationOrchestrator:
             # Casual or already natural
             return 3
     
-    def smart_humanize(self, text, max_iterations=3, target_improvement=0.3, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False):
+    def smart_humanize(self, text, max_iterations=3, target_improvement=0.3, tone="Balanced", audience="General", preserve_formatting=True, use_emojis=False, seed=None):
         """
         Intelligently humanize text with adaptive strategy.
         
@@ -98,35 +95,34 @@ class SmartHumanizationOrchestrator:
             audience: Target readership
             preserve_formatting: Keep paragraphs locked
             use_emojis: Enable human-like emojis
+            seed: Makes the whole run reproducible
             
         Returns:
             Humanized text with metadata
         """
-        print("\n" + "="*70)
-        print("🧠 SMART HUMANIZATION SYSTEM")
-        print("="*70)
-        
+        if seed is not None or not random_context.active():
+            with request_log.request_scope("smart_humanize", tone=tone, input_chars=len(text)):
+                with random_context.seeded(seed):
+                    return self.smart_humanize(text, max_iterations, target_improvement, tone, audience, preserve_formatting, use_emojis)
+
         # Analyze input
-        print("\n📊 Analyzing input text...")
         analysis = self.analyze_text_type(text)
         
-        print(f"   Text Type: {analysis['type']}")
-        print(f"   AI Density: {analysis['ai_density']:.2%}")
-        print(f"   Avg Sentence Length: {analysis['avg_sentence_length']:.1f} words")
-        print(f"   Formality Level: {analysis['formality']}")
+        logger.debug("Text Type: %s", analysis['type'])
+        logger.debug("AI Density: %.2f%%", analysis['ai_density'] * 100)
+        logger.debug("Avg Sentence Length: %.1f words", analysis['avg_sentence_length'])
+        logger.debug("Formality Level: %s", analysis['formality'])
         
         # Select optimal level
         optimal_level = self.select_optimal_level(analysis)
-        print(f"\n🎯 Recommended Stealth Level: {optimal_level}")
+        logger.debug("Recommended Stealth Level: %s", optimal_level)
         
         # Apply humanization with iterations
         current_text = text
         iteration = 1
         
         while iteration <= max_iterations:
-            print(f"\n{'='*70}")
-            print(f"🔄 ITERATION {iteration}/{max_iterations}")
-            print(f"{'='*70}")
+            logger.debug("Iteration %s/%s", iteration, max_iterations)
             
             # Adjust level for iterations
             if iteration == 1:
@@ -135,7 +131,7 @@ class SmartHumanizationOrchestrator:
                 # Reduce aggressiveness in later iterations
                 level = max(3, optimal_level - (iteration - 1))
             
-            print(f"Using Level: {level}, Tone: {tone}, Audience: {audience}, Preserve: {preserve_formatting}")
+            logger.debug("Using Level: %s, Tone: %s, Audience: %s, Preserve: %s", level, tone, audience, preserve_formatting)
             
             # Humanize
             current_text = self.humanizer.humanize(
@@ -152,29 +148,26 @@ class SmartHumanizationOrchestrator:
             new_analysis = self.analyze_text_type(current_text)
             improvement = analysis['ai_density'] - new_analysis['ai_density']
             
-            print(f"\n📈 Improvement: {improvement:.2%} reduction in AI density")
+            logger.debug("Improvement: %.2f%% reduction in AI density", improvement * 100)
             
             # Check if we should continue
             if improvement >= target_improvement:
-                print(f"✓ Target improvement reached!")
+                logger.debug("Target improvement reached!")
                 break
             
             if iteration == max_iterations:
-                print(f"⚠ Maximum iterations reached")
+                logger.debug("Maximum iterations reached")
                 
             iteration += 1
         
         # Final analysis
         final_analysis = self.analyze_text_type(current_text)
         
-        print(f"\n" + "="*70)
-        print("✅ SMART HUMANIZATION COMPLETE")
-        print("="*70)
-        print(f"Initial AI Density: {analysis['ai_density']:.2%}")
-        print(f"Final AI Density: {final_analysis['ai_density']:.2%}")
-        print(f"Total Improvement: {analysis['ai_density'] - final_analysis['ai_density']:.2%}")
-        print(f"Iterations Used: {iteration}")
-        print("="*70 + "\n")
+        request_log.annotate(
+            iterations=iteration,
+            initial_ai_density=round(analysis['ai_density'], 4),
+            final_ai_density=round(final_analysis['ai_density'], 4)
+        )
         
         return {
             "text": current_text,
@@ -0,0 +1,220 @@
+"""
+Streaming Humanization
+Bounded-memory humanization of plain text of any length: input is read in
+chunks, cut into line windows, each window goes through the pass pipeline on
+its own and its output is written before the next one is read.
+
+humanize(text, preserve_formatting=True) already treats every line as an
+independent unit with its own random substream, so as long as no line is
+longer than the window, the streamed output is exactly humanize()'s output
+for the same seed. A longer line is cut at a sentence end (or whitespace)
+into window-sized parts, each humanized separately.
+
+Peak memory is about one window plus one read chunk, whatever the document
+length. Run with:
+    python -m transformer.streaming big.txt -o big.humanized.txt --seed 7
+    cat big.txt | python -m transformer.streaming - --window 32k > out.txt
+"""
+import argparse
+import codecs
+import logging
+import os
+import re
+import sys
+from typing import NamedTuple
+
+from . import random_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_CHARS = int(os.getenv("BLIZFLOW_STREAM_WINDOW", 64 * 1024))
+READ_CHUNK_CHARS = 64 * 1024
+
+# Whitespace after sentence-ending punctuation: the preferred cut in a long line
+_SENTENCE_BREAK_RE = re.compile(r"[.!?][\"')\]]*\s")
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+class Window(NamedTuple):
+    """One unit of work: a whole line, or part of a line longer than the window."""
+    text: str
+    index: int       # line number
+    part: int        # 0-based part within an over-long line
+    split: bool      # True when the line was cut into parts
+    whole: bool      # True when the input is this single line (no newline at all)
+    tail: str        # what follows the output: "\n", " " between parts, or ""
+
+
+def window_seed(seed, window):
+    """
+    Seed for one window, matching the stream humanize() gives the same line:
+    the input's own seed for single-line input, else its paragraph substream.
+    """
+    if window.whole:
+        return seed
+    if window.split:
+        return random_context.derive_seed(seed, "paragraph", window.index, window.part)
+    return random_context.derive_seed(seed, "paragraph", window.index)
+
+
+class LineWindows:
+    """
+    Push-style splitter: feed() text or UTF-8 bytes as they arrive and get
+    back the windows that are complete; close() flushes the rest. The buffer
+    never holds more than one window plus the last chunk.
+    """
+
+    def __init__(self, window_chars=None):
+        self.window_chars = max(1, int(window_chars or DEFAULT_WINDOW_CHARS))
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buffer = ""
+        self._index = 0
+        self._part = 0
+        self._seen_newline = False
+
+    def feed(self, chunk):
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = self._decoder.decode(chunk)
+        self._buffer += chunk
+        windows = []
+        while True:
+            newline = self._buffer.find("\n", 0, self.window_chars + 1)
+            if newline != -1:
+                self._seen_newline = True
+                windows.append(self._emit(self._buffer[:newline], "\n", end_of_line=True))
+                self._buffer = self._buffer[newline + 1:]
+            elif len(self._buffer) > self.window_chars:
+                windows.append(self._cut())
+            else:
+                return windows
+
+    def close(self):
+        self._buffer += self._decoder.decode(b"", final=True)
+        windows = []
+        while len(self._buffer) > self.window_chars:
+            windows.append(self._cut())
+        # The last line has no terminator; an empty one after a final newline still counts
+        if self._buffer or self._seen_newline or self._part:
+            whole = not self._seen_newline and not self._part
+            windows.append(self._emit(self._buffer, "", end_of_line=True, whole=whole))
+        self._buffer = ""
+        return windows
+
+    def _cut(self):
+        # Latest sentence end inside the window, else latest whitespace, else a hard cut
+        head = self._buffer[:self.window_chars + 1]
+        cut = None
+        for match in _SENTENCE_BREAK_RE.finditer(head):
+            cut = match.end() - 1
+        if cut is None:
+            spaces = [m.start() for m in _WHITESPACE_RE.finditer(head)]
+            cut = spaces[-1] if spaces else None
+        if cut:
+            window = self._emit(self._buffer[:cut], " ", end_of_line=False)
+            self._buffer = self._buffer[cut + 1:]
+        else:
+            window = self._emit(self._buffer[:self.window_chars], "", end_of_line=False)
+            self._buffer = self._buffer[self.window_chars:]
+        return window
+
+    def _emit(self, text, tail, end_of_line, whole=False):
+        split = self._part > 0 or not end_of_line
+        window = Window(text, self._index, self._part, split, whole, tail)
+        if end_of_line:
+            self._index += 1
+            self._part = 0
+        else:
+            self._part += 1
+        return window
+
+
+def iter_windows(chunks, window_chars=None):
+    """Windows of an iterable of str/bytes chunks, e.g. read_chunks(f)."""
+    splitter = LineWindows(window_chars)
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.close()
+
+
+def read_chunks(source, chunk_size=READ_CHUNK_CHARS):
+    """Chunks of a text or binary file object, read lazily."""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def humanize_file(engine, source, destination, window_chars=None, **settings):
+    """
+    Stream one text file through engine.humanize_stream() into another,
+    writing each window's output as soon as it is done. "-" means
+    stdin/stdout; a file destination is written to <destination>.part and
+    renamed when complete.
+
+    Returns:
+        characters written
+    """
+    reader = sys.stdin if source == "-" else open(source, "r", encoding="utf-8", errors="replace", newline="")
+    part_path = None
+    if destination == "-":
+        writer = sys.stdout
+    else:
+        part_path = destination + ".part"
+        writer = open(part_path, "w", encoding="utf-8", newline="")
+    written = 0
+    try:
+        for piece in engine.humanize_stream(read_chunks(reader), window_chars=window_chars, **settings):
+            writer.write(piece)
+            writer.flush()
+            written += len(piece)
+    finally:
+        if reader is not sys.stdin:
+            reader.close()
+        if writer is not sys.stdout:
+            writer.close()
+    if part_path:
+        os.replace(part_path, destination)
+    return written
+
+
+def _parse_chars(value):
+    value = value.strip().lower()
+    multiplier = 1
+    if value.endswith("k"):
+        value, multiplier = value[:-1], 1024
+    elif value.endswith("m"):
+        value, multiplier = value[:-1], 1024 * 1024
+    return int(float(value) * multiplier)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Humanize a large text file with bounded memory.")
+    parser.add_argument("input", help="text file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, or - for stdout (default)")
+    parser.add_argument("--window", default=str(DEFAULT_WINDOW_CHARS), help="window size in characters, e.g. 64k")
+    parser.add_argument("--stealth-level", type=int, default=3)
+    parser.add_argument("--tone", default="Balanced")
+    parser.add_argument("--audience", default="General")
+    parser.add_argument("--emojis", action="store_true")
+    parser.add_argument("--artifacts", action="store_true")
+    parser.add_argument("--seed", type=int, help="make the output reproducible")
+    args = parser.parse_args(argv)
+
+    from . import request_log
+    from .neural import NeuralTextHumanizer
+
+    request_log.configure()
+    engine = NeuralTextHumanizer()
+    written = humanize_file(
+        engine, args.input, args.output, window_chars=_parse_chars(args.window),
+        stealth_level=args.stealth_level, tone=args.tone, audience=args.audience,
+        use_emojis=args.emojis, use_artifacts=args.artifacts, seed=args.seed
+    )
+    if args.output != "-":
+        print(f"✓ {written:,} characters written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
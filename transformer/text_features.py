@@ -0,0 +1,210 @@
+"""
+Shared Text Feature Extraction
+Computes the full heuristic feature vector used by the analyzers in one pass.
+"""
+import re
+import nltk
+import numpy as np
+
+# AI transition words (shared by the smart system, detector and stability guard)
+AI_TRANSITION_WORDS = frozenset([
+    "furthermore", "moreover", "additionally", "consequently",
+    "therefore", "thus", "hence", "notably", "importantly"
+])
+
+FORMAL_WORDS = frozenset(["shall", "ought", "whereas", "thereby", "wherein"])
+
+# Pronouns counted as first-person voice
+FIRST_PERSON_WORDS = frozenset(["i", "me", "my", "we"])
+
+# A sentence containing any of these counts as an opinion sentence
+OPINION_WORDS = frozenset(["i", "me", "my", "mine", "we", "our", "us"])
+
+INFORMAL_MARKERS = (
+    "lol", "haha", "tbh", "honestly", "like,", "you know,",
+    "i mean,", "basically,", "kind of", "sort of"
+)
+
+CASUAL_STARTS = ("And ", "But ", "So ")
+
+# Words (with inner apostrophes) or single punctuation marks
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)*|[^\sa-z0-9]")
+_MISSING_COMMA_RE = re.compile(r",(?<=\w,)(?=\w)")
+_NUMBERED_LIST_RE = re.compile(r"\n\d+\.")
+
+
+def _build_phrase_trie(phrases):
+    """Token trie for multi-token markers; a None key marks a complete phrase."""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for token in _TOKEN_RE.findall(phrase):
+            node = node.setdefault(token, {})
+        node[None] = True
+    return trie
+
+
+_INFORMAL_TRIE = _build_phrase_trie(INFORMAL_MARKERS)
+
+
+def _count_phrases(tokens, trie):
+    """Count trie phrases starting at each token (overlaps allowed, like str.count per marker)."""
+    count = 0
+    for i in range(len(tokens)):
+        node = trie.get(tokens[i])
+        j = i + 1
+        while node is not None:
+            if None in node:
+                count += 1
+            if j == len(tokens):
+                break
+            node = node.get(tokens[j])
+            j += 1
+    return count
+
+
+def extract_features(text):
+    """
+    Tokenize the text once and compute every heuristic feature.
+
+    Word-level checks match whole tokens (so "lol" does not fire inside
+    "lollipop") and multi-word markers are matched with a token trie.
+
+    Returns:
+        dict of features
+    """
+    sentences = nltk.sent_tokenize(text) if text else []
+
+    sentence_lengths = []
+    ai_word_count = 0
+    formal_count = 0
+    first_person_count = 0
+    opinion_sentence_count = 0
+    informal_count = 0
+    # Whitespace-delimited words that are exactly a marker, punctuation and all
+    # ("Furthermore," doesn't count): the smart system's thresholds assume this
+    standalone_ai_count = 0
+    standalone_formal_count = 0
+
+    for sent in sentences:
+        words = sent.split()
+        sentence_lengths.append(len(words))
+        for word in words:
+            word = word.lower()
+            if word in AI_TRANSITION_WORDS:
+                standalone_ai_count += 1
+            elif word in FORMAL_WORDS:
+                standalone_formal_count += 1
+        tokens = _TOKEN_RE.findall(sent.lower())
+        has_opinion = False
+        for token in tokens:
+            if token in AI_TRANSITION_WORDS:
+                ai_word_count += 1
+            elif token in FORMAL_WORDS:
+                formal_count += 1
+            if token in OPINION_WORDS:
+                has_opinion = True
+                if token in FIRST_PERSON_WORDS:
+                    first_person_count += 1
+        if has_opinion:
+            opinion_sentence_count += 1
+        informal_count += _count_phrases(tokens, _INFORMAL_TRIE)
+
+    features = {
+        "ai_word_count": ai_word_count,
+        "formal_count": formal_count,
+        "first_person_count": first_person_count,
+        "opinion_sentence_count": opinion_sentence_count,
+        "informal_count": informal_count,
+        "standalone_ai_count": standalone_ai_count,
+        "standalone_formal_count": standalone_formal_count,
+        "has_double_space": "  " in text,
+        "has_missing_comma": _MISSING_COMMA_RE.search(text) is not None,
+        "has_casual_start": text.startswith(CASUAL_STARTS),
+        "has_bullets": "•" in text or "\n-" in text or "\n*" in text,
+        "has_numbers": _NUMBERED_LIST_RE.search(text) is not None
+    }
+    return _with_length_stats(features, sentence_lengths)
+
+
+def _with_length_stats(features, sentence_lengths):
+    """Add the sentence-length statistics (and ai_density) to a feature dict."""
+    word_count = sum(sentence_lengths)
+    sentence_count = len(sentence_lengths)
+    if sentence_count:
+        mean = word_count / sentence_count
+        variance = sum((l - mean) ** 2 for l in sentence_lengths) / sentence_count
+    else:
+        variance = 0.0
+
+    features.update({
+        "sentence_count": sentence_count,
+        "word_count": word_count,
+        "sentence_lengths": sentence_lengths,
+        "avg_sentence_length": word_count / sentence_count if sentence_count else 0,
+        "sentence_length_std": variance ** 0.5,
+        "ai_density": features["ai_word_count"] / word_count if word_count else 0
+    })
+    return features
+
+
+# --- Incremental extraction ---
+# A blank line (possibly holding spaces) ends a paragraph
+_PARAGRAPH_BREAK_RE = re.compile(r"(\n[^\S\n]*\n\s*)")
+
+_COUNT_FEATURES = (
+    "ai_word_count", "formal_count", "first_person_count", "opinion_sentence_count", "informal_count",
+    "standalone_ai_count", "standalone_formal_count"
+)
+_FLAG_FEATURES = ("has_double_space", "has_missing_comma", "has_bullets", "has_numbers")
+
+
+def split_paragraph_chunks(text):
+    """
+    Split text into paragraph chunks that concatenate back to the exact text.
+    Each chunk after the first starts with the blank-line break before it, so
+    features that look across a line break (bullets, numbering, double
+    spaces) still see it.
+    """
+    parts = _PARAGRAPH_BREAK_RE.split(text)
+    return [parts[0]] + [parts[i] + parts[i + 1] for i in range(1, len(parts), 2)]
+
+
+def merge_features(parts):
+    """
+    Combine extract_features() results of consecutive chunks into the
+    features of the whole text. Sentences never span chunks, so this equals
+    extract_features() on the full text except where Punkt would have joined
+    lines across a blank line.
+    """
+    if not parts:
+        return extract_features("")
+    merged = {name: sum(p[name] for p in parts) for name in _COUNT_FEATURES}
+    merged.update({name: any(p[name] for p in parts) for name in _FLAG_FEATURES})
+    # Only the first chunk starts the document
+    merged["has_casual_start"] = parts[0]["has_casual_start"]
+    sentence_lengths = [length for p in parts for length in p["sentence_lengths"]]
+    return _with_length_stats(merged, sentence_lengths)
+
+
+# --- Batch extraction ---
+_BATCH_FEATURES = (
+    "sentence_count", "word_count", "sentence_length_std", "ai_word_count",
+    "first_person_count", "informal_count", "has_double_space", "has_missing_comma", "has_casual_start"
+)
+
+
+def extract_features_batch(texts):
+    """
+    Heuristic features for many documents at once, as NumPy columns.
+
+    Each document goes through extract_features(), all sharing nltk's cached
+    Punkt tokenizer, so every feature matches the single-text path. Punkt
+    dominates the cost either way; this is about as fast as calling
+    extract_features() per text and exists for the column layout.
+
+    Returns:
+        dict of arrays, one entry per document
+    """
+    rows = [extract_features(text) for text in texts]
+    return {name: np.array([row[name] for row in rows]) for name in _BATCH_FEATURES}
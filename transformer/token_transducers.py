@@ -0,0 +1,233 @@
+"""
+Token Transducers
+Word- and character-level rewrites expressed as per-token steps that run in a
+single traversal, writing into a preallocated output buffer.
+
+A step is step(token, last) -> str or tuple of str, where last tells whether
+this is the final token of the input. Steps passed together to transduce()
+are composed per token: every token a step emits goes through the following
+steps before the next input token is read, so random draws happen in the same
+order as a hand-written loop that applies each step to a word in turn.
+
+Substitutions whose draw count is known before the first draw (one draw per
+candidate character or word) also have a vectorized path for large inputs:
+all decisions come from one random_array() call and are applied as array
+operations. It returns exactly what the scalar path does for the same seed.
+
+Random insertions into a growing list (list.insert in a loop, O(n^2)) are
+replayed with place_insertions() instead, which gives the same final layout
+in O(n log n).
+"""
+import logging
+import re
+
+import numpy as np
+
+from .random_context import random_array
+
+logger = logging.getLogger(__name__)
+
+# Up to this many inserts, plain list.insert beats building the tree
+_DIRECT_INSERTS = 8
+
+# Below this many characters (crossover measured at ~3 KB) the scalar loops
+# beat the fixed cost of handing the generator state to NumPy
+VECTORIZE_MIN_CHARS = 4096
+
+
+def _compose(steps):
+    if len(steps) == 1:
+        return steps[0]
+    head, tail = steps[0], _compose(steps[1:])
+
+    def step(token, last):
+        emitted = head(token, last)
+        if type(emitted) is str:
+            return tail(emitted, last)
+        out = []
+        final = len(emitted) - 1
+        for i, item in enumerate(emitted):
+            result = tail(item, last and i == final)
+            if type(result) is str:
+                out.append(result)
+            else:
+                out.extend(result)
+        return tuple(out)
+    return step
+
+
+def transduce(tokens, *steps, max_out=1):
+    """
+    Run tokens through steps in one traversal.
+
+    Args:
+        tokens: list of input tokens
+        steps: step functions, applied in order to each token
+        max_out: most tokens one input token can turn into; sizes the buffer
+
+    Returns:
+        list of output tokens
+    """
+    step = _compose(steps)
+    count = len(tokens)
+    out = [None] * (count * max_out)
+    n = 0
+    for i, token in enumerate(tokens):
+        emitted = step(token, i == count - 1)
+        if type(emitted) is str:
+            out[n] = emitted
+            n += 1
+        else:
+            size = len(emitted)
+            out[n:n + size] = emitted
+            n += size
+    del out[n:]
+    return out
+
+
+def transduce_words(text, *steps, max_out=1, sep=None):
+    """transduce() over text.split(sep), joined back with single spaces."""
+    return " ".join(transduce(text.split(sep), *steps, max_out=max_out))
+
+
+def place_insertions(length, positions):
+    """
+    Final slots of items inserted one by one into a list that starts with
+    `length` items, the k-th at index positions[k] of the list as it is then
+    (0 <= positions[k] <= length + k, as for list.insert).
+
+    Works backwards: the last insert keeps its index, and each earlier insert
+    lands on the positions[k]-th slot not taken by a later one. Free slots are
+    kept in a Fenwick tree so each lookup is O(log n).
+
+    Returns:
+        list of slot indexes into the final list of length + len(positions)
+    """
+    total = length + len(positions)
+    if not positions:
+        return []
+    # Every slot starts free: the node for i covers (i - lowbit(i), i]
+    tree = [i & -i for i in range(total + 1)]
+    top = 1 << (total.bit_length() - 1)
+    slots = [0] * len(positions)
+    for k in range(len(positions) - 1, -1, -1):
+        # Descend to the largest prefix with positions[k] free slots; the next slot is ours
+        remaining = positions[k]
+        node = 0
+        step = top
+        while step:
+            child = node + step
+            if child <= total and tree[child] <= remaining:
+                node = child
+                remaining -= tree[child]
+            step >>= 1
+        slots[k] = node
+        node += 1
+        while node <= total:
+            tree[node] -= 1
+            node += node & -node
+    return slots
+
+
+def insert_all(items, inserts):
+    """
+    Same result as `for index, item in inserts: items.insert(index, item)`,
+    built in one pass over a preallocated list.
+    """
+    if len(inserts) <= _DIRECT_INSERTS:
+        # A handful of inserts costs O(k * n) either way, without the tree
+        out = list(items)
+        for index, item in inserts:
+            out.insert(index, item)
+        return out
+    slots = place_insertions(len(items), [index for index, _ in inserts])
+    out = [None] * (len(items) + len(inserts))
+    taken = [False] * len(out)
+    for slot, (_, item) in zip(slots, inserts):
+        out[slot] = item
+        taken[slot] = True
+    source = iter(items)
+    for i in range(len(out)):
+        if not taken[i]:
+            out[i] = next(source)
+    return out
+
+
+def scatter(word, count, marks, generator):
+    """
+    Insert `count` random marks inside word, never before its first character.
+    Draws randint then choice per mark, like the original insert loop.
+    """
+    length = len(word)
+    inserts = []
+    for k in range(count):
+        inserts.append((generator.randint(1, length + k - 1), generator.choice(marks)))
+    return "".join(insert_all(word, inserts))
+
+
+def _pattern(keys):
+    # Longest first so alternatives never shadow each other; re caches the compile
+    return re.compile("|".join(re.escape(k) for k in sorted(keys, key=len, reverse=True)))
+
+
+def substitute_chars(text, char_map, probability, generator):
+    """
+    Replace each character found in char_map with probability, one random()
+    draw per candidate character, in text order. Values must be single
+    characters.
+    """
+    if len(text) < VECTORIZE_MIN_CHARS:
+        result = list(text)
+        for match in _pattern(char_map).finditer(text):
+            if generator.random() < probability:
+                result[match.start()] = char_map[match.group()]
+        return "".join(result)
+
+    keys = sorted(char_map)
+    sources = np.array([ord(c) for c in keys], dtype=np.uint32)
+    targets = np.array([ord(char_map[c]) for c in keys], dtype=np.uint32)
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32).copy()
+    candidates = np.flatnonzero(np.isin(codes, sources))
+    chosen = candidates[random_array(len(candidates), generator) < probability]
+    codes[chosen] = targets[np.searchsorted(sources, codes[chosen])]
+    return codes.tobytes().decode("utf-32-le", "surrogatepass")
+
+
+def substitute_words(text, replacements, probability, generator):
+    """
+    Replace each word (text.split()) whose lowercase form is in replacements
+    with probability, one random() draw per candidate word, in text order.
+    Words come back joined with single spaces.
+    """
+    def step(word, last):
+        key = word.lower()
+        if key in replacements and generator.random() < probability:
+            return replacements[key]
+        return word
+
+    if len(text) < VECTORIZE_MIN_CHARS:
+        return transduce_words(text, step)
+    normalized = " ".join(text.split())
+    lowered = normalized.lower()
+    if len(lowered) != len(normalized):
+        # lower() changed the length of some character, so offsets would not line up
+        return transduce_words(text, step)
+
+    # Let the regex engine find the candidates in the lowercased text instead
+    # of visiting every word. Keys match between single spaces; the lookahead
+    # leaves the trailing space for the next word.
+    keys = _pattern(replacements).pattern
+    spans = [
+        (m.start(), m.end() - 1, replacements[m.group()[1:]])
+        for m in re.finditer(" (?:" + keys + ")(?= )", " " + lowered + " ")
+    ]
+    chosen = np.flatnonzero(random_array(len(spans), generator) < probability)
+    pieces = []
+    last = 0
+    for i in chosen.tolist():
+        start, end, replacement = spans[i]
+        pieces.append(normalized[last:start])
+        pieces.append(replacement)
+        last = end
+    pieces.append(normalized[last:])
+    return "".join(pieces)
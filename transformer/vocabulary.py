@@ -1,7 +1,11 @@
-import random
+import logging
 import os
+import threading
 from textblob import Word
 from nltk.corpus import wordnet
+from .random_context import rng
+
+logger = logging.getLogger(__name__)
 
 class VocabularyEnhancer:
     """
@@ -19,6 +23,8 @@ class VocabularyEnhancer:
             
         # Optional: Initialize nlpaug if available
         self.aug = None
+        # The augmenter wraps a stateful tokenizer/model pair; one call at a time
+        self._aug_lock = threading.Lock()
         # Use a class-level or module-level flag to only warn once
         if not hasattr(VocabularyEnhancer, '_warned_nlpaug'):
             try:
@@ -29,13 +35,13 @@ class VocabularyEnhancer:
                     action="substitute",
                     device='cpu'
                 )
-                print("NLP Augmentation model loaded.")
+                logger.info("NLP Augmentation model loaded.")
             except ImportError:
                 # Silently fail if not installed, or print just once
                 pass
             except Exception as e:
                 # Only print other errors once
-                print(f"NLP Augmentation (nlpaug) setup: {e}")
+                logger.warning("NLP Augmentation (nlpaug) setup: %s", e)
             VocabularyEnhancer._warned_nlpaug = True
 
     def get_synonyms(self, word, pos=None):
@@ -65,7 +71,8 @@ class VocabularyEnhancer:
         except:
             pass
         
-        return list(synonyms)
+        # Sorted: set order follows the per-process str hash, and callers draw from this with a seed
+        return sorted(synonyms)
     
     def replace_word_with_synonym(self, word, preserve_case=True):
         """
@@ -83,7 +90,7 @@ class VocabularyEnhancer:
             similar_synonyms = synonyms
         
         # Pick random synonym
-        replacement = random.choice(similar_synonyms)
+        replacement = rng.choice(similar_synonyms)
         
         # Preserve case
         if preserve_case:
@@ -101,7 +108,8 @@ class VocabularyEnhancer:
         if self.aug and level >= 3:
             try:
                 # Augment text contextually
-                aug_text = self.aug.augment(text)
+                with self._aug_lock:
+                    aug_text = self.aug.augment(text)
                 return aug_text[0] if isinstance(aug_text, list) else aug_text
             except:
                 return text
@@ -131,7 +139,7 @@ class VocabularyEnhancer:
             
             if (len(clean_word) < 4 or 
                 clean_word.lower() in skip_words or 
-                random.random() > replacement_rate):
+                rng.random() > replacement_rate):
                 result.append(word)
                 continue
             